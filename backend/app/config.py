@@ -42,6 +42,12 @@ class Settings(BaseSettings):
     # Q-Bot: minimum QuoticoTip confidence to auto-bet
     QBOT_MIN_CONFIDENCE: float = 0.55
 
+    # QuoticoTip batch refresh: fixtures generated concurrently per run
+    QUOTICO_TIP_CONCURRENCY: int = 8
+
+    # Columnar tip dataset cache (written by the qbot_backtests worker)
+    TIP_CACHE_DIR: str = str(Path(__file__).resolve().parent.parent / "tip_cache")
+
     model_config = {"env_file": str(_ENV_FILE), "extra": "ignore"}
 
 
@@ -134,6 +134,9 @@ async def _ensure_indexes() -> None:
     await db.betting_slips.create_index([("user_id", 1), ("selections.match_id", 1)])
     await db.betting_slips.create_index([("squad_id", 1), ("submitted_at", -1)])
     await db.betting_slips.create_index("resolved_at", sparse=True)
+    # Badge engine: slips created or submitted since its last run
+    await db.betting_slips.create_index("created_at")
+    await db.betting_slips.create_index("submitted_at")
 
     # Matchday round dedup (one prediction set per user/matchday/squad)
     await db.betting_slips.create_index(
@@ -170,6 +173,17 @@ async def _ensure_indexes() -> None:
     await db.betting_slips.create_index(
         [("squad_id", 1), ("type", 1), ("sport_key", 1), ("season", 1)]
     )
+    # Settlement batches whose awards are not flushed yet (crash replay)
+    await db.betting_slips.create_index(
+        "settlement.batch",
+        partialFilterExpression={"settlement.flushed": False},
+    )
+
+    # Settlement queue: due-entry scan + expire settled entries after 14 days
+    await db.settlement_queue.create_index([("status", 1), ("next_attempt_at", 1)])
+    await db.settlement_queue.create_index(
+        "settled_at", expireAfterSeconds=60 * 60 * 24 * 14  # TTL: 14 days
+    )
     # Wallet-funded slip lookup for resolver
     await db.betting_slips.create_index(
         [("wallet_id", 1), ("status", 1)], sparse=True,
@@ -220,8 +234,14 @@ async def _ensure_indexes() -> None:
     await db.points_transactions.create_index("user_id")
     await db.points_transactions.create_index("bet_id")
     await db.points_transactions.create_index("created_at")
+    # One settlement credit per slip (replayed flushes skip existing keys)
+    await db.points_transactions.create_index(
+        "idempotency_key", unique=True,
+        partialFilterExpression={"idempotency_key": {"$exists": True}},
+    )
 
     await db.leaderboard.create_index([("points", -1)])
+    await db.leaderboard.create_index([("rank", 1)])
 
     # ---- Squads ----
 
@@ -248,6 +268,7 @@ async def _ensure_indexes() -> None:
     )
     await db.battle_participations.create_index("squad_id")
     await db.battle_participations.create_index("user_id")
+    await db.battle_participations.create_index("joined_at")
 
     # ---- Badges ----
 
@@ -319,6 +340,10 @@ async def _ensure_indexes() -> None:
     await db.wallet_transactions.create_index([("wallet_id", 1), ("created_at", -1)])
     await db.wallet_transactions.create_index([("user_id", 1), ("created_at", -1)])
     await db.wallet_transactions.create_index("created_at")
+    await db.wallet_transactions.create_index(
+        "idempotency_key", unique=True,
+        partialFilterExpression={"idempotency_key": {"$exists": True}},
+    )
 
     # ---- Device Fingerprints (GDPR: hash-only) ----
 
@@ -330,10 +355,23 @@ async def _ensure_indexes() -> None:
 
     # ---- QuoticoTip EV Engine ----
 
+    # Legacy per-snapshot docs — superseded by odds_snapshot_buckets
+    # (tools/migrate_odds_snapshots.py), kept until the TTL drains them
     await db.odds_snapshots.create_index([("match_id", 1), ("snapshot_at", 1)])
     await db.odds_snapshots.create_index(
         "snapshot_at", expireAfterSeconds=60 * 60 * 24 * 14  # TTL: 14 days
     )
+    # One bucket per match per UTC day (parallel ts/price arrays)
+    await db.odds_snapshot_buckets.create_index(
+        [("match_id", 1), ("day", 1)], unique=True
+    )
+    await db.odds_snapshot_buckets.create_index(
+        "last_at", expireAfterSeconds=60 * 60 * 24 * 14  # TTL: 14 days
+    )
+    # Incremental LineMovementState per match (_id = match_id)
+    await db.line_movement.create_index(
+        "last_snapshot_at", expireAfterSeconds=60 * 60 * 24 * 14  # TTL: 14 days
+    )
 
     await db.quotico_tips.create_index("match_id", unique=True)
     await db.quotico_tips.create_index(
@@ -342,6 +380,8 @@ async def _ensure_indexes() -> None:
     await db.quotico_tips.create_index(
         [("status", 1), ("was_correct", 1), ("match_date", -1)]
     )
+    # Pending recomputes (_id = match_id), drained per sport by the odds poller
+    await db.quotico_tip_dirty.create_index("sport_key")
 
     # ---- Qbot Intelligence ----
 
@@ -359,6 +399,8 @@ async def _ensure_indexes() -> None:
     )
 
     await db.qbot_cluster_stats.create_index("sport_key")
+    # _id = "<strategy_id>:<window>:<bankroll>", list page reads by strategy + window
+    await db.qbot_backtests.create_index([("strategy_id", 1), ("window_key", 1)])
     # _id = cluster_key string, no additional unique index needed
 
     # ---- Engine Config (calibration) ----
@@ -41,9 +41,22 @@ async def lifespan(app: FastAPI):
 
     # Team mappings seeded in database._seed_team_mappings() during connect_db()
 
+    # String-keyed leaderboard before any incremental update touches it
+    from app.workers.leaderboard import migrate_leaderboard_keys
+    await migrate_leaderboard_keys()
+
+    # Global rank index (rank queries fall back to Mongo until it is loaded)
+    from app.services.leaderboard_service import hydrate_leaderboard_index
+    try:
+        ranked = await hydrate_leaderboard_index()
+        logger.info("Leaderboard index hydrated: %d ranked users", ranked)
+    except Exception:
+        logger.exception("Leaderboard index hydration failed — using Mongo fallback")
+
     # Start background workers
     from app.workers.odds_poller import poll_odds
     from app.workers.match_resolver import resolve_matches
+    from app.workers.settlement_queue import settle_queued_matches
     from app.workers.leaderboard import materialize_leaderboard
     from app.workers.badge_engine import check_badges
     from app.workers.matchday_sync import sync_matchdays
@@ -51,11 +64,14 @@ async def lifespan(app: FastAPI):
     from app.workers.matchday_leaderboard import materialize_matchday_leaderboard
     from app.workers.wallet_maintenance import run_wallet_maintenance
     from app.workers.odds_poller import run_qbot_bets
+    from app.workers.qbot_backtests import refresh_qbot_backtests
 
     # ~5 calls per poll (smart sleep), 20k/month budget -> poll every 15min ~ 14k/month
     scheduler.add_job(poll_odds, "interval", minutes=15, id="odds_poller")
     # Universal resolver: handles all slip types (single, parlay, matchday, survivor, fantasy, O/U, bankroll)
     scheduler.add_job(resolve_matches, "interval", minutes=30, id="match_resolver")
+    # Settles matches enqueued by the live-score poller / resolver as soon as results are confirmed
+    scheduler.add_job(settle_queued_matches, "interval", seconds=30, id="settlement_queue")
     scheduler.add_job(materialize_leaderboard, "interval", minutes=30, id="leaderboard")
     scheduler.add_job(check_badges, "interval", minutes=30, id="badge_engine")
     scheduler.add_job(sync_matchdays, "interval", minutes=30, id="matchday_sync")
@@ -68,6 +84,8 @@ async def lifespan(app: FastAPI):
 
     # Q-Bot: place bets for matches kicking off within 15 min (candidates generated inline by odds_poller)
     scheduler.add_job(run_qbot_bets, "interval", minutes=5, id="qbot_bets")
+    # Q-Bot Lab: extend persisted backtest curves with newly resolved tips
+    scheduler.add_job(refresh_qbot_backtests, "interval", minutes=30, id="qbot_backtests")
 
     # Self-calibration: daily eval, weekly refinement, monthly exploration
     from app.workers.calibration_worker import (
@@ -87,6 +105,11 @@ async def lifespan(app: FastAPI):
             await asyncio.gather(sync_matchdays(), poll_odds())
         except Exception:
             logger.exception("Initial sync failed — scheduler will retry on next interval")
+        # Publishes the tip datasets the backtest endpoints open
+        try:
+            await refresh_qbot_backtests()
+        except Exception:
+            logger.exception("Initial backtest refresh failed — scheduler will retry on next interval")
 
     asyncio.create_task(initial_sync())
     scheduler.start()
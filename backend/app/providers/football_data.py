@@ -56,6 +56,35 @@ def teams_match(name_a: str, name_b: str) -> bool:
     return False
 
 
+def _final_score(match: dict) -> Optional[dict[str, Any]]:
+    """Parse a finished football-data.org match into a resolver score (None if not final)."""
+    if match.get("status") != "FINISHED":
+        return None
+
+    ft = match.get("score", {}).get("fullTime", {})
+    home_score = ft.get("home")
+    away_score = ft.get("away")
+    if home_score is None or away_score is None:
+        return None
+
+    if home_score > away_score:
+        result = "1"
+    elif home_score == away_score:
+        result = "X"
+    else:
+        result = "2"
+
+    return {
+        "home_team": match.get("homeTeam", {}).get("name", ""),
+        "away_team": match.get("awayTeam", {}).get("name", ""),
+        "utc_date": match.get("utcDate", ""),
+        "completed": True,
+        "result": result,
+        "home_score": home_score,
+        "away_score": away_score,
+    }
+
+
 class FootballDataProvider:
     """football-data.org provider for free match scores and live data."""
 
@@ -109,6 +138,26 @@ class FootballDataProvider:
         resp.raise_for_status()
         return resp.json().get("matches", [])
 
+    def _merge_finished(self, sport_key: str, finished: list[dict]) -> None:
+        """Fold results seen in a live poll into the cached finished scores.
+
+        Same contract as the OpenLigaDB provider: the settlement queue can
+        confirm a result as soon as the live poll sees it final, and the cache
+        timestamp is left alone so the finished fetch still runs on schedule.
+        """
+        if not finished:
+            return
+        entry = self._cache.setdefault(f"finished:{sport_key}", {"data": [], "ts": 0.0})
+        merged = {(r["home_team"], r["utc_date"]): r for r in entry["data"]}
+        for r in finished:
+            merged[(r["home_team"], r["utc_date"])] = r
+        entry["data"] = list(merged.values())
+
+    def cached_finished_scores(self, sport_key: str) -> list[dict[str, Any]]:
+        """Finished scores already held in the cache, whatever their age (no request)."""
+        entry = self._cache.get(f"finished:{sport_key}")
+        return entry["data"] if entry else []
+
     async def get_finished_scores(self, sport_key: str) -> list[dict[str, Any]]:
         """Fetch completed match results for tip resolution."""
         competition = SPORT_TO_COMPETITION.get(sport_key)
@@ -122,31 +171,7 @@ class FootballDataProvider:
 
         try:
             raw = await self._fetch_matches(competition, "FINISHED", days_back=3)
-            results = []
-
-            for match in raw:
-                ft = match.get("score", {}).get("fullTime", {})
-                home_score = ft.get("home")
-                away_score = ft.get("away")
-                if home_score is None or away_score is None:
-                    continue
-
-                if home_score > away_score:
-                    result = "1"
-                elif home_score == away_score:
-                    result = "X"
-                else:
-                    result = "2"
-
-                results.append({
-                    "home_team": match.get("homeTeam", {}).get("name", ""),
-                    "away_team": match.get("awayTeam", {}).get("name", ""),
-                    "utc_date": match.get("utcDate", ""),
-                    "completed": True,
-                    "result": result,
-                    "home_score": home_score,
-                    "away_score": away_score,
-                })
+            results = [r for r in map(_final_score, raw) if r]
 
             self._set_cache(cache_key, results)
             logger.info(
@@ -177,17 +202,31 @@ class FootballDataProvider:
             if not api_key:
                 return []
 
+            # PAUSED keeps half-time matches in the feed; FINISHED results of
+            # the last day are merged into the finished cache for settlement
+            now = utcnow()
             await self._throttle()
             resp = await self._client.get(
                 f"{BASE_URL}/competitions/{competition}/matches",
-                params={"status": "IN_PLAY"},
+                params={
+                    "status": "IN_PLAY,PAUSED,FINISHED",
+                    "dateFrom": (now - timedelta(days=1)).strftime("%Y-%m-%d"),
+                    "dateTo": now.strftime("%Y-%m-%d"),
+                },
                 headers={"X-Auth-Token": api_key},
             )
             resp.raise_for_status()
             raw = resp.json().get("matches", [])
 
             live = []
+            finished = []
             for match in raw:
+                if match.get("status") == "FINISHED":
+                    final = _final_score(match)
+                    if final:
+                        finished.append(final)
+                    continue
+
                 ft = match.get("score", {}).get("fullTime", {})
                 ht = match.get("score", {}).get("halfTime", {})
                 home_score = ft.get("home", 0) or 0
@@ -209,6 +248,7 @@ class FootballDataProvider:
                 })
 
             self._cache[cache_key] = {"data": live, "ts": time.time()}
+            self._merge_finished(sport_key, finished)
             return live
 
         except Exception as e:
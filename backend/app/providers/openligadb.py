@@ -24,6 +24,41 @@ def _current_season() -> int:
     return now.year if now.month >= 7 else now.year - 1
 
 
+def _final_score(match: dict) -> Optional[dict[str, Any]]:
+    """Parse a finished OpenLigaDB match into a resolver score (None if not final)."""
+    if not match.get("matchIsFinished"):
+        return None
+
+    # resultTypeID 2 = Endergebnis (final result)
+    home_score = None
+    away_score = None
+    for r in match.get("matchResults", []):
+        if r.get("resultTypeID") == 2:
+            home_score = r["pointsTeam1"]
+            away_score = r["pointsTeam2"]
+            break
+
+    if home_score is None or away_score is None:
+        return None
+
+    if home_score > away_score:
+        result = "1"
+    elif home_score == away_score:
+        result = "X"
+    else:
+        result = "2"
+
+    return {
+        "home_team": match.get("team1", {}).get("teamName", ""),
+        "away_team": match.get("team2", {}).get("teamName", ""),
+        "utc_date": match.get("matchDateTimeUTC", match.get("matchDateTime", "")),
+        "completed": True,
+        "result": result,
+        "home_score": home_score,
+        "away_score": away_score,
+    }
+
+
 class OpenLigaDBProvider:
     """OpenLigaDB — free, no API key, Bundesliga scores + live data."""
 
@@ -41,6 +76,29 @@ class OpenLigaDBProvider:
     def _set_cache(self, key: str, data: list[dict]) -> None:
         self._cache[key] = {"data": data, "ts": time.time()}
 
+    def _merge_finished(self, sport_key: str, finished: list[dict]) -> None:
+        """Fold results seen in a live poll into the cached finished scores.
+
+        The live endpoint returns the whole current matchday, so a match that
+        just ended is already final in that payload. Merging it here lets the
+        settlement queue confirm results without waiting for the finished-scores
+        cache to expire. The cache timestamp is left alone (an entry created
+        here starts expired), so the previous matchday is still refetched on
+        schedule.
+        """
+        if not finished:
+            return
+        entry = self._cache.setdefault(f"finished:{sport_key}", {"data": [], "ts": 0.0})
+        merged = {(r["home_team"], r["utc_date"]): r for r in entry["data"]}
+        for r in finished:
+            merged[(r["home_team"], r["utc_date"])] = r
+        entry["data"] = list(merged.values())
+
+    def cached_finished_scores(self, sport_key: str) -> list[dict[str, Any]]:
+        """Finished scores already held in the cache, whatever their age (no request)."""
+        entry = self._cache.get(f"finished:{sport_key}")
+        return entry["data"] if entry else []
+
     async def get_finished_scores(self, sport_key: str) -> list[dict[str, Any]]:
         """Fetch completed Bundesliga match results."""
         league = SPORT_TO_LEAGUE.get(sport_key)
@@ -71,39 +129,7 @@ class OpenLigaDBProvider:
                     if resp2.status_code == 200:
                         all_matches.extend(resp2.json())
 
-            results = []
-            for match in all_matches:
-                if not match.get("matchIsFinished"):
-                    continue
-
-                # resultTypeID 2 = Endergebnis (final result)
-                home_score = None
-                away_score = None
-                for r in match.get("matchResults", []):
-                    if r.get("resultTypeID") == 2:
-                        home_score = r["pointsTeam1"]
-                        away_score = r["pointsTeam2"]
-                        break
-
-                if home_score is None or away_score is None:
-                    continue
-
-                if home_score > away_score:
-                    result = "1"
-                elif home_score == away_score:
-                    result = "X"
-                else:
-                    result = "2"
-
-                results.append({
-                    "home_team": match.get("team1", {}).get("teamName", ""),
-                    "away_team": match.get("team2", {}).get("teamName", ""),
-                    "utc_date": match.get("matchDateTimeUTC", match.get("matchDateTime", "")),
-                    "completed": True,
-                    "result": result,
-                    "home_score": home_score,
-                    "away_score": away_score,
-                })
+            results = [r for r in map(_final_score, all_matches) if r]
 
             self._set_cache(cache_key, results)
             logger.info("OpenLigaDB: %d finished matches for %s", len(results), sport_key)
@@ -132,9 +158,13 @@ class OpenLigaDBProvider:
 
             now = utcnow()
             live = []
+            finished = []
 
             for match in matches:
                 if match.get("matchIsFinished"):
+                    final = _final_score(match)
+                    if final:
+                        finished.append(final)
                     continue
 
                 # Parse match time
@@ -181,6 +211,7 @@ class OpenLigaDBProvider:
                 })
 
             self._set_cache(cache_key, live)
+            self._merge_finished(sport_key, finished)
             return live
 
         except Exception as e:
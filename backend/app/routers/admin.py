@@ -16,12 +16,17 @@ from app.services.alias_service import generate_default_alias
 from app.services.auth_service import get_admin_user, invalidate_user_tokens
 from app.services.audit_service import log_audit
 from app.services.historical_service import clear_context_cache
-from app.services.qbot_backtest_service import simulate_strategy_backtest
+from app.services.qbot_backtest_service import (
+    load_backtest_summaries,
+    season_window_since,
+    simulate_strategy_backtest,
+)
 from app.services.team_mapping_service import (
     team_name_key, _strip_accents_lower, make_canonical_id,
     load_cache as reload_canonical_cache,
     seed_team_mappings as seed_canonical_map,
 )
+from app.services.tip_dataset_cache import TipDatasetUnavailable
 from app.providers.odds_api import odds_provider
 from app.utils import ensure_utc, utcnow
 from app.workers._state import get_synced_at, get_worker_state
@@ -29,6 +34,8 @@ from app.workers._state import get_synced_at, get_worker_state
 logger = logging.getLogger("quotico.admin")
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+_TIP_DATASET_PENDING = "Backtest data is still being prepared. Try again in a few minutes."
+
 
 # --- Request models ---
 
@@ -307,6 +314,8 @@ async def adjust_points(
         "admin_id": str(admin["_id"]),
         "created_at": now,
     })
+    from app.workers.leaderboard import update_leaderboard_entries
+    await update_leaderboard_entries([user_id])
 
     admin_id = str(admin["_id"])
     logger.info("Admin %s adjusted points for %s: %+.1f (%s)", admin_id, user_id, body.delta, body.reason)
@@ -442,6 +451,13 @@ async def override_result(
     if old_result != body.result:
         await _re_resolve_bets(match_id, body.result, now, admin)
 
+    # Corrected score replaces the teams' rating entries
+    try:
+        from app.services.team_rating_service import refresh_final_match
+        await refresh_final_match(ObjectId(match_id))
+    except Exception:
+        logger.warning("Team ratings update failed for %s", match_id, exc_info=True)
+
     # No separate archive step needed — resolved matches stay in the
     # unified ``matches`` collection and are queried directly for H2H/form.
 
@@ -531,6 +547,8 @@ async def _re_resolve_bets(match_id: str, new_result: str, now: datetime, admin:
                 "admin_id": str(admin["_id"]),
                 "created_at": now,
             })
+            from app.workers.leaderboard import update_leaderboard_entries
+            await update_leaderboard_entries([slip["user_id"]])
 
 
 # --- Battle Management ---
@@ -956,6 +974,10 @@ async def qbot_strategies(admin=Depends(get_admin_user)):
     strategies = await _db.db.qbot_strategies.find({}).sort("created_at", -1).to_list(2000)
 
     now = utcnow()
+    # Precomputed by the qbot_backtests worker for the list window
+    backtest_summaries = await load_backtest_summaries(
+        strategies, since_date=season_window_since(now),
+    )
     gene_ranges = {
         "min_edge": [3.0, 15.0],
         "min_confidence": [0.30, 0.80],
@@ -1095,6 +1117,7 @@ async def qbot_strategies(admin=Depends(get_admin_user)):
             "archetype": strategy_archetype(doc),
             "identities": identities,
             "active_comparison": active_comparison(doc, active_doc),
+            "backtest_summary": backtest_summaries.get(str(doc["_id"])),
         }
 
     representatives: list[dict] = []
@@ -1236,17 +1259,22 @@ async def qbot_strategy_backtest(
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found.")
 
-    return await simulate_strategy_backtest(
-        strategy,
-        starting_bankroll=1000.0,
-        since_date=since_date,
-    )
+    try:
+        return await simulate_strategy_backtest(
+            strategy,
+            starting_bankroll=1000.0,
+            include_ledger=False,
+            since_date=since_date,
+        )
+    except TipDatasetUnavailable:
+        raise HTTPException(status_code=503, detail=_TIP_DATASET_PENDING)
 
 
 @router.get("/qbot/strategies/{strategy_id}/backtest/ledger")
 async def qbot_strategy_backtest_ledger(
     strategy_id: str,
     limit: int = Query(24, ge=0, description="0 = all ledger rows"),
+    offset: int = Query(0, ge=0, description="Rows to skip (newest first)"),
     since_date: str | None = Query(None, description="ISO date filter start"),
     admin=Depends(get_admin_user),
 ):
@@ -1258,12 +1286,16 @@ async def qbot_strategy_backtest_ledger(
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found.")
 
-    result = await simulate_strategy_backtest(
-        strategy,
-        starting_bankroll=1000.0,
-        limit_ledger=(None if limit == 0 else limit),
-        since_date=since_date,
-    )
+    try:
+        result = await simulate_strategy_backtest(
+            strategy,
+            starting_bankroll=1000.0,
+            limit_ledger=(None if limit == 0 else limit),
+            ledger_offset=offset,
+            since_date=since_date,
+        )
+    except TipDatasetUnavailable:
+        raise HTTPException(status_code=503, detail=_TIP_DATASET_PENDING)
     return {
         "strategy_id": result["strategy_id"],
         "sport_key": result["sport_key"],
@@ -1276,6 +1308,8 @@ async def qbot_strategy_backtest_ledger(
         "weighted_profit": result.get("weighted_profit", 0.0),
         "weighted_staked": result.get("weighted_staked", 0.0),
         "ledger": result["ledger"],
+        "ledger_total": result["ledger_total"],
+        "ledger_offset": result["ledger_offset"],
         "window": result.get("window", {}),
     }
 
@@ -1,8 +1,10 @@
 from typing import Any
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 
 import app.database as _db
+from app.services.auth_service import get_current_user
+from app.services.leaderboard_service import get_top, get_user_rank
 
 router = APIRouter(prefix="/api/leaderboard", tags=["leaderboard"])
 
@@ -11,14 +13,11 @@ router = APIRouter(prefix="/api/leaderboard", tags=["leaderboard"])
 async def get_leaderboard(limit: int = Query(50, ge=1, le=200)) -> list[dict[str, Any]]:
     """Get the global leaderboard, sorted by points descending.
 
-    Uses the materialized leaderboard collection for performance.
+    Uses the in-memory rank index (materialized collection while it is cold).
     Falls back to users collection if materialized view is empty.
     Public endpoint: returns alias only, never email.
     """
-    # Try materialized leaderboard first
-    entries = await _db.db.leaderboard.find().sort("points", -1).limit(limit).to_list(
-        length=limit
-    )
+    entries = await get_top(limit)
 
     if not entries:
         # Fallback: read directly from users
@@ -34,10 +33,19 @@ async def get_leaderboard(limit: int = Query(50, ge=1, le=200)) -> list[dict[str
 
     return [
         {
-            "rank": i + 1,
+            "rank": e.get("rank", i + 1),
             "alias": e.get("alias", "Anonymous"),
             "points": round(e.get("points", 0), 2),
             "is_bot": e.get("is_bot", False),
         }
         for i, e in enumerate(entries)
     ]
+
+
+@router.get("/me")
+async def get_my_rank(user=Depends(get_current_user)) -> dict[str, Any]:
+    """Current user's global rank, including users outside the public top."""
+    entry = await get_user_rank(str(user["_id"]))
+    if not entry:
+        return {"rank": None, "points": round(user.get("points", 0), 2), "total": 0}
+    return {**entry, "points": round(entry["points"], 2)}
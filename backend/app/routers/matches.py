@@ -9,6 +9,7 @@ logger = logging.getLogger("quotico.matches")
 import app.database as _db
 from app.models.match import LiveScoreResponse, MatchResponse, db_to_response
 from app.services.match_service import get_matches, get_match_by_id
+from app.services.odds_snapshot_service import load_odds_snapshots, load_odds_summary
 from app.services.auth_service import get_admin_user
 from app.utils import parse_utc
 from app.providers.odds_api import odds_provider
@@ -122,28 +123,28 @@ async def _match_live_score(sport_key: str, score: dict) -> Optional[dict]:
 @router.get("/{match_id}/odds-timeline")
 async def match_odds_timeline(match_id: str):
     """Odds snapshots for a single match, sorted chronologically."""
-    raw = await _db.db.odds_snapshots.find(
-        {"match_id": match_id},
-        {"_id": 0, "snapshot_at": 1, "odds": 1, "totals": 1, "totals_odds": 1},
-    ).sort("snapshot_at", 1).to_list(length=500)
+    series = await load_odds_snapshots([match_id], limit=500, with_lines=True)
 
-    # Normalize: old docs have totals_odds, new docs have totals
     snapshots = []
-    for s in raw:
+    for s in series.get(match_id, []):
         # Ensure snapshot_at is a clean ISO string (no microseconds — JS compat)
         snap_at = s.get("snapshot_at")
         if isinstance(snap_at, datetime):
             snap_at = snap_at.replace(microsecond=0, tzinfo=snap_at.tzinfo or timezone.utc).isoformat()
         entry: dict = {"snapshot_at": snap_at, "odds": s.get("odds", {})}
-        totals = s.get("totals") or s.get("totals_odds")
-        if totals:
-            entry["totals"] = totals
+        if s.get("totals"):
+            entry["totals"] = s["totals"]
         snapshots.append(entry)
 
+    summary = await load_odds_summary(match_id)
+    if summary:
+        summary = {k: summary[k] for k in ("opening", "current", "low", "high")}
+
     return {
         "match_id": match_id,
         "snapshots": snapshots,
         "snapshot_count": len(snapshots),
+        "summary": summary,
     }
 
 
@@ -81,12 +81,13 @@ async def _fetch_bets_with_joins(qbot_id: str, status_filter: dict, limit: int,
     return [_slip_projection(d) for d in docs]
 
 
-async def _build_dashboard(qbot_id: str, qbot_points: float) -> dict:
+async def _build_dashboard(qbot_id: str) -> dict:
     """Build the complete dashboard response."""
 
     async def get_rank():
-        count = await _db.db.leaderboard.count_documents({"points": {"$gt": qbot_points}})
-        return count + 1
+        from app.services.leaderboard_service import get_user_rank
+        entry = await get_user_rank(qbot_id)
+        return entry["rank"] if entry else 0
 
     async def get_hero_stats():
         pipeline = [
@@ -308,8 +309,8 @@ async def qbot_dashboard():
             "active_bets": [], "candidates": [], "recent_bets": [], "by_sport": [], "win_rate_trend": [], "calibration": [],
         }
 
-    qbot_id, qbot_points = qbot
-    data = await _build_dashboard(qbot_id, qbot_points)
+    qbot_id, _ = qbot
+    data = await _build_dashboard(qbot_id)
 
     _cache["data"] = data
     _cache["expires"] = now + _CACHE_TTL
@@ -94,8 +94,9 @@ class LiveScoreManager:
                     await self._fetch_and_broadcast(live_sports)
                     interval = _INTERVAL_LIVE
                 else:
-                    # Nothing live — clear stale scores
+                    # Nothing live — the remaining matches ended; clear stale scores
                     if self._last_scores:
+                        await self._enqueue_finished(list(self._last_scores.values()))
                         self._last_scores = {}
                         await self._broadcast_empty()
 
@@ -123,6 +124,7 @@ class LiveScoreManager:
 
     async def _fetch_and_broadcast(self, live_sports: set[str]) -> None:
         new_scores: dict[str, dict] = {}
+        failed: set[str] = set()
 
         for sport_key in live_sports:
             live_data: list[dict] = []
@@ -136,6 +138,7 @@ class LiveScoreManager:
                     live_data = await football_data_provider.get_live_scores(sport_key)
             except Exception:
                 logger.warning("WS live score provider failed for %s", sport_key, exc_info=True)
+                failed.add(sport_key)
                 continue
 
             for score in live_data:
@@ -143,6 +146,14 @@ class LiveScoreManager:
                 if matched:
                     new_scores[matched["match_id"]] = matched
 
+        # Matches that dropped out of the live feed have (most likely) finished
+        ended = [
+            s for match_id, s in self._last_scores.items()
+            if match_id not in new_scores and s["sport_key"] not in failed
+        ]
+        if ended:
+            await self._enqueue_finished(ended)
+
         # Detect changes
         changed = new_scores != self._last_scores
         self._last_scores = new_scores
@@ -161,6 +172,15 @@ class LiveScoreManager:
             for ws in dead:
                 self.disconnect(ws)
 
+    async def _enqueue_finished(self, scores: list[dict]) -> None:
+        """Hand ended matches to the settlement queue (it confirms the final score)."""
+        from app.workers.settlement_queue import enqueue_settlement
+        for score in scores:
+            try:
+                await enqueue_settlement(score["match_id"], score["sport_key"], source="live_poller")
+            except Exception:
+                logger.warning("WS settlement enqueue failed for %s", score["match_id"], exc_info=True)
+
     async def _broadcast_empty(self) -> None:
         """Broadcast empty scores when all matches have ended."""
         if not self.connections:
@@ -209,6 +229,30 @@ class LiveScoreManager:
         for ws in dead:
             self.disconnect(ws)
 
+    async def broadcast_steam_move(
+        self, match_id: str, sport_key: str, outcome: str, drop_pct: float,
+    ) -> None:
+        """Push a steam move (large single-interval odds drop) as it is detected."""
+        if not self.connections:
+            return
+        message = {
+            "type": "steam_move",
+            "data": {
+                "match_id": match_id,
+                "sport_key": sport_key,
+                "outcome": outcome,
+                "drop_pct": round(drop_pct, 1),
+            },
+        }
+        dead: list[WebSocket] = []
+        for ws in self.connections:
+            try:
+                await ws.send_json(message)
+            except Exception:
+                dead.append(ws)
+        for ws in dead:
+            self.disconnect(ws)
+
 
 async def _match_to_db(sport_key: str, score: dict) -> Optional[dict]:
     """Match a live score to a DB match."""
@@ -64,6 +64,78 @@ def sport_keys_for(sport_key: str) -> list[str]:
     return RELATED_SPORT_KEYS.get(sport_key, [sport_key])
 
 
+# ---------------------------------------------------------------------------
+# H2H summary (pure — shared with the in-memory TipFeatureStore)
+# ---------------------------------------------------------------------------
+
+def summarize_h2h(h2h_all: list[dict], home_key: str) -> dict | None:
+    """Aggregate W/D/L, goals and xG over all H2H meetings (home_key perspective)."""
+    if not h2h_all:
+        return None
+
+    total = len(h2h_all)
+    home_wins = 0
+    away_wins = 0
+    draws = 0
+    total_goals = 0
+    over_2_5 = 0
+    btts = 0
+    sum_home_xg = 0.0
+    sum_away_xg = 0.0
+    xg_count = 0
+
+    for m in h2h_all:
+        r = m.get("result", {})
+        hg = r.get("home_score", 0) or 0
+        ag = r.get("away_score", 0) or 0
+        total_goals += hg + ag
+        if hg + ag > 2:
+            over_2_5 += 1
+        if hg > 0 and ag > 0:
+            btts += 1
+
+        # Accumulate xG (perspective-corrected to current home/away)
+        h_xg = r.get("home_xg")
+        a_xg = r.get("away_xg")
+        if h_xg is not None and a_xg is not None:
+            if m["home_team_key"] == home_key:
+                sum_home_xg += h_xg
+                sum_away_xg += a_xg
+            else:
+                sum_home_xg += a_xg
+                sum_away_xg += h_xg
+            xg_count += 1
+
+        if m["home_team_key"] == home_key:
+            if hg > ag:
+                home_wins += 1
+            elif hg < ag:
+                away_wins += 1
+            else:
+                draws += 1
+        else:
+            if ag > hg:
+                home_wins += 1
+            elif ag < hg:
+                away_wins += 1
+            else:
+                draws += 1
+
+    summary: dict = {
+        "total": total,
+        "home_wins": home_wins,
+        "away_wins": away_wins,
+        "draws": draws,
+        "avg_goals": round(total_goals / total, 1),
+        "over_2_5_pct": round(over_2_5 / total, 2),
+        "btts_pct": round(btts / total, 2),
+    }
+    if xg_count > 0:
+        summary["avg_home_xg"] = round(sum_home_xg / xg_count, 2)
+        summary["avg_away_xg"] = round(sum_away_xg / xg_count, 2)
+    return summary
+
+
 # ---------------------------------------------------------------------------
 # Match context builder (H2H + form) — queries unified matches collection
 # ---------------------------------------------------------------------------
@@ -127,74 +199,12 @@ async def build_match_context(
     ).sort("match_date", -1).to_list(length=h2h_limit)
 
     # Compute H2H summary from ALL matches
-    h2h_summary = None
     h2h_all = await _db.db.matches.find(
         h2h_query,
         {"_id": 0, "home_team_key": 1, "result.home_score": 1, "result.away_score": 1,
          "result.home_xg": 1, "result.away_xg": 1},
     ).to_list(length=500)
-
-    if h2h_all:
-        total = len(h2h_all)
-        home_wins = 0
-        away_wins = 0
-        draws = 0
-        total_goals = 0
-        over_2_5 = 0
-        btts = 0
-        sum_home_xg = 0.0
-        sum_away_xg = 0.0
-        xg_count = 0
-
-        for m in h2h_all:
-            r = m.get("result", {})
-            hg = r.get("home_score", 0) or 0
-            ag = r.get("away_score", 0) or 0
-            total_goals += hg + ag
-            if hg + ag > 2:
-                over_2_5 += 1
-            if hg > 0 and ag > 0:
-                btts += 1
-
-            # Accumulate xG (perspective-corrected to current home/away)
-            h_xg = r.get("home_xg")
-            a_xg = r.get("away_xg")
-            if h_xg is not None and a_xg is not None:
-                if m["home_team_key"] == home_key:
-                    sum_home_xg += h_xg
-                    sum_away_xg += a_xg
-                else:
-                    sum_home_xg += a_xg
-                    sum_away_xg += h_xg
-                xg_count += 1
-
-            if m["home_team_key"] == home_key:
-                if hg > ag:
-                    home_wins += 1
-                elif hg < ag:
-                    away_wins += 1
-                else:
-                    draws += 1
-            else:
-                if ag > hg:
-                    home_wins += 1
-                elif ag < hg:
-                    away_wins += 1
-                else:
-                    draws += 1
-
-        h2h_summary: dict = {
-            "total": total,
-            "home_wins": home_wins,
-            "away_wins": away_wins,
-            "draws": draws,
-            "avg_goals": round(total_goals / total, 1),
-            "over_2_5_pct": round(over_2_5 / total, 2),
-            "btts_pct": round(btts / total, 2),
-        }
-        if xg_count > 0:
-            h2h_summary["avg_home_xg"] = round(sum_home_xg / xg_count, 2)
-            h2h_summary["avg_away_xg"] = round(sum_away_xg / xg_count, 2)
+    h2h_summary = summarize_h2h(h2h_all, home_key)
 
     # Form: last N finalized matches for each team
     async def get_form(t_key: str) -> list[dict]:
@@ -0,0 +1,170 @@
+"""Global leaderboard rank queries.
+
+``leaderboard_index`` is a process-local order-statistic index over every
+ranked user (not deleted, points > 0). It is hydrated from ``users`` at
+startup and after each leaderboard repair pass, and kept current by
+``update_leaderboard_entries`` on every points award. Ranks are competition
+ranks (1 + users with strictly more points), the same as the materialized
+``leaderboard`` collection.
+
+The async helpers below read from the index and fall back to the
+materialized collection while the index is cold (startup, failed hydration).
+"""
+
+import logging
+import math
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from sortedcontainers import SortedList
+
+import app.database as _db
+
+logger = logging.getLogger("quotico.leaderboard_service")
+
+# Public board size (and the pool King's Choice takes its top 10% from).
+# Ranks themselves cover every user with points.
+LEADERBOARD_SIZE = 500
+
+# King's Choice: top share of the public board, with a floor and a minimum pool
+KINGS_SHARE = 0.10
+MIN_KINGS = 3
+MIN_KINGS_POOL = 10
+
+
+class LeaderboardIndex:
+    """Users ordered by points; positional lookups in O(log n)."""
+
+    def __init__(self):
+        self._order = SortedList()  # (-points, user_id)
+        self._entries: dict[str, dict] = {}
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def load(self, entries: list[dict]) -> None:
+        """Replace the index contents (entries: user_id, points, alias, is_bot)."""
+        self._entries = {e["user_id"]: e for e in entries}
+        self._order = SortedList((-e["points"], e["user_id"]) for e in entries)
+        self.ready = True
+
+    def upsert(self, user_id: str, points: float, alias: str, is_bot: bool = False) -> None:
+        self.remove(user_id)
+        self._entries[user_id] = {
+            "user_id": user_id, "points": points, "alias": alias, "is_bot": is_bot,
+        }
+        self._order.add((-points, user_id))
+
+    def remove(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._order.remove((-entry["points"], user_id))
+
+    def get(self, user_id: str) -> Optional[dict]:
+        return self._entries.get(user_id)
+
+    def rank_of(self, user_id: str) -> Optional[int]:
+        """Competition rank of a ranked user; None if the user is not ranked."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return self._order.bisect_left((-entry["points"], "")) + 1
+
+    def range(self, a: int, b: int) -> list[dict]:
+        """Entries at 1-based positions a..b (inclusive), each with its rank."""
+        a = max(a, 1)
+        b = min(b, len(self._order))
+        if a > b:
+            return []
+        out: list[dict] = []
+        rank = 0
+        prev = None
+        for pos, (neg_points, user_id) in enumerate(self._order.islice(a - 1, b), start=a):
+            if neg_points != prev:
+                rank = pos if prev is not None else self._order.bisect_left((neg_points, "")) + 1
+                prev = neg_points
+            out.append({**self._entries[user_id], "rank": rank})
+        return out
+
+    def top_k(self, k: int) -> list[dict]:
+        return self.range(1, k)
+
+    def percentile_cutoff(self, p: float) -> Optional[float]:
+        """Lowest points still inside the top ``p`` share (0 < p <= 1)."""
+        if not self._order:
+            return None
+        pos = min(max(math.ceil(p * len(self._order)), 1), len(self._order))
+        return -self._order[pos - 1][0]
+
+
+# Singleton index
+leaderboard_index = LeaderboardIndex()
+
+
+async def hydrate_leaderboard_index() -> int:
+    """(Re)load the index from users; returns the number of ranked users."""
+    users = await _db.db.users.find(
+        {"is_deleted": False, "points": {"$gt": 0}},
+        {"alias": 1, "points": 1, "is_bot": 1},
+    ).to_list(length=None)
+    leaderboard_index.load([
+        {
+            "user_id": str(u["_id"]),
+            "points": u["points"],
+            "alias": u.get("alias", "Anonymous"),
+            "is_bot": u.get("is_bot", False),
+        }
+        for u in users
+    ])
+    return len(users)
+
+
+async def get_top(limit: int) -> list[dict]:
+    """Top ``limit`` entries (user_id, alias, points, rank, is_bot)."""
+    if leaderboard_index.ready:
+        return leaderboard_index.top_k(limit)
+    return await _db.db.leaderboard.find().sort("rank", 1).limit(limit).to_list(length=limit)
+
+
+async def get_user_rank(user_id: str) -> dict | None:
+    """Rank of any user (not just the public top); None if the user is unknown.
+
+    Users without points share the last place behind every ranked user.
+    """
+    if leaderboard_index.ready:
+        total = len(leaderboard_index)
+        entry = leaderboard_index.get(user_id)
+        if entry:
+            return {"rank": leaderboard_index.rank_of(user_id), "points": entry["points"], "total": total}
+    else:
+        entry = await _db.db.leaderboard.find_one({"_id": user_id}, {"rank": 1, "points": 1})
+        total = await _db.db.leaderboard.estimated_document_count()
+        if entry:
+            return {"rank": entry["rank"], "points": entry["points"], "total": total}
+
+    try:
+        user = await _db.db.users.find_one(
+            {"_id": ObjectId(user_id), "is_deleted": False}, {"points": 1},
+        )
+    except InvalidId:
+        return None
+    if not user:
+        return None
+    return {"rank": total + 1, "points": user.get("points", 0), "total": total}
+
+
+async def get_king_ids() -> list[str]:
+    """King's Choice pool: the top 10% (at least 3) of the public leaderboard."""
+    if leaderboard_index.ready:
+        total_users = min(len(leaderboard_index), LEADERBOARD_SIZE)
+    else:
+        total_users = await _db.db.leaderboard.count_documents(
+            {"rank": {"$lte": LEADERBOARD_SIZE}},
+        )
+    if total_users < MIN_KINGS_POOL:
+        return []
+
+    top_n = max(int(total_users * KINGS_SHARE), MIN_KINGS)
+    return [e["user_id"] for e in await get_top(top_n)]
@@ -105,16 +105,20 @@ async def sync_matches_for_sport(sport_key: str) -> dict:
     - Dual lookup: metadata.theoddsapi_id (fast path) → compound key (fallback)
     - Writes to nested odds structure
     - Stores season, season_label, league_code, team keys
+    - ``odds.updated_at`` marks the last time the lines were confirmed (used for
+      bet staleness); ``odds.changed_at`` only moves when h2h/totals/spreads differ
 
-    Returns {"matches": count, "odds_changed": changed_count}.
+    Returns {"matches": count, "odds_changed": changed_count,
+    "changed_ids": [match_id, ...]} — changed_ids includes newly inserted matches.
     """
     matches_data = await odds_provider.get_odds(sport_key)
     if not matches_data:
-        return {"matches": 0, "odds_changed": 0}
+        return {"matches": 0, "odds_changed": 0, "changed_ids": []}
 
     now = utcnow()
     count = 0
     odds_changed = 0
+    changed_ids: list[str] = []
 
     for m in matches_data:
         match_date_raw = m["commence_time"]
@@ -161,12 +165,14 @@ async def sync_matches_for_sport(sport_key: str) -> dict:
             }, projection={"status": 1, "odds": 1})
 
         # Detect odds changes
+        lines_moved = existing is None
         if existing:
             old_odds = existing.get("odds", {})
             if (old_odds.get("h2h") != odds_h2h
                     or old_odds.get("totals") != odds_totals
                     or old_odds.get("spreads") != odds_spreads):
                 odds_changed += 1
+                lines_moved = True
 
         # Determine status
         status = _compute_status(match_date_raw, now, sport_key, existing)
@@ -211,6 +217,8 @@ async def sync_matches_for_sport(sport_key: str) -> dict:
             set_fields["odds.spreads"] = odds_spreads
         if closing_line:
             set_fields["odds.closing_line"] = closing_line
+        if lines_moved:
+            set_fields["odds.changed_at"] = now
         if status:
             set_fields["status"] = status
 
@@ -237,7 +245,7 @@ async def sync_matches_for_sport(sport_key: str) -> dict:
         if "status" not in set_fields:
             set_on_insert["status"] = MatchStatus.scheduled
 
-        await _db.db.matches.update_one(
+        result = await _db.db.matches.update_one(
             upsert_filter,
             {
                 "$set": set_fields,
@@ -246,9 +254,18 @@ async def sync_matches_for_sport(sport_key: str) -> dict:
             upsert=True,
         )
         count += 1
+        if lines_moved:
+            match_oid = existing["_id"] if existing else result.upserted_id
+            if match_oid is None:
+                # Upsert filter matched a doc the lookups above missed
+                doc = await _db.db.matches.find_one(upsert_filter, {"_id": 1})
+                match_oid = doc["_id"] if doc else None
+            if match_oid is not None:
+                changed_ids.append(str(match_oid))
 
     # Sweep: touch odds.updated_at for scheduled matches of this sport that
     # have valid odds but weren't in the API response (lines pulled near kickoff).
+    # Lines didn't move, so odds.changed_at stays put and no tip is regenerated.
     seen_theoddsapi_ids = [m["external_id"] for m in matches_data]
     sweep_result = await _db.db.matches.update_many(
         {
@@ -266,7 +283,7 @@ async def sync_matches_for_sport(sport_key: str) -> dict:
         )
 
     logger.info("Synced %d matches for %s (%d odds changed)", count, sport_key, odds_changed)
-    return {"matches": count, "odds_changed": odds_changed}
+    return {"matches": count, "odds_changed": odds_changed, "changed_ids": changed_ids}
 
 
 async def get_match_by_id(match_id: str) -> Optional[dict]:
@@ -0,0 +1,179 @@
+"""Odds snapshot time series — one bucket document per match per UTC day.
+
+Every odds poll used to insert one full document per scheduled match into
+``odds_snapshots``. Buckets in ``odds_snapshot_buckets`` instead hold parallel
+arrays (``ts`` plus one price array per 1/X/2 outcome, totals and spreads) and
+aggregates maintained on write:
+
+    opening   h2h odds of the bucket's first snapshot ($setOnInsert)
+    current   h2h odds of the bucket's latest snapshot ($set)
+    low/high  per-outcome price range ($min / $max)
+    first_at/last_at, count
+
+Readers flatten buckets back into the legacy snapshot shape
+(``{"snapshot_at", "odds", "totals", "spreads"}``), oldest first.
+"""
+
+from datetime import datetime
+
+import app.database as _db
+from app.utils import ensure_utc
+
+# h2h outcome → bucket field (numeric keys would clash with array-index paths)
+OUTCOME_FIELDS: dict[str, str] = {"1": "home", "X": "draw", "2": "away"}
+
+
+def bucket_day(ts: datetime) -> datetime:
+    """UTC midnight of the day *ts* falls on (bucket key)."""
+    return ensure_utc(ts).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _snapshot_update(
+    odds: dict[str, float],
+    snapshot_at: datetime,
+    *,
+    totals: dict | None = None,
+    spreads: dict | None = None,
+) -> dict:
+    """Update document appending one snapshot to its day bucket (upsert)."""
+    push: dict = {
+        "ts": snapshot_at,
+        "totals": totals or {},
+        "spreads": spreads or {},
+    }
+    low: dict = {"first_at": snapshot_at}
+    high: dict = {"last_at": snapshot_at}
+    for outcome, field in OUTCOME_FIELDS.items():
+        price = odds.get(outcome)
+        push[f"prices.{field}"] = price
+        if price is not None:
+            low[f"low.{field}"] = price
+            high[f"high.{field}"] = price
+    return {
+        "$push": push,
+        "$min": low,
+        "$max": high,
+        "$inc": {"count": 1},
+        "$set": {"current": odds},
+        "$setOnInsert": {"opening": odds},
+    }
+
+
+async def append_snapshots(snapshots: list[dict], *, ordered: bool = False) -> int:
+    """Append snapshots to their day buckets in one bulk write.
+
+    Each entry is a legacy-shaped snapshot: ``match_id``, ``snapshot_at``,
+    ``odds`` (h2h) and optionally ``sport_key``, ``external_id``, ``totals``,
+    ``spreads``. Pass ``ordered=True`` when a batch holds several snapshots
+    of the same match (they must then be in chronological order).
+    Returns the number of snapshots written.
+    """
+    if not snapshots:
+        return 0
+    from pymongo import UpdateOne
+
+    ops = []
+    for snap in snapshots:
+        update = _snapshot_update(
+            snap.get("odds") or {}, snap["snapshot_at"],
+            totals=snap.get("totals"), spreads=snap.get("spreads"),
+        )
+        update["$setOnInsert"].update({
+            "sport_key": snap.get("sport_key"),
+            "external_id": snap.get("external_id"),
+        })
+        ops.append(UpdateOne(
+            {"match_id": snap["match_id"], "day": bucket_day(snap["snapshot_at"])},
+            update,
+            upsert=True,
+        ))
+    await _db.db.odds_snapshot_buckets.bulk_write(ops, ordered=ordered)
+    return len(ops)
+
+
+def bucket_snapshots(bucket: dict) -> list[dict]:
+    """Flatten a bucket into legacy snapshot dicts, oldest first."""
+    prices = bucket.get("prices", {})
+    totals = bucket.get("totals")
+    spreads = bucket.get("spreads")
+    snapshots = []
+    for i, ts in enumerate(bucket.get("ts", [])):
+        odds = {}
+        for outcome, field in OUTCOME_FIELDS.items():
+            series = prices.get(field)
+            if series is not None and i < len(series) and series[i] is not None:
+                odds[outcome] = series[i]
+        snap: dict = {"snapshot_at": ts, "odds": odds}
+        if totals is not None:
+            snap["totals"] = totals[i] if i < len(totals) else {}
+        if spreads is not None:
+            snap["spreads"] = spreads[i] if i < len(spreads) else {}
+        snapshots.append(snap)
+    return snapshots
+
+
+async def load_odds_snapshots(
+    match_ids: list[str],
+    *,
+    before_date: datetime | None = None,
+    limit: int | None = None,
+    with_lines: bool = False,
+) -> dict[str, list[dict]]:
+    """Snapshots per match id, oldest first (first *limit* per match).
+
+    *before_date* keeps only snapshots strictly before it (backfill).
+    *with_lines* also returns totals/spreads; h2h-only readers skip them.
+    """
+    if not match_ids:
+        return {}
+    query: dict = {"match_id": {"$in": match_ids}}
+    if before_date is not None:
+        query["day"] = {"$lte": bucket_day(before_date)}
+    projection: dict = {"_id": 0, "match_id": 1, "day": 1, "ts": 1, "prices": 1}
+    if with_lines:
+        projection.update({"totals": 1, "spreads": 1})
+    buckets = await _db.db.odds_snapshot_buckets.find(
+        query, projection,
+    ).sort([("match_id", 1), ("day", 1)]).to_list(length=None)
+
+    cutoff = ensure_utc(before_date) if before_date is not None else None
+    result: dict[str, list[dict]] = {}
+    for bucket in buckets:
+        snaps = result.setdefault(bucket["match_id"], [])
+        if limit is not None and len(snaps) >= limit:
+            continue
+        for snap in bucket_snapshots(bucket):
+            if cutoff is not None and ensure_utc(snap["snapshot_at"]) >= cutoff:
+                break
+            snaps.append(snap)
+        if limit is not None:
+            del snaps[limit:]
+    return result
+
+
+async def load_odds_summary(match_id: str) -> dict | None:
+    """Opening/current odds and price range across all buckets of a match."""
+    buckets = await _db.db.odds_snapshot_buckets.find(
+        {"match_id": match_id},
+        {"_id": 0, "opening": 1, "current": 1, "low": 1, "high": 1,
+         "first_at": 1, "last_at": 1, "count": 1},
+    ).sort("day", 1).to_list(length=None)
+    if not buckets:
+        return None
+    low: dict[str, float] = {}
+    high: dict[str, float] = {}
+    for bucket in buckets:
+        for field, price in bucket.get("low", {}).items():
+            low[field] = min(price, low.get(field, price))
+        for field, price in bucket.get("high", {}).items():
+            high[field] = max(price, high.get(field, price))
+    return {
+        "opening": buckets[0].get("opening", {}),
+        "current": buckets[-1].get("current", {}),
+        "low": {o: low[f] for o, f in OUTCOME_FIELDS.items() if f in low},
+        "high": {o: high[f] for o, f in OUTCOME_FIELDS.items() if f in high},
+        "first_at": buckets[0].get("first_at"),
+        "last_at": buckets[-1].get("last_at"),
+        "snapshot_count": sum(b.get("count", 0) for b in buckets),
+    }
+
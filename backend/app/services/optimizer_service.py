@@ -21,6 +21,8 @@ from bisect import bisect_left
 from datetime import datetime, timedelta
 from typing import TypedDict
 
+import numpy as np
+
 import app.database as _db
 from app.services.historical_service import sport_keys_for
 from app.services.quotico_tip_service import (
@@ -34,13 +36,10 @@ from app.services.quotico_tip_service import (
     LEAGUE_RHO,
     MIN_MATCHES_REQUIRED,
     N_TEAM_MATCHES,
-    SCORELINE_MAX,
     _calculate_fatigue_penalty,
     _compute_h2h_lambdas,
-    _dixon_coles_adjustment,
-    _poisson_pmf,
-    _time_weighted_average,
     blend_goals,
+    compute_score_matrices,
 )
 from app.services.team_mapping_service import resolve_team_key
 from app.utils import ensure_utc, utcnow
@@ -365,71 +364,127 @@ async def _prefetch_match_data(
 # Pure-math probability computation (no DB calls)
 # ---------------------------------------------------------------------------
 
-def _compute_probs_for_params(
-    md: MatchCalibrationData, rho: float, alpha: float, floor: float,
-) -> dict[str, float] | None:
-    """Compute 1/X/2 probabilities for one match using candidate parameters.
+_OUTCOME_INDEX = {"1": 0, "X": 1, "2": 2}
+
 
-    Pure computation — no DB calls. Uses the same Dixon-Coles pipeline as
-    compute_poisson_probabilities but with explicit parameter inputs.
+class PackedCalibrationData(TypedDict):
+    """MatchCalibrationData list packed into padded (N, K) arrays.
+
+    K is the longest per-team history; shorter histories are padded and
+    masked out. Day offsets are whole days between each history match and
+    the calibration match (same ``.days`` semantics as _time_based_weight).
+    """
+    home_scored: np.ndarray
+    home_conceded: np.ndarray
+    home_days: np.ndarray
+    home_mask: np.ndarray
+    away_scored: np.ndarray
+    away_conceded: np.ndarray
+    away_days: np.ndarray
+    away_mask: np.ndarray
+    league_avg_home: np.ndarray
+    league_avg_away: np.ndarray
+    h2h_weight: np.ndarray
+    h2h_lambda_home: np.ndarray
+    h2h_lambda_away: np.ndarray
+    home_mod: np.ndarray
+    away_mod: np.ndarray
+    actual_idx: np.ndarray
+
+
+def _pack_calibration_data(all_data: list[MatchCalibrationData]) -> PackedCalibrationData:
+    """Pack calibration data into padded arrays for whole-grid evaluation.
+
+    Everything that does not depend on (rho, alpha, floor) — goals, day
+    offsets, H2H blend weights, fatigue modifiers — is resolved here once.
     """
-    avg_h = md["league_avg_home"]
-    avg_a = md["league_avg_away"]
-    ref_date = md["match_date"]
+    n = len(all_data)
+    k = max(
+        (max(len(md["home_scored"]), len(md["away_scored"])) for md in all_data),
+        default=0,
+    )
 
-    # Time-weighted attack/defense strengths
-    home_attack = _time_weighted_average(
-        md["home_scored"], md["home_dates"], ref_date, alpha=alpha, floor=floor) / avg_h
-    home_defense = _time_weighted_average(
-        md["home_conceded"], md["home_dates"], ref_date, alpha=alpha, floor=floor) / avg_a
+    packed: dict[str, np.ndarray] = {}
+    for side in ("home", "away"):
+        packed[f"{side}_scored"] = np.zeros((n, k), dtype=np.float64)
+        packed[f"{side}_conceded"] = np.zeros((n, k), dtype=np.float64)
+        packed[f"{side}_days"] = np.zeros((n, k), dtype=np.float64)
+        packed[f"{side}_mask"] = np.zeros((n, k), dtype=bool)
+    for name in ("league_avg_home", "league_avg_away", "h2h_weight",
+                 "h2h_lambda_home", "h2h_lambda_away", "home_mod", "away_mod"):
+        packed[name] = np.zeros(n, dtype=np.float64)
+    packed["actual_idx"] = np.zeros(n, dtype=np.intp)
+
+    for i, md in enumerate(all_data):
+        ref_date = ensure_utc(md["match_date"])
+        for side in ("home", "away"):
+            count = len(md[f"{side}_scored"])
+            packed[f"{side}_scored"][i, :count] = md[f"{side}_scored"]
+            packed[f"{side}_conceded"][i, :count] = md[f"{side}_conceded"]
+            packed[f"{side}_days"][i, :count] = [
+                max(0, (ref_date - ensure_utc(d)).days) for d in md[f"{side}_dates"]
+            ]
+            packed[f"{side}_mask"][i, :count] = True
+
+        packed["league_avg_home"][i] = md["league_avg_home"]
+        packed["league_avg_away"][i] = md["league_avg_away"]
+        if md["h2h_lambdas"]:
+            h2h = md["h2h_lambdas"]
+            packed["h2h_weight"][i] = min(h2h["count"] / H2H_WEIGHT_SCALE, H2H_WEIGHT_MAX)
+            packed["h2h_lambda_home"][i] = h2h["lambda_home"]
+            packed["h2h_lambda_away"][i] = h2h["lambda_away"]
+        packed["home_mod"][i], packed["away_mod"][i] = _calculate_fatigue_penalty(
+            md["home_rest"], md["away_rest"],
+        )
+        packed["actual_idx"][i] = _OUTCOME_INDEX[md["actual_result"]]
 
-    away_attack = _time_weighted_average(
-        md["away_scored"], md["away_dates"], ref_date, alpha=alpha, floor=floor) / avg_a
-    away_defense = _time_weighted_average(
-        md["away_conceded"], md["away_dates"], ref_date, alpha=alpha, floor=floor) / avg_h
+    return PackedCalibrationData(**packed)
+
+
+def _compute_lambda_grid(
+    packed: PackedCalibrationData, alphas: np.ndarray, floors: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute (lambda_home, lambda_away) for every alpha × floor × match.
+
+    Time weights for all alpha/floor pairs are one (A, F, N, K) broadcast;
+    returns two (A, F, N) arrays. Same pipeline as compute_poisson_probabilities:
+    time-weighted strengths → H2H blend → rest penalty → lambda cap.
+    """
+    a = alphas[:, None, None, None]
+    f = floors[None, :, None, None]
+
+    def _weighted(side: str) -> tuple[np.ndarray, np.ndarray]:
+        w = np.maximum(np.exp(-a * packed[f"{side}_days"]), f) * packed[f"{side}_mask"]
+        total = w.sum(axis=-1)
+        safe_total = np.where(total > 0, total, 1.0)
+        scored = np.where(total > 0, (w * packed[f"{side}_scored"]).sum(axis=-1) / safe_total, 0.0)
+        conceded = np.where(total > 0, (w * packed[f"{side}_conceded"]).sum(axis=-1) / safe_total, 0.0)
+        return scored, conceded
+
+    avg_h = packed["league_avg_home"]
+    avg_a = packed["league_avg_away"]
+    home_scored, home_conceded = _weighted("home")
+    away_scored, away_conceded = _weighted("away")
+
+    # Time-weighted attack/defense strengths
+    home_attack = home_scored / avg_h
+    home_defense = home_conceded / avg_a
+    away_attack = away_scored / avg_a
+    away_defense = away_conceded / avg_h
 
     # Base lambdas
     lambda_h = home_attack * away_defense * avg_h
     lambda_a = away_attack * home_defense * avg_a
 
-    # H2H blend
-    if md["h2h_lambdas"]:
-        h2h = md["h2h_lambdas"]
-        h2h_w = min(h2h["count"] / H2H_WEIGHT_SCALE, H2H_WEIGHT_MAX)
-        gw = 1.0 - h2h_w
-        lambda_h = gw * lambda_h + h2h_w * h2h["lambda_home"]
-        lambda_a = gw * lambda_a + h2h_w * h2h["lambda_away"]
-
-    # Rest penalty
-    home_mod, away_mod = _calculate_fatigue_penalty(md["home_rest"], md["away_rest"])
-    lambda_h *= home_mod
-    lambda_a *= away_mod
-
-    # Lambda cap
-    lambda_h = min(lambda_h, LAMBDA_CAP)
-    lambda_a = min(lambda_a, LAMBDA_CAP)
-
-    # Dixon-Coles corrected matrix
-    matrix = [[0.0] * SCORELINE_MAX for _ in range(SCORELINE_MAX)]
-    for i in range(SCORELINE_MAX):
-        for j in range(SCORELINE_MAX):
-            prob = _poisson_pmf(i, lambda_h) * _poisson_pmf(j, lambda_a)
-            adj = _dixon_coles_adjustment(i, j, lambda_h, lambda_a, rho)
-            matrix[i][j] = max(prob * adj, 0.0)
-
-    # Renormalize
-    total = sum(matrix[i][j] for i in range(SCORELINE_MAX) for j in range(SCORELINE_MAX))
-    if total <= 0:
-        return None
-    for i in range(SCORELINE_MAX):
-        for j in range(SCORELINE_MAX):
-            matrix[i][j] /= total
-
-    prob_home = sum(matrix[i][j] for i in range(SCORELINE_MAX) for j in range(SCORELINE_MAX) if i > j)
-    prob_draw = sum(matrix[i][i] for i in range(SCORELINE_MAX))
-    prob_away = sum(matrix[i][j] for i in range(SCORELINE_MAX) for j in range(SCORELINE_MAX) if i < j)
+    # H2H blend (weight 0 for matches without enough meetings)
+    h2h_w = packed["h2h_weight"]
+    lambda_h = (1.0 - h2h_w) * lambda_h + h2h_w * packed["h2h_lambda_home"]
+    lambda_a = (1.0 - h2h_w) * lambda_a + h2h_w * packed["h2h_lambda_away"]
 
-    return {"1": prob_home, "X": prob_draw, "2": prob_away}
+    # Rest penalty + lambda cap
+    lambda_h = np.minimum(lambda_h * packed["home_mod"], LAMBDA_CAP)
+    lambda_a = np.minimum(lambda_a * packed["away_mod"], LAMBDA_CAP)
+    return lambda_h, lambda_a
 
 
 # ---------------------------------------------------------------------------
@@ -445,74 +500,118 @@ def _get_defaults(sport_key: str) -> dict:
     }
 
 
-def _evaluate_params(
+def _evaluate_grid(
     all_data: list[MatchCalibrationData],
-    rho: float, alpha: float, floor: float,
+    grid: list[tuple[float, float, float]],
     defaults: dict,
-) -> dict:
-    """Evaluate a parameter triple on all calibration data.
+) -> list[dict]:
+    """Evaluate every (rho, alpha, floor) triple of *grid* in one tensor pass.
 
-    Returns pure_brier, regularized_brier, log_likelihood,
-    per-outcome calibration_error, and evaluated count.
+    Lambdas are computed for all alpha × floor pairs at once, then each rho
+    slice runs through the batched Dixon-Coles engine. Brier, log-likelihood
+    and calibration error are reductions over the match axis.
+
+    Returns one result dict per grid triple, in grid order (same shape as
+    _evaluate_params).
     """
-    brier_sum = 0.0
-    ll_sum = 0.0
-    p_sums = {"1": 0.0, "X": 0.0, "2": 0.0}
-    o_sums = {"1": 0.0, "X": 0.0, "2": 0.0}
-    n = 0
-
-    for md in all_data:
-        probs = _compute_probs_for_params(md, rho, alpha, floor)
-        if not probs:
-            continue
+    if not grid:
+        return []
 
-        actual = md["actual_result"]
+    rhos = np.array(sorted({g[0] for g in grid}), dtype=np.float64)
+    alphas = np.array(sorted({g[1] for g in grid}), dtype=np.float64)
+    floors = np.array(sorted({g[2] for g in grid}), dtype=np.float64)
 
-        # Multi-class Brier score: Σ_j (p_j - o_j)²
-        for outcome in ("1", "X", "2"):
-            o = 1.0 if outcome == actual else 0.0
-            brier_sum += (probs[outcome] - o) ** 2
-            p_sums[outcome] += probs[outcome]
-            o_sums[outcome] += o
+    packed = _pack_calibration_data(all_data)
+    n_matches = len(all_data)
+    lambda_h, lambda_a = _compute_lambda_grid(packed, alphas, floors)
+
+    observed = np.zeros((n_matches, 3), dtype=np.float64)
+    observed[np.arange(n_matches), packed["actual_idx"]] = 1.0
+
+    # (R, A, F) reductions over the match axis
+    shape = (len(rhos), len(alphas), len(floors))
+    brier_sum = np.zeros(shape)
+    ll_sum = np.zeros(shape)
+    ce_sum = np.zeros(shape + (3,))
+    counts = np.zeros(shape, dtype=np.int64)
+
+    for ri, rho in enumerate(rhos):
+        scores = compute_score_matrices(lambda_h.ravel(), lambda_a.ravel(), rho)
+        probs = np.stack(
+            [scores["prob_home"], scores["prob_draw"], scores["prob_away"]], axis=-1,
+        ).reshape(len(alphas), len(floors), n_matches, 3)
+        valid = probs.sum(axis=-1) > 0
 
+        # Multi-class Brier score: Σ_j (p_j - o_j)²
+        brier_sum[ri] = (((probs - observed) ** 2).sum(axis=-1) * valid).sum(axis=-1)
         # Log-likelihood
-        ll_sum += math.log(max(probs[actual], 1e-10))
-        n += 1
-
-    if n == 0:
-        return {
-            "pure_brier": 1.0, "regularized_brier": 1.0,
-            "log_likelihood": -10.0,
-            "calibration_error": {"home": 0.0, "draw": 0.0, "away": 0.0},
-            "evaluated": 0,
+        p_actual = np.take_along_axis(
+            probs, packed["actual_idx"][None, None, :, None], axis=-1,
+        )[..., 0]
+        ll_sum[ri] = (np.log(np.maximum(p_actual, 1e-10)) * valid).sum(axis=-1)
+        # Per-outcome calibration error numerator: Σ p_j - Σ o_j
+        ce_sum[ri] = ((probs - observed) * valid[..., None]).sum(axis=-2)
+        counts[ri] = valid.sum(axis=-1)
+
+    rho_idx = {float(v): i for i, v in enumerate(rhos)}
+    alpha_idx = {float(v): i for i, v in enumerate(alphas)}
+    floor_idx = {float(v): i for i, v in enumerate(floors)}
+
+    results: list[dict] = []
+    for rho, alpha, floor in grid:
+        idx = (rho_idx[float(rho)], alpha_idx[float(alpha)], floor_idx[float(floor)])
+        n = int(counts[idx])
+        if n == 0:
+            results.append({
+                "pure_brier": 1.0, "regularized_brier": 1.0,
+                "log_likelihood": -10.0,
+                "calibration_error": {"home": 0.0, "draw": 0.0, "away": 0.0},
+                "evaluated": 0,
+            })
+            continue
+
+        pure_brier = float(brier_sum[idx]) / n
+        log_likelihood = float(ll_sum[idx]) / n
+
+        # Per-outcome calibration error: CE_j = mean(p_j) - mean(o_j)
+        ce = ce_sum[idx] / n
+        cal_error = {
+            "home": round(float(ce[0]), 4),
+            "draw": round(float(ce[1]), 4),
+            "away": round(float(ce[2]), 4),
         }
 
-    pure_brier = brier_sum / n
-    log_likelihood = ll_sum / n
+        # L2 regularization: λ_reg = 1/√N
+        lambda_reg = 1.0 / math.sqrt(n)
+        penalty = (
+            REG_WEIGHT_RHO * (rho - defaults["rho"]) ** 2
+            + REG_WEIGHT_ALPHA * (alpha - defaults["alpha"]) ** 2
+            + REG_WEIGHT_FLOOR * (floor - defaults["floor"]) ** 2
+        )
+        regularized_brier = pure_brier + lambda_reg * penalty
 
-    # Per-outcome calibration error: CE_j = mean(p_j) - mean(o_j)
-    cal_error = {
-        "home": round((p_sums["1"] - o_sums["1"]) / n, 4),
-        "draw": round((p_sums["X"] - o_sums["X"]) / n, 4),
-        "away": round((p_sums["2"] - o_sums["2"]) / n, 4),
-    }
+        results.append({
+            "pure_brier": round(pure_brier, 6),
+            "regularized_brier": round(regularized_brier, 6),
+            "log_likelihood": round(log_likelihood, 6),
+            "calibration_error": cal_error,
+            "evaluated": n,
+        })
 
-    # L2 regularization: λ_reg = 1/√N
-    lambda_reg = 1.0 / math.sqrt(n)
-    penalty = (
-        REG_WEIGHT_RHO * (rho - defaults["rho"]) ** 2
-        + REG_WEIGHT_ALPHA * (alpha - defaults["alpha"]) ** 2
-        + REG_WEIGHT_FLOOR * (floor - defaults["floor"]) ** 2
-    )
-    regularized_brier = pure_brier + lambda_reg * penalty
+    return results
 
-    return {
-        "pure_brier": round(pure_brier, 6),
-        "regularized_brier": round(regularized_brier, 6),
-        "log_likelihood": round(log_likelihood, 6),
-        "calibration_error": cal_error,
-        "evaluated": n,
-    }
+
+def _evaluate_params(
+    all_data: list[MatchCalibrationData],
+    rho: float, alpha: float, floor: float,
+    defaults: dict,
+) -> dict:
+    """Evaluate a parameter triple on all calibration data.
+
+    Returns pure_brier, regularized_brier, log_likelihood,
+    per-outcome calibration_error, and evaluated count.
+    """
+    return _evaluate_grid(all_data, [(rho, alpha, floor)], defaults)[0]
 
 
 # ---------------------------------------------------------------------------
@@ -599,16 +698,15 @@ async def calibrate_league(
     logger.info("Calibrating %s (%s mode): %d grid points, %d matches",
                 sport_key, mode, len(grid), len(all_data))
 
-    # Grid search
+    # Grid search — whole grid evaluated as one tensor reduction
     best_result: dict | None = None
     best_params: tuple[float, float, float] | None = None
     best_rbs = float("inf")
     worst_rbs = float("-inf")
-    grid_size = len(grid)
     grid_t0 = _time.monotonic()
 
-    for gi, (rho, alpha, floor) in enumerate(grid, 1):
-        result = _evaluate_params(all_data, rho, alpha, floor, defaults)
+    grid_results = _evaluate_grid(all_data, grid, defaults)
+    for (rho, alpha, floor), result in zip(grid, grid_results):
         rbs = result["regularized_brier"]
 
         if rbs < best_rbs:
@@ -618,9 +716,8 @@ async def calibrate_league(
         if rbs > worst_rbs:
             worst_rbs = rbs
 
-        if gi % 100 == 0 or gi == grid_size:
-            elapsed = _time.monotonic() - grid_t0
-            logger.info("  Grid search: %d/%d combos evaluated (%.1fs)", gi, grid_size, elapsed)
+    logger.info("  Grid search: %d combos evaluated (%.1fs)",
+                len(grid), _time.monotonic() - grid_t0)
 
     if not best_params or not best_result:
         return {"sport_key": sport_key, "status": "error", "reason": "no valid grid point"}
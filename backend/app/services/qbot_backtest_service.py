@@ -1,17 +1,34 @@
-"""Backtest simulation utilities for Qbot strategy admin endpoints."""
+"""Backtest simulation utilities for Qbot strategy admin endpoints.
+
+Tips come from the columnar tip cache (services/tip_dataset_cache), so the
+signal pipeline runs as NumPy expressions over the backtest window. The
+compounding bankroll walk is solved in chunks as an affine recurrence
+(cumprod/cumsum); only chunks whose stake regime keeps flipping fall back to
+the per-bet loop. Ledger rows are built on demand, one page at a time.
+
+Bet curves are persisted in ``qbot_backtests`` per strategy and window, and
+extended rather than replayed when new tips resolve (see load_backtest_curve).
+"""
 
 from __future__ import annotations
 
-from datetime import timedelta
+import hashlib
+import io
+import json
+import logging
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from bson import ObjectId
+import numpy as np
+from bson import Binary, ObjectId
 
 import app.database as _db
 from app.utils import ensure_utc, parse_utc, utcnow
 
+logger = logging.getLogger("quotico.qbot_backtest")
+
 DEFAULT_BANKROLL = 1000.0
-DEFAULT_BAYES_CONF = 0.333
+DEFAULT_IMPLIED_PROB = 0.33
 DEFAULT_ODDS_FALLBACK = 3.0
 DEFAULT_LOOKBACK_YEARS = 3
 DEFAULT_LOOKBACK_MAX_TIPS = 1000
@@ -19,279 +36,117 @@ DEFAULT_ARENA_LOOKBACK_YEARS = 8
 TIME_WEIGHT_FLOOR = 0.20
 MAX_STAKE_BANKROLL_FRACTION = 0.05
 
+# Bankroll recursion: bets per affine chunk (keeps the running products far
+# from over/underflow) and passes per chunk before the per-bet loop takes over
+BANKROLL_CHUNK = 512
+MAX_REGIME_PASSES = 8
 
-def _signal_boosts(tip: dict) -> tuple[float, float, float]:
-    """Extract sharp/momentum/rest boosts from a resolved tip."""
-    signals = tip.get("tier_signals", {}) or {}
-    pick = tip.get("recommended_selection")
-
-    sharp_boost = 0.0
-    sharp_sig = signals.get("sharp_movement", {}) or {}
-    if sharp_sig.get("has_sharp_movement") and sharp_sig.get("direction") == pick:
-        sharp_boost = 0.10
-        if sharp_sig.get("is_late_money"):
-            sharp_boost = 0.12
-        if sharp_sig.get("has_steam_move") and sharp_sig.get("steam_outcome") == pick:
-            sharp_boost += 0.03
-
-    momentum_boost = 0.0
-    momentum_sig = signals.get("momentum", {}) or {}
-    gap = float(momentum_sig.get("gap", 0.0))
-    if gap > 0.20:
-        home_m = float((momentum_sig.get("home") or {}).get("momentum_score", 0.5))
-        away_m = float((momentum_sig.get("away") or {}).get("momentum_score", 0.5))
-        if (pick == "1" and home_m > away_m) or (pick == "2" and away_m > home_m):
-            momentum_boost = 0.08
-
-    rest_boost = 0.0
-    rest_sig = signals.get("rest_advantage", {}) or {}
-    if rest_sig.get("contributes"):
-        diff = float(rest_sig.get("diff", 0.0))
-        if (pick == "1" and diff > 0) or (pick == "2" and diff < 0):
-            rest_boost = 0.04
-
-    return sharp_boost, momentum_boost, rest_boost
-
-
-def _resolve_tip_odds(
-    tip: dict,
-    odds_by_match: dict[str, dict[str, float]],
-) -> float:
-    """Resolve odds for a tip, preferring match odds over implied fallback."""
-    match_id = str(tip.get("match_id", ""))
-    selection = tip.get("recommended_selection")
-    implied_prob = float(tip.get("implied_probability", 0.0))
-
-    # Best source: historical match h2h odds for the selected outcome.
-    if match_id and selection in {"1", "X", "2"}:
-        h2h = odds_by_match.get(match_id) or {}
-        sel_odds = h2h.get(selection)
-        if isinstance(sel_odds, (int, float)) and float(sel_odds) > 1.0:
-            return float(sel_odds)
-
-    # Fallback: implied probability from tip.
-    if implied_prob > 0.01:
-        return float(1.0 / implied_prob)
-
-    # Last resort fallback; avoid exaggerated 10.0 default.
-    return DEFAULT_ODDS_FALLBACK
-
-
-def _time_weight(
-    match_date,
-    *,
-    reference_now,
-    lookback_years: int,
-) -> float:
-    """Linear decay from 1.0 (today) to floor at lookback horizon."""
-    if match_date is None:
-        return TIME_WEIGHT_FLOOR
-    dt = ensure_utc(match_date)
-    days_old = max(0.0, (reference_now - dt).total_seconds() / 86400.0)
-    horizon_days = max(1.0, float(lookback_years) * 365.0)
-    return float(max(TIME_WEIGHT_FLOOR, 1.0 - (days_old / horizon_days)))
-
-
-def _tip_profit_and_stake(
-    tip: dict,
-    dna: dict[str, float],
-    *,
-    bankroll: float,
-    odds: float,
-) -> tuple[float, float, bool, float]:
-    """Compute (stake, profit, is_win, odds) for one tip under one DNA profile."""
-    edge = float(tip.get("edge_pct", 0.0))
-    conf = float(tip.get("confidence", 0.0))
-    implied_prob = float(tip.get("implied_probability", 0.33))
-    pick = tip.get("recommended_selection")
-    is_win = bool(tip.get("was_correct", False))
-    if implied_prob <= 0.01 and odds > 1.0:
-        implied_prob = 1.0 / odds
-
-    min_edge = float(dna.get("min_edge", 0.0))
-    min_conf = float(dna.get("min_confidence", 0.0))
-    sharp_weight = float(dna.get("sharp_weight", 1.0))
-    momentum_weight = float(dna.get("momentum_weight", 1.0))
-    rest_weight = float(dna.get("rest_weight", 1.0))
-    kelly_fraction = float(dna.get("kelly_fraction", 0.0))
-    max_stake = float(dna.get("max_stake", 0.0))
-    home_bias = float(dna.get("home_bias", 1.0))
-    away_bias = float(dna.get("away_bias", 1.0))
-    h2h_weight = float(dna.get("h2h_weight", 0.0))
-    draw_threshold = float(dna.get("draw_threshold", 0.0))
-    volatility_buffer = float(dna.get("volatility_buffer", 0.0))
-    bayes_trust_factor = float(dna.get("bayes_trust_factor", 0.0))
-
-    sharp_boost, momentum_boost, rest_boost = _signal_boosts(tip)
-    h2h_tip = float(((tip.get("tier_signals") or {}).get("poisson") or {}).get("h2h_weight", 0.0))
-    bayes_conf = float(((tip.get("qbot_logic") or {}).get("bayesian_confidence", DEFAULT_BAYES_CONF))
-    )
-
-    adj_conf = conf
-    adj_conf += sharp_weight * sharp_boost
-    adj_conf += momentum_weight * momentum_boost
-    adj_conf += rest_weight * rest_boost
-
-    if pick == "1":
-        adj_conf *= home_bias
-    elif pick == "2":
-        adj_conf *= away_bias
-
-    adj_conf += h2h_weight * h2h_tip * 0.10
-    blend_weight = min(max(bayes_trust_factor * 0.5, 0.0), 0.75)
-    adj_conf = (1.0 - blend_weight) * adj_conf + blend_weight * bayes_conf
-    adj_conf = min(max(adj_conf, 0.0), 0.99)
+# Persisted curves: bump BACKTEST_SCHEMA when CURVE_FIELDS or the simulation
+# changes; larger curves are not stored (Mongo's 16 MB document cap)
+BACKTEST_SCHEMA = 1
+MAX_CURVE_BYTES = 12 * 1024 * 1024
+CURVE_FIELDS = (
+    "match_id", "match_us", "edge_pct", "odds", "pick", "is_win", "stake", "bankroll_before",
+)
 
-    if edge < min_edge or conf < min_conf:
-        return 0.0, 0.0, is_win, odds
-    if pick == "X" and adj_conf < draw_threshold:
-        return 0.0, 0.0, is_win, odds
+_PICKS = ("1", "X", "2")
 
-    buffered_edge = max(adj_conf - implied_prob - volatility_buffer, 0.0)
-    denom = max(odds - 1.0, 0.01)
-    kelly_raw = kelly_fraction * buffered_edge / denom
-    stake = float(bankroll) * max(kelly_raw, 0.0)
-    risk_cap = float(bankroll) * MAX_STAKE_BANKROLL_FRACTION
-    stake = min(stake, max_stake, risk_cap, float(bankroll))
-    if stake <= 0.0:
-        return 0.0, 0.0, is_win, odds
 
-    profit = stake * (odds - 1.0) if is_win else -stake
-    return float(stake), float(profit), is_win, float(odds)
+# ---------------------------------------------------------------------------
+# Window selection
+# ---------------------------------------------------------------------------
 
-
-async def simulate_strategy_backtest(
+def _select_window(
     strategy: dict[str, Any],
-    *,
-    starting_bankroll: float = DEFAULT_BANKROLL,
-    limit_ledger: int | None = None,
-    since_date: str | None = None,
-) -> dict[str, Any]:
-    """Simulate full-history bankroll curve for a strategy document."""
-    sport_key = strategy.get("sport_key", "all")
-    dna = strategy.get("dna", {}) or {}
-    if not dna:
-        return {
-            "strategy_id": str(strategy.get("_id")),
-            "sport_key": sport_key,
-            "starting_bankroll": starting_bankroll,
-            "ending_bankroll": starting_bankroll,
-            "total_bets": 0,
-            "wins": 0,
-            "win_rate": 0.0,
-            "points": [],
-            "window": {},
-        }
+    cols: dict[str, np.ndarray],
+    since_date: str | None,
+) -> tuple[np.ndarray, dict[str, Any]]:
+    """Row indices (match_date order) of the backtest window plus its metadata."""
+    from app.services.tip_dataset_cache import MISSING_US, from_us, to_us
 
-    query: dict[str, Any] = {"status": "resolved", "was_correct": {"$ne": None}}
-    if sport_key and sport_key != "all":
-        query["sport_key"] = sport_key
-
-    window_meta: dict[str, Any] = {"mode": "fallback"}
+    match_us = np.asarray(cols["match_us"])
+    dated = match_us != MISSING_US
 
     # 1) Explicit since_date wins.
     if since_date:
         since_dt = parse_utc(since_date)
-        query["match_date"] = {"$gte": since_dt}
-        window_meta = {
+        idx = np.flatnonzero(match_us >= to_us(since_dt))
+        return idx, {
             "mode": "since_date",
             "since_date": since_dt.isoformat(),
             "until_date": None,
         }
-    else:
-        # 2) Validation-window sync (preferred): exact arena 80/20 validation slice.
-        # First try persisted metadata, then reconstruct from historical tips prior
-        # to strategy creation timestamp.
-        validation_window = (
-            ((strategy.get("optimization_notes") or {}).get("validation_window"))
-            or {}
-        )
-        val_start = validation_window.get("start_date")
-        val_end = validation_window.get("end_date")
-        if val_start:
-            start_dt = parse_utc(val_start)
-            end_dt = parse_utc(val_end) if val_end else None
-            query["match_date"] = {"$gte": start_dt}
-            if end_dt is not None:
-                query["match_date"]["$lte"] = end_dt
-            window_meta = {
-                "mode": "validation_window",
-                "source": "strategy_metadata",
-                "since_date": start_dt.isoformat(),
-                "until_date": end_dt.isoformat() if end_dt else None,
-            }
-        else:
-            created_at = ensure_utc(strategy.get("created_at", utcnow()))
-            pre_query = {"status": "resolved", "was_correct": {"$ne": None}}
-            if sport_key and sport_key != "all":
-                pre_query["sport_key"] = sport_key
-            pre_query["$or"] = [
-                {"generated_at": {"$lte": created_at}},
-                {"generated_at": {"$exists": False}, "match_date": {"$lte": created_at}},
-            ]
-            pre_tips = await _db.db.quotico_tips.find(
-                pre_query,
-                {"match_date": 1},
-            ).sort("match_date", 1).to_list(length=200_000)
-
-            if pre_tips:
-                split_idx = int(len(pre_tips) * 0.80)
-                val_tips = pre_tips[split_idx:] if split_idx < len(pre_tips) else []
-                if val_tips:
-                    start_dt = ensure_utc(val_tips[0]["match_date"])
-                    end_dt = ensure_utc(val_tips[-1]["match_date"])
-                    query["match_date"] = {"$gte": start_dt, "$lte": end_dt}
-                    window_meta = {
-                        "mode": "validation_window",
-                        "source": "reconstructed_80_20",
-                        "since_date": start_dt.isoformat(),
-                        "until_date": end_dt.isoformat(),
-                        "reconstructed_total_tips": len(pre_tips),
-                        "reconstructed_validation_tips": len(val_tips),
-                    }
-
-    projection = {
-        "_id": 0,
-        "match_id": 1,
-        "match_date": 1,
-        "home_team": 1,
-        "away_team": 1,
-        "recommended_selection": 1,
-        "edge_pct": 1,
-        "confidence": 1,
-        "implied_probability": 1,
-        "was_correct": 1,
-        "tier_signals": 1,
-        "qbot_logic": 1,
-    }
-    tips = await _db.db.quotico_tips.find(query, projection).sort("match_date", 1).to_list(length=200_000)
-
-    # 3) If no explicit/validation window is active, apply default lookback:
-    # last 3 years and max last 1000 tips.
-    if window_meta.get("mode") == "fallback" and tips:
-        now = utcnow()
-        cutoff = now - timedelta(days=365 * DEFAULT_LOOKBACK_YEARS)
-        tips = [t for t in tips if ensure_utc(t["match_date"]) >= cutoff]
-        if len(tips) > DEFAULT_LOOKBACK_MAX_TIPS:
-            tips = tips[-DEFAULT_LOOKBACK_MAX_TIPS:]
-        window_meta = {
-            "mode": "default_lookback",
-            "since_date": ensure_utc(tips[0]["match_date"]).isoformat() if tips else cutoff.isoformat(),
-            "until_date": ensure_utc(tips[-1]["match_date"]).isoformat() if tips else now.isoformat(),
-            "lookback_years": DEFAULT_LOOKBACK_YEARS,
-            "lookback_max_tips": DEFAULT_LOOKBACK_MAX_TIPS,
+
+    # 2) Validation-window sync (preferred): exact arena 80/20 validation slice.
+    # First try persisted metadata, then reconstruct from historical tips prior
+    # to strategy creation timestamp.
+    validation_window = (
+        ((strategy.get("optimization_notes") or {}).get("validation_window"))
+        or {}
+    )
+    val_start = validation_window.get("start_date")
+    val_end = validation_window.get("end_date")
+    if val_start:
+        start_dt = parse_utc(val_start)
+        end_dt = parse_utc(val_end) if val_end else None
+        in_window = match_us >= to_us(start_dt)
+        if end_dt is not None:
+            in_window &= match_us <= to_us(end_dt)
+        return np.flatnonzero(in_window), {
+            "mode": "validation_window",
+            "source": "strategy_metadata",
+            "since_date": start_dt.isoformat(),
+            "until_date": end_dt.isoformat() if end_dt else None,
+        }
+
+    created_us = to_us(ensure_utc(strategy.get("created_at", utcnow())))
+    generated_us = np.asarray(cols["generated_us"])
+    pre = np.where(
+        generated_us != MISSING_US,
+        generated_us <= created_us,
+        dated & (match_us <= created_us),
+    )
+    pre_idx = np.flatnonzero(pre)
+    split_idx = int(len(pre_idx) * 0.80)
+    val_idx = pre_idx[split_idx:]
+    val_idx = val_idx[match_us[val_idx] != MISSING_US]
+    if val_idx.size:
+        start_us, end_us = int(match_us[val_idx[0]]), int(match_us[val_idx[-1]])
+        idx = np.flatnonzero((match_us >= start_us) & (match_us <= end_us))
+        return idx, {
+            "mode": "validation_window",
+            "source": "reconstructed_80_20",
+            "since_date": from_us(start_us).isoformat(),
+            "until_date": from_us(end_us).isoformat(),
+            "reconstructed_total_tips": int(len(pre_idx)),
+            "reconstructed_validation_tips": int(len(pre_idx) - split_idx),
         }
 
-    # Load historical match odds once, then resolve odds per tip from match_id.
-    odds_by_match: dict[str, dict[str, float]] = {}
-    match_ids = sorted({str(t.get("match_id")) for t in tips if t.get("match_id")})
-    object_ids = []
-    for mid in match_ids:
-        if len(mid) == 24:
-            try:
-                object_ids.append(ObjectId(mid))
-            except Exception:
-                continue
+    # 3) No explicit/validation window: last 3 years, max last 1000 tips.
+    now = utcnow()
+    cutoff = now - timedelta(days=365 * DEFAULT_LOOKBACK_YEARS)
+    idx = np.flatnonzero(match_us >= to_us(cutoff))[-DEFAULT_LOOKBACK_MAX_TIPS:]
+    return idx, {
+        "mode": "default_lookback",
+        "since_date": from_us(match_us[idx[0]]).isoformat() if idx.size else cutoff.isoformat(),
+        "until_date": from_us(match_us[idx[-1]]).isoformat() if idx.size else now.isoformat(),
+        "lookback_years": DEFAULT_LOOKBACK_YEARS,
+        "lookback_max_tips": DEFAULT_LOOKBACK_MAX_TIPS,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Vectorized bet selection and bankroll walk
+# ---------------------------------------------------------------------------
+
+async def _resolve_odds(match_ids: np.ndarray, pick: np.ndarray, implied: np.ndarray) -> np.ndarray:
+    """Odds per tip, preferring historical match h2h odds over the implied fallback."""
+    unique_ids = np.unique(match_ids)
+    object_ids = [
+        ObjectId(mid) for mid in unique_ids.tolist()
+        if len(mid) == 24 and ObjectId.is_valid(mid)
+    ]
+    h2h_by_match: dict[str, tuple[float, float, float]] = {}
     if object_ids:
         matches = await _db.db.matches.find(
             {"_id": {"$in": object_ids}},
@@ -299,20 +154,242 @@ async def simulate_strategy_backtest(
         ).to_list(length=len(object_ids))
         for m in matches:
             h2h = ((m.get("odds") or {}).get("h2h") or {})
-            odds_by_match[str(m["_id"])] = {
-                "1": float(h2h.get("1", 0.0)) if h2h.get("1") is not None else 0.0,
-                "X": float(h2h.get("X", 0.0)) if h2h.get("X") is not None else 0.0,
-                "2": float(h2h.get("2", 0.0)) if h2h.get("2") is not None else 0.0,
-            }
+            h2h_by_match[str(m["_id"])] = tuple(
+                float(h2h[sel]) if isinstance(h2h.get(sel), (int, float)) else 0.0
+                for sel in _PICKS
+            )
 
-    bankroll = float(starting_bankroll)
-    wins = 0
-    total_bets = 0
-    weighted_staked = 0.0
-    weighted_profit = 0.0
-    points: list[dict[str, Any]] = []
-    ledger: list[dict[str, Any]] = []
-    reference_now = utcnow()
+    none = (0.0, 0.0, 0.0)
+    table = np.array([h2h_by_match.get(mid, none) for mid in unique_ids.tolist()]).reshape(-1, 3)
+    match_odds = table[np.searchsorted(unique_ids, match_ids), pick]
+
+    with np.errstate(divide="ignore"):
+        implied_odds = np.where(implied > 0.01, 1.0 / implied, DEFAULT_ODDS_FALLBACK)
+    return np.where(match_odds > 1.0, match_odds, implied_odds)
+
+
+def _stake_fractions(
+    cols: dict[str, np.ndarray],
+    idx: np.ndarray,
+    odds: np.ndarray,
+    dna: dict[str, float],
+) -> np.ndarray:
+    """Kelly bankroll fraction per tip (0 where the DNA filters it out)."""
+    edge = np.asarray(cols["edge_pct"])[idx]
+    conf = np.asarray(cols["confidence"])[idx]
+    pick = np.asarray(cols["pick_type"])[idx]
+    implied = np.asarray(cols["implied_prob"])[idx]
+    implied = np.where(np.isnan(implied), DEFAULT_IMPLIED_PROB, implied)
+    implied = np.where((implied <= 0.01) & (odds > 1.0), 1.0 / odds, implied)
+
+    adj_conf = conf + float(dna.get("sharp_weight", 1.0)) * np.asarray(cols["sharp_boost"])[idx]
+    adj_conf += float(dna.get("momentum_weight", 1.0)) * np.asarray(cols["momentum_boost"])[idx]
+    adj_conf += float(dna.get("rest_weight", 1.0)) * np.asarray(cols["rest_boost"])[idx]
+    adj_conf = np.where(pick == 0, adj_conf * float(dna.get("home_bias", 1.0)), adj_conf)
+    adj_conf = np.where(pick == 2, adj_conf * float(dna.get("away_bias", 1.0)), adj_conf)
+    adj_conf += float(dna.get("h2h_weight", 0.0)) * np.asarray(cols["h2h_weight"])[idx] * 0.10
+    blend_weight = min(max(float(dna.get("bayes_trust_factor", 0.0)) * 0.5, 0.0), 0.75)
+    adj_conf = (1.0 - blend_weight) * adj_conf + blend_weight * np.asarray(cols["bayes_conf"])[idx]
+    adj_conf = np.clip(adj_conf, 0.0, 0.99)
+
+    active = (edge >= float(dna.get("min_edge", 0.0))) & (conf >= float(dna.get("min_confidence", 0.0)))
+    active &= ~((pick == 1) & (adj_conf < float(dna.get("draw_threshold", 0.0))))
+
+    buffered_edge = np.maximum(adj_conf - implied - float(dna.get("volatility_buffer", 0.0)), 0.0)
+    denom = np.maximum(odds - 1.0, 0.01)
+    kelly_raw = float(dna.get("kelly_fraction", 0.0)) * buffered_edge / denom
+    return np.where(active, np.maximum(kelly_raw, 0.0), 0.0)
+
+
+def odds_return(odds: np.ndarray, is_win: np.ndarray) -> np.ndarray:
+    """Net return per unit staked: odds - 1 on a win, -1 on a loss."""
+    return np.where(is_win, odds - 1.0, -1.0)
+
+
+def _bankroll_walk(
+    frac: np.ndarray,
+    ret: np.ndarray,
+    cap: float,
+    bankroll: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(bankroll_before, stake) per bet for stake = min(B·frac, cap).
+
+    A bet below the cap moves the bankroll multiplicatively, a capped one
+    additively, so for a fixed split the walk is the affine recurrence
+    B' = a·B + b — closed form via cumprod/cumsum. Each pass guesses the split
+    from the previous pass's path and keeps the prefix on which the guess
+    holds; the first bet after it is always classified right, so every pass
+    makes progress.
+    """
+    n = len(frac)
+    before = np.empty(n)
+    stake = np.empty(n)
+    if cap <= 0.0:
+        before.fill(bankroll)
+        stake.fill(0.0)
+        return before, stake
+
+    for lo in range(0, n, BANKROLL_CHUNK):
+        hi = min(lo + BANKROLL_CHUNK, n)
+        guess = np.full(hi - lo, bankroll)
+        start = lo
+        for _ in range(MAX_REGIME_PASSES):
+            if start == hi:
+                break
+            f, r = frac[start:hi], ret[start:hi]
+            capped = guess[start - lo:] * f > cap
+            a = np.where(capped, 1.0, 1.0 + f * r)
+            b = np.where(capped, cap * r, 0.0)
+            prod = np.cumprod(a)
+            with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+                after = prod * (bankroll + np.cumsum(b / prod))
+            path = np.concatenate(([bankroll], after[:-1]))
+            if not np.isfinite(path).all():
+                break
+            bad = np.flatnonzero((path * f > cap) != capped)
+            keep = bad[0] if bad.size else hi - start
+            before[start:start + keep] = path[:keep]
+            stake[start:start + keep] = np.minimum(path[:keep] * f[:keep], cap)
+            guess[start - lo:] = path
+            bankroll = float(after[keep - 1]) if keep else bankroll
+            start += keep
+
+        # Regime kept flipping: walk the rest of the chunk bet by bet
+        for i in range(start, hi):
+            s = min(bankroll * frac[i], cap)
+            before[i] = bankroll
+            stake[i] = s
+            bankroll += s * ret[i]
+
+    return before, stake
+
+
+def _iso_dates(match_us: np.ndarray) -> list[str]:
+    """ISO strings for µs timestamps (formatted once per distinct kickoff)."""
+    from app.services.tip_dataset_cache import from_us
+
+    uniques, inverse = np.unique(match_us, return_inverse=True)
+    formatted = [from_us(us).isoformat() for us in uniques.tolist()]
+    return [formatted[i] for i in inverse.tolist()]
+
+
+async def _simulate_rows(
+    cols: dict[str, np.ndarray],
+    idx: np.ndarray,
+    dna: dict[str, float],
+    bankroll: float,
+) -> dict[str, np.ndarray]:
+    """Curve arrays (one entry per placed bet) for window rows *idx*."""
+    pick = np.asarray(cols["pick_type"])[idx].astype(np.intp)
+    odds = await _resolve_odds(
+        np.asarray(cols["match_id"])[idx], pick, np.asarray(cols["implied_prob"])[idx],
+    )
+    frac = np.minimum(_stake_fractions(cols, idx, odds, dna), MAX_STAKE_BANKROLL_FRACTION)
+
+    bet = frac > 0.0
+    idx, odds, pick, frac = idx[bet], odds[bet], pick[bet], frac[bet]
+    is_win = np.asarray(cols["was_correct"])[idx]
+    ret = odds_return(odds, is_win)
+    bankroll_before, stake = _bankroll_walk(
+        frac, ret, float(dna.get("max_stake", 0.0)), float(bankroll),
+    )
+    bet = stake > 0.0
+    return {
+        "match_id": np.asarray(cols["match_id"])[idx[bet]],
+        "match_us": np.asarray(cols["match_us"])[idx[bet]],
+        "edge_pct": np.asarray(cols["edge_pct"])[idx[bet]],
+        "odds": odds[bet],
+        "pick": pick[bet].astype(np.int8),
+        "is_win": is_win[bet],
+        "stake": stake[bet],
+        "bankroll_before": bankroll_before[bet],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Persisted curves
+# ---------------------------------------------------------------------------
+#
+# One ``qbot_backtests`` document per (strategy, window, starting bankroll)
+# keeps the bet curve of the last run together with the dataset version it
+# was computed on. A run on a newer dataset replays nothing when the window
+# rows it covered are unchanged (same count, same digest): only rows past the
+# covered kickoff are simulated, starting from the cached ending bankroll.
+# A changed strategy fingerprint (DNA, window metadata) discards the curve.
+# Only the default window and the season window the qbot_backtests worker
+# refreshes are persisted; other since_date windows are computed per request.
+
+def strategy_fingerprint(strategy: dict[str, Any]) -> str:
+    """Hash of everything in a strategy document that shapes its bet curve."""
+    notes = strategy.get("optimization_notes") or {}
+    raw = json.dumps(
+        {
+            "sport_key": strategy.get("sport_key", "all"),
+            "dna": strategy.get("dna") or {},
+            "validation_window": notes.get("validation_window"),
+            "created_at": strategy.get("created_at"),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def season_window_since(now: datetime | None = None) -> str:
+    """Start of the penultimate season (Aug 1), the Qbot Lab list window."""
+    now = now or utcnow()
+    season_start = now.year if now.month >= 8 else now.year - 1
+    return datetime(season_start - 1, 8, 1, tzinfo=timezone.utc).isoformat()
+
+
+def _window_key(since_date: str | None) -> str:
+    return parse_utc(since_date).isoformat() if since_date else "default"
+
+
+def _persisted_window(window_key: str) -> bool:
+    return window_key in ("default", _window_key(season_window_since()))
+
+
+def _rows_digest(cols: dict[str, np.ndarray], idx: np.ndarray) -> str:
+    """Digest of the cached feature columns of window rows *idx*."""
+    from app.services.tip_dataset_cache import COLUMNS
+
+    h = hashlib.sha1()
+    for name in COLUMNS:
+        values = np.asarray(cols[name])[idx]
+        if name == "match_id":
+            h.update("\0".join(values.tolist()).encode())
+        else:
+            h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()
+
+
+def _encode_curve(curve: dict[str, np.ndarray]) -> bytes:
+    buf = io.BytesIO()
+    np.savez(buf, **curve)
+    return buf.getvalue()
+
+
+def _decode_curve(raw: bytes) -> dict[str, np.ndarray]:
+    with np.load(io.BytesIO(raw), allow_pickle=False) as npz:
+        return {name: npz[name] for name in CURVE_FIELDS}
+
+
+def _ending_bankroll(curve: dict[str, np.ndarray], starting_bankroll: float) -> float:
+    if not len(curve["stake"]):
+        return float(starting_bankroll)
+    ret = odds_return(curve["odds"][-1:], curve["is_win"][-1:])
+    return float(curve["bankroll_before"][-1] + curve["stake"][-1] * ret[0])
+
+
+def _curve_stats(
+    curve: dict[str, np.ndarray],
+    strategy: dict[str, Any],
+) -> dict[str, np.ndarray]:
+    """Per-bet profit, bankroll after and time weight (as of now)."""
+    from app.services.tip_dataset_cache import to_us
+
+    profit = curve["stake"] * odds_return(curve["odds"], curve["is_win"])
     strategy_lookback_years = int(
         max(
             1,
@@ -322,79 +399,280 @@ async def simulate_strategy_backtest(
             ),
         )
     )
+    days_old = np.maximum(0.0, (to_us(utcnow()) - curve["match_us"]) / 1e6 / 86400.0)
+    horizon_days = max(1.0, float(strategy_lookback_years) * 365.0)
+    return {
+        "profit": profit,
+        "bankroll_after": curve["bankroll_before"] + profit,
+        "time_weight": np.maximum(TIME_WEIGHT_FLOOR, 1.0 - days_old / horizon_days),
+    }
 
-    for tip in tips:
-        odds = _resolve_tip_odds(tip, odds_by_match)
-        stake, profit, is_win, odds = _tip_profit_and_stake(
-            tip,
-            dna,
-            bankroll=bankroll,
-            odds=odds,
-        )
-        if stake <= 0.0:
-            continue
-        bankroll_before = bankroll
-        total_bets += 1
-        if is_win:
-            wins += 1
-        bankroll += profit
-        raw_match_date = tip.get("match_date")
-        if raw_match_date is None:
-            continue
-        match_date = ensure_utc(raw_match_date)
-        time_weight = _time_weight(
-            match_date,
-            reference_now=reference_now,
-            lookback_years=strategy_lookback_years,
-        )
-        weighted_staked += stake * time_weight
-        weighted_profit += profit * time_weight
-        points.append(
-            {
-                "date": match_date.isoformat(),
-                "bankroll": round(bankroll, 4),
-                "is_win": bool(is_win),
-                "stake": round(stake, 4),
-                "match_id": tip.get("match_id"),
-            }
+
+def _summary(
+    curve: dict[str, np.ndarray],
+    stats: dict[str, np.ndarray],
+    starting_bankroll: float,
+) -> dict[str, Any]:
+    total_bets = len(curve["stake"])
+    wins = int(curve["is_win"].sum())
+    ending_bankroll = float(stats["bankroll_after"][-1]) if total_bets else float(starting_bankroll)
+    weighted_staked = float(np.dot(curve["stake"], stats["time_weight"]))
+    weighted_profit = float(np.dot(stats["profit"], stats["time_weight"]))
+    win_rate = (wins / total_bets) if total_bets else 0.0
+    weighted_roi = (weighted_profit / weighted_staked) if weighted_staked > 0 else 0.0
+    return {
+        "starting_bankroll": float(starting_bankroll),
+        "ending_bankroll": round(ending_bankroll, 4),
+        "total_bets": total_bets,
+        "wins": wins,
+        "win_rate": round(win_rate, 6),
+        "weighted_roi": round(float(weighted_roi), 6),
+        "weighted_profit": round(float(weighted_profit), 4),
+        "weighted_staked": round(float(weighted_staked), 4),
+    }
+
+
+async def load_backtest_curve(
+    strategy: dict[str, Any],
+    *,
+    starting_bankroll: float = DEFAULT_BANKROLL,
+    since_date: str | None = None,
+    dataset: dict | None = None,
+) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """(bet curve, window metadata) for a strategy, served from ``qbot_backtests``.
+
+    Reuses the persisted curve when the strategy and its window rows are
+    unchanged, extends it when only later tips were added, and recomputes
+    otherwise; the (possibly new) curve and its summary are written back.
+    Ad-hoc *since_date* windows (neither the default nor the current season
+    window) are simulated without touching ``qbot_backtests``.
+    Pass *dataset* to share one tip dataset across strategies of a league;
+    without it the published dataset version is opened (the qbot_backtests
+    worker refreshes it), raising ``TipDatasetUnavailable`` if there is none.
+    """
+    from app.services.tip_dataset_cache import open_tip_dataset
+
+    sport_key = strategy.get("sport_key", "all")
+    if dataset is None:
+        dataset = await open_tip_dataset(None if sport_key in (None, "", "all") else sport_key)
+    cols = dataset["columns"]
+    idx, window_meta = _select_window(strategy, cols, since_date)
+    match_us = np.asarray(cols["match_us"])
+    dna = strategy.get("dna", {}) or {}
+
+    strategy_id = str(strategy.get("_id"))
+    window_key = _window_key(since_date)
+    doc_id = f"{strategy_id}:{window_key}:{float(starting_bankroll):g}"
+    fingerprint = strategy_fingerprint(strategy)
+    if not _persisted_window(window_key):
+        return await _simulate_rows(cols, idx, dna, starting_bankroll), window_meta
+
+    cached = await _db.db.qbot_backtests.find_one({"_id": doc_id})
+    if (
+        cached
+        and cached.get("schema") == BACKTEST_SCHEMA
+        and cached.get("fingerprint") == fingerprint
+        and cached.get("curve") is not None
+    ):
+        curve = _decode_curve(cached["curve"])
+        if (
+            cached["dataset_key"] == dataset["key"]
+            and cached["covered_rows"] == len(idx)
+            and cached["window"] == window_meta
+        ):
+            return curve, window_meta
+
+        covered = int(cached["covered_rows"])
+        covered_until = cached["covered_until_us"]
+        extendable = (
+            covered <= len(idx)
+            and (covered == 0 or int(match_us[idx[covered - 1]]) == covered_until)
+            and (covered in (0, len(idx)) or int(match_us[idx[covered]]) > covered_until)
+            and _rows_digest(cols, idx[:covered]) == cached["digest"]
         )
+        if extendable:
+            tail = await _simulate_rows(
+                cols, idx[covered:], dna, _ending_bankroll(curve, starting_bankroll),
+            )
+            curve = {name: np.concatenate([curve[name], tail[name]]) for name in CURVE_FIELDS}
+            logger.info(
+                "Backtest %s extended: +%d rows, +%d bets",
+                doc_id, len(idx) - covered, len(tail["stake"]),
+            )
+        else:
+            curve = await _simulate_rows(cols, idx, dna, starting_bankroll)
+    else:
+        curve = await _simulate_rows(cols, idx, dna, starting_bankroll)
+
+    raw = _encode_curve(curve)
+    await _db.db.qbot_backtests.replace_one(
+        {"_id": doc_id},
+        {
+            "schema": BACKTEST_SCHEMA,
+            "strategy_id": strategy_id,
+            "window_key": window_key,
+            "starting_bankroll": float(starting_bankroll),
+            "fingerprint": fingerprint,
+            "dataset_key": dataset["key"],
+            "window": window_meta,
+            "covered_rows": int(len(idx)),
+            "covered_until_us": int(match_us[idx[-1]]) if len(idx) else None,
+            "digest": _rows_digest(cols, idx),
+            "summary": _summary(curve, _curve_stats(curve, strategy), starting_bankroll),
+            # Oversized curves are recomputed on the next run instead
+            "curve": Binary(raw) if len(raw) <= MAX_CURVE_BYTES else None,
+            "computed_at": utcnow(),
+        },
+        upsert=True,
+    )
+    return curve, window_meta
+
+
+async def load_backtest_summaries(
+    strategies: list[dict[str, Any]],
+    *,
+    since_date: str | None = None,
+    starting_bankroll: float = DEFAULT_BANKROLL,
+) -> dict[str, dict[str, Any]]:
+    """Persisted backtest summaries by strategy id (current fingerprints only)."""
+    fingerprints = {str(s["_id"]): strategy_fingerprint(s) for s in strategies}
+    docs = await _db.db.qbot_backtests.find(
+        {
+            "strategy_id": {"$in": list(fingerprints)},
+            "window_key": _window_key(since_date),
+            "starting_bankroll": float(starting_bankroll),
+        },
+        {"curve": 0, "digest": 0},
+    ).to_list(length=len(fingerprints))
+    return {
+        d["strategy_id"]: {
+            **d["summary"],
+            "window": d.get("window", {}),
+            "computed_at": ensure_utc(d["computed_at"]).isoformat(),
+        }
+        for d in docs
+        if fingerprints.get(d["strategy_id"]) == d.get("fingerprint")
+    }
+
+
+# ---------------------------------------------------------------------------
+# Endpoint payloads
+# ---------------------------------------------------------------------------
+
+async def _ledger_page(
+    curve: dict[str, np.ndarray],
+    stats: dict[str, np.ndarray],
+    rows: np.ndarray,
+) -> list[dict[str, Any]]:
+    """Ledger rows for the given bet positions (team names fetched per page)."""
+    match_ids = curve["match_id"][rows].tolist()
+    teams: dict[str, dict] = {}
+    if match_ids:
+        docs = await _db.db.quotico_tips.find(
+            {"match_id": {"$in": sorted(set(match_ids))}},
+            {"_id": 0, "match_id": 1, "home_team": 1, "away_team": 1},
+        ).to_list(length=None)
+        teams = {str(d["match_id"]): d for d in docs}
+
+    ledger: list[dict[str, Any]] = []
+    for j, match_id, date in zip(rows.tolist(), match_ids, _iso_dates(curve["match_us"][rows])):
+        stake = float(curve["stake"][j])
+        profit = float(stats["profit"][j])
+        time_weight = float(stats["time_weight"][j])
+        tip = teams.get(match_id, {})
         ledger.append(
             {
-                "date": match_date.isoformat(),
+                "date": date,
                 "match": f"{tip.get('home_team', '-')} vs. {tip.get('away_team', '-')}",
                 "home_team": tip.get("home_team"),
                 "away_team": tip.get("away_team"),
-                "edge_pct": round(float(tip.get("edge_pct", 0.0)), 4),
-                "odds": round(float(odds), 4),
-                "stake": round(float(stake), 4),
-                "result": "win" if is_win else "loss",
-                "net_profit": round(float(profit), 4),
-                "bankroll_before": round(float(bankroll_before), 4),
-                "bankroll_after": round(float(bankroll), 4),
-                "selection": tip.get("recommended_selection"),
-                "match_id": tip.get("match_id"),
-                "time_weight": round(float(time_weight), 4),
-                "weighted_net_profit": round(float(profit * time_weight), 4),
+                "edge_pct": round(float(curve["edge_pct"][j]), 4),
+                "odds": round(float(curve["odds"][j]), 4),
+                "stake": round(stake, 4),
+                "result": "win" if curve["is_win"][j] else "loss",
+                "net_profit": round(profit, 4),
+                "bankroll_before": round(float(curve["bankroll_before"][j]), 4),
+                "bankroll_after": round(float(stats["bankroll_after"][j]), 4),
+                "selection": _PICKS[int(curve["pick"][j])],
+                "match_id": match_id,
+                "time_weight": round(time_weight, 4),
+                "weighted_net_profit": round(profit * time_weight, 4),
             }
         )
+    return ledger
+
+
+async def simulate_strategy_backtest(
+    strategy: dict[str, Any],
+    *,
+    starting_bankroll: float = DEFAULT_BANKROLL,
+    limit_ledger: int | None = None,
+    ledger_offset: int = 0,
+    include_ledger: bool = True,
+    since_date: str | None = None,
+) -> dict[str, Any]:
+    """Simulate full-history bankroll curve for a strategy document.
+
+    The ledger is newest-first; only rows ``[ledger_offset, ledger_offset +
+    limit_ledger)`` are built (all remaining rows when *limit_ledger* is None),
+    and none when *include_ledger* is False.
+    """
+    sport_key = strategy.get("sport_key", "all")
+    dna = strategy.get("dna", {}) or {}
+    if not dna:
+        return {
+            "strategy_id": str(strategy.get("_id")),
+            "sport_key": sport_key,
+            "starting_bankroll": starting_bankroll,
+            "ending_bankroll": starting_bankroll,
+            "total_bets": 0,
+            "wins": 0,
+            "win_rate": 0.0,
+            "points": [],
+            "ledger": [],
+            "ledger_total": 0,
+            "ledger_offset": max(ledger_offset, 0),
+            "window": {},
+        }
+
+    curve, window_meta = await load_backtest_curve(
+        strategy, starting_bankroll=starting_bankroll, since_date=since_date,
+    )
+    stats = _curve_stats(curve, strategy)
+
+    points = [
+        {
+            "date": date,
+            "bankroll": b,
+            "is_win": w,
+            "stake": s,
+            "match_id": mid,
+        }
+        for date, b, w, s, mid in zip(
+            _iso_dates(curve["match_us"]),
+            np.round(stats["bankroll_after"], 4).tolist(),
+            curve["is_win"].tolist(),
+            np.round(curve["stake"], 4).tolist(),
+            curve["match_id"].tolist(),
+        )
+    ]
+
+    total_bets = len(curve["stake"])
+    ledger: list[dict[str, Any]] = []
+    if include_ledger and 0 <= ledger_offset < total_bets:
+        start = total_bets - 1 - ledger_offset
+        stop = -1
+        if limit_ledger is not None and limit_ledger > 0:
+            stop = max(start - limit_ledger, -1)
+        ledger = await _ledger_page(curve, stats, np.arange(start, stop, -1))
 
-    win_rate = (wins / total_bets) if total_bets else 0.0
-    weighted_roi = (weighted_profit / weighted_staked) if weighted_staked > 0 else 0.0
-    ledger = list(reversed(ledger))
-    if limit_ledger is not None and limit_ledger > 0:
-        ledger = ledger[:limit_ledger]
     return {
         "strategy_id": str(strategy.get("_id")),
         "sport_key": sport_key,
-        "starting_bankroll": float(starting_bankroll),
-        "ending_bankroll": round(bankroll, 4),
-        "total_bets": total_bets,
-        "wins": wins,
-        "win_rate": round(win_rate, 6),
-        "weighted_roi": round(float(weighted_roi), 6),
-        "weighted_profit": round(float(weighted_profit), 4),
-        "weighted_staked": round(float(weighted_staked), 4),
+        **_summary(curve, stats, starting_bankroll),
         "points": points,
         "ledger": ledger,
+        "ledger_total": total_bets,
+        "ledger_offset": max(ledger_offset, 0),
         "window": window_meta,
     }
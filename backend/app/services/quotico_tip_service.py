@@ -5,22 +5,32 @@ sharp line-movement detection, and community consensus ("King's Choice")
 to identify value bets where bookmaker odds are mispriced.
 """
 
+import asyncio
 import logging
 import math
 import time as _time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, TypedDict
 
 import numpy as np
 
 from pydantic import BaseModel
 
 import app.database as _db
+from app.config import settings
 from app.services.historical_service import (
     build_match_context,
     sport_keys_for,
 )
+from app.services.odds_snapshot_service import load_odds_snapshots
 from app.services.team_mapping_service import resolve_team_key
+from app.services.team_rating_service import (
+    HistoryTruncated,
+    first_usable_odds,
+    load_team_ratings,
+    rating_matches,
+)
+from app.services.tip_feature_store import OutsideLoadedWindow, TipFeatureStore
 from app.utils import ensure_utc, utcnow
 
 logger = logging.getLogger("quotico.quotico_tip")
@@ -295,6 +305,71 @@ def _dixon_coles_adjustment(
 
 _FACTORIAL_LUT = np.array([math.factorial(k) for k in range(20)], dtype=np.float64)
 
+TOTALS_LINE_DEFAULT = 2.5    # Over/Under line for the totals marginal
+
+
+def compute_score_matrices(
+    lambda_home: np.ndarray | float,
+    lambda_away: np.ndarray | float,
+    rho: np.ndarray | float = DIXON_COLES_RHO_DEFAULT,
+    *,
+    max_goals: int = SCORELINE_MAX,
+    totals_line: float = TOTALS_LINE_DEFAULT,
+) -> dict[str, np.ndarray]:
+    """Batched Dixon-Coles score matrices + market marginals for N fixtures.
+
+    Inputs are scalars or 1-D arrays, broadcast against each other. Returns
+    ``matrix`` of shape (N, max_goals, max_goals), renormalized per fixture,
+    plus per-fixture arrays ``prob_home``, ``prob_draw``, ``prob_away``,
+    ``prob_over``, ``prob_under`` and ``prob_btts``.
+
+    Same math as ``_poisson_pmf`` × ``_dixon_coles_adjustment`` cell by cell,
+    evaluated for every fixture and scoreline in one pass.
+    """
+    lh, la, r = (
+        np.array(a, dtype=np.float64)
+        for a in np.broadcast_arrays(
+            np.atleast_1d(np.asarray(lambda_home, dtype=np.float64)),
+            np.atleast_1d(np.asarray(lambda_away, dtype=np.float64)),
+            np.atleast_1d(np.asarray(rho, dtype=np.float64)),
+        )
+    )
+    # λ <= 0 degenerates to P(X=0) = 1 (matches _poisson_pmf)
+    np.maximum(lh, 0.0, out=lh)
+    np.maximum(la, 0.0, out=la)
+
+    goals = np.arange(max_goals)
+    factorials = _FACTORIAL_LUT[:max_goals]
+    home_pmf = np.exp(-lh)[:, None] * (lh[:, None] ** goals) / factorials
+    away_pmf = np.exp(-la)[:, None] * (la[:, None] ** goals) / factorials
+    matrix = home_pmf[:, :, None] * away_pmf[:, None, :]
+
+    # Dixon-Coles correction on low scorelines
+    matrix[:, 0, 0] *= np.maximum(1 - lh * la * r, DIXON_COLES_ADJ_FLOOR)
+    matrix[:, 1, 0] *= np.maximum(1 + la * r, DIXON_COLES_ADJ_FLOOR)
+    matrix[:, 0, 1] *= np.maximum(1 + lh * r, DIXON_COLES_ADJ_FLOOR)
+    matrix[:, 1, 1] *= np.maximum(1 - r, DIXON_COLES_ADJ_FLOOR)
+    np.maximum(matrix, 0.0, out=matrix)
+
+    # Renormalize — Dixon-Coles correction shifts probability mass
+    total = matrix.sum(axis=(1, 2))
+    matrix /= np.where(total > 0, total, 1.0)[:, None, None]
+
+    home_goals = goals[:, None]
+    away_goals = goals[None, :]
+    over_mask = (home_goals + away_goals) > totals_line
+    prob_over = matrix[:, over_mask].sum(axis=1)
+
+    return {
+        "matrix": matrix,
+        "prob_home": matrix[:, home_goals > away_goals].sum(axis=1),
+        "prob_draw": np.trace(matrix, axis1=1, axis2=2),
+        "prob_away": matrix[:, home_goals < away_goals].sum(axis=1),
+        "prob_over": prob_over,
+        "prob_under": matrix.sum(axis=(1, 2)) - prob_over,
+        "prob_btts": matrix[:, 1:, 1:].sum(axis=(1, 2)),
+    }
+
 
 def generate_score_matrix(
     lambda_home: float,
@@ -303,22 +378,9 @@ def generate_score_matrix(
     max_goals: int = 6,
 ) -> np.ndarray:
     """Dixon-Coles corrected Poisson score probability matrix (max_goals x max_goals)."""
-    goals = np.arange(max_goals)
-    home_pmf = np.exp(-lambda_home) * (lambda_home ** goals) / _FACTORIAL_LUT[:max_goals]
-    away_pmf = np.exp(-lambda_away) * (lambda_away ** goals) / _FACTORIAL_LUT[:max_goals]
-    matrix = np.outer(home_pmf, away_pmf)
-
-    # Dixon-Coles correction on low scorelines
-    matrix[0, 0] *= max(1 - lambda_home * lambda_away * rho, DIXON_COLES_ADJ_FLOOR)
-    matrix[1, 0] *= max(1 + lambda_away * rho, DIXON_COLES_ADJ_FLOOR)
-    matrix[0, 1] *= max(1 + lambda_home * rho, DIXON_COLES_ADJ_FLOOR)
-    matrix[1, 1] *= max(1 - rho, DIXON_COLES_ADJ_FLOOR)
-
-    matrix = np.maximum(matrix, 0.0)
-    total = matrix.sum()
-    if total > 0:
-        matrix /= total
-    return matrix
+    return compute_score_matrices(
+        lambda_home, lambda_away, rho, max_goals=max_goals,
+    )["matrix"][0]
 
 
 def compute_player_prediction(poisson: dict) -> dict:
@@ -341,22 +403,32 @@ def compute_player_prediction(poisson: dict) -> dict:
     }
 
 
-async def _get_rest_days(team_key: str, match_date: datetime) -> int:
+async def _get_rest_days(
+    team_key: str, match_date: datetime,
+    *, features: TipFeatureStore | None = None,
+) -> int:
     """Compute days since last competitive match (across ALL competitions)."""
-    last_match = await _db.db.matches.find_one(
-        {
-            "$or": [{"home_team_key": team_key}, {"away_team_key": team_key}],
-            "status": "final",
-            "match_date": {"$lt": ensure_utc(match_date)},
-        },
-        {"match_date": 1},
-        sort=[("match_date", -1)],
-    )
+    if features is not None:
+        try:
+            last_date = features.last_match_date(team_key, ensure_utc(match_date))
+        except OutsideLoadedWindow:
+            features = None  # beyond the store's live window
+    if features is None:
+        last_match = await _db.db.matches.find_one(
+            {
+                "$or": [{"home_team_key": team_key}, {"away_team_key": team_key}],
+                "status": "final",
+                "match_date": {"$lt": ensure_utc(match_date)},
+            },
+            {"match_date": 1},
+            sort=[("match_date", -1)],
+        )
+        last_date = last_match["match_date"] if last_match else None
 
-    if not last_match:
+    if not last_date:
         return REST_DEFAULT_DAYS
 
-    delta = ensure_utc(match_date) - ensure_utc(last_match["match_date"])
+    delta = ensure_utc(match_date) - ensure_utc(last_date)
     return max(delta.days, 0)
 
 
@@ -385,6 +457,7 @@ async def _get_league_averages(
     related_keys: list[str],
     *,
     before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
 ) -> tuple[float, float] | None:
     """Compute league average home/away goals from last 2 seasons of historical data.
 
@@ -392,21 +465,29 @@ async def _get_league_averages(
     Falls back to related_keys if the single league has < 50 matches.
     """
     for filter_keys in ([sport_key], related_keys):
-        match_filter: dict = {"sport_key": {"$in": filter_keys}, "status": "final"}
-        if before_date:
-            match_filter["match_date"] = {"$lt": before_date}
-        pipeline = [
-            {"$match": match_filter},
-            {"$sort": {"match_date": -1}},
-            {"$limit": 1000},  # ~2 seasons of top-flight football
-            {"$group": {
-                "_id": None,
-                "total_home": {"$sum": "$result.home_score"},
-                "total_away": {"$sum": "$result.away_score"},
-                "count": {"$sum": 1},
-            }},
-        ]
-        results = await _db.db.matches.aggregate(pipeline).to_list(length=1)
+        use_store = features is not None
+        if use_store:
+            try:
+                totals = features.league_goal_totals(filter_keys, limit=1000, before_date=before_date)
+                results = [totals] if totals else []
+            except OutsideLoadedWindow:
+                use_store = False  # beyond the store's live window
+        if not use_store:
+            match_filter: dict = {"sport_key": {"$in": filter_keys}, "status": "final"}
+            if before_date:
+                match_filter["match_date"] = {"$lt": before_date}
+            pipeline = [
+                {"$match": match_filter},
+                {"$sort": {"match_date": -1}},
+                {"$limit": 1000},  # ~2 seasons of top-flight football
+                {"$group": {
+                    "_id": None,
+                    "total_home": {"$sum": "$result.home_score"},
+                    "total_away": {"$sum": "$result.away_score"},
+                    "count": {"$sum": 1},
+                }},
+            ]
+            results = await _db.db.matches.aggregate(pipeline).to_list(length=1)
         if results and results[0]["count"] >= 50:
             count = results[0]["count"]
             return (
@@ -420,8 +501,25 @@ async def _get_league_averages(
 async def _get_team_home_matches(
     team_key: str, related_keys: list[str], limit: int = N_TEAM_MATCHES,
     *, before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+    ratings: dict[str, list[dict]] | None = None,
 ) -> list[dict]:
     """Fetch team's last N home matches (goals scored/conceded)."""
+    if features is not None:
+        try:
+            return features.team_matches(
+                team_key, related_keys, venue="home", limit=limit, before_date=before_date,
+            )
+        except OutsideLoadedWindow:
+            pass  # beyond the store's live window
+    if ratings is not None:
+        try:
+            return rating_matches(
+                ratings[team_key], team_key, related_keys,
+                venue="home", limit=limit, before_date=before_date,
+            )
+        except HistoryTruncated:
+            pass  # older than the capped rating history
     query: dict = {"home_team_key": team_key, "sport_key": {"$in": related_keys}, "status": "final"}
     if before_date:
         query["match_date"] = {"$lt": before_date}
@@ -435,8 +533,25 @@ async def _get_team_home_matches(
 async def _get_team_away_matches(
     team_key: str, related_keys: list[str], limit: int = N_TEAM_MATCHES,
     *, before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+    ratings: dict[str, list[dict]] | None = None,
 ) -> list[dict]:
     """Fetch team's last N away matches (goals scored/conceded)."""
+    if features is not None:
+        try:
+            return features.team_matches(
+                team_key, related_keys, venue="away", limit=limit, before_date=before_date,
+            )
+        except OutsideLoadedWindow:
+            pass  # beyond the store's live window
+    if ratings is not None:
+        try:
+            return rating_matches(
+                ratings[team_key], team_key, related_keys,
+                venue="away", limit=limit, before_date=before_date,
+            )
+        except HistoryTruncated:
+            pass  # older than the capped rating history
     query: dict = {"away_team_key": team_key, "sport_key": {"$in": related_keys}, "status": "final"}
     if before_date:
         query["match_date"] = {"$lt": before_date}
@@ -456,6 +571,8 @@ async def compute_poisson_probabilities(
     match_date: datetime,
     h2h_lambdas: dict | None = None,
     before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+    ratings: dict[str, list[dict]] | None = None,
 ) -> Optional[dict]:
     """Compute Dixon-Coles-adjusted Poisson probabilities for 1/X/2 outcomes.
 
@@ -465,7 +582,9 @@ async def compute_poisson_probabilities(
     # Load calibrated (or default) parameters for this league
     params = await _get_engine_params(sport_key)
 
-    league_avgs = await _get_league_averages(sport_key, related_keys, before_date=before_date)
+    league_avgs = await _get_league_averages(
+        sport_key, related_keys, before_date=before_date, features=features,
+    )
     if not league_avgs:
         return None
 
@@ -475,8 +594,12 @@ async def compute_poisson_probabilities(
         return None
 
     # Fetch team-specific data
-    home_home_matches = await _get_team_home_matches(home_team_key, related_keys, before_date=before_date)
-    away_away_matches = await _get_team_away_matches(away_team_key, related_keys, before_date=before_date)
+    home_home_matches = await _get_team_home_matches(
+        home_team_key, related_keys, before_date=before_date, features=features, ratings=ratings,
+    )
+    away_away_matches = await _get_team_away_matches(
+        away_team_key, related_keys, before_date=before_date, features=features, ratings=ratings,
+    )
 
     if len(home_home_matches) < MIN_MATCHES_REQUIRED or len(away_away_matches) < MIN_MATCHES_REQUIRED:
         return None
@@ -523,8 +646,8 @@ async def compute_poisson_probabilities(
         lambda_away = global_weight * lambda_away + h2h_weight_used * h2h_lambdas["lambda_away"]
 
     # Rest advantage: reduce expected goals for fatigued team
-    home_rest = await _get_rest_days(home_team_key, ensure_utc(match_date))
-    away_rest = await _get_rest_days(away_team_key, ensure_utc(match_date))
+    home_rest = await _get_rest_days(home_team_key, ensure_utc(match_date), features=features)
+    away_rest = await _get_rest_days(away_team_key, ensure_utc(match_date), features=features)
     home_mod, away_mod = _calculate_fatigue_penalty(home_rest, away_rest)
     lambda_home *= home_mod
     lambda_away *= away_mod
@@ -532,26 +655,12 @@ async def compute_poisson_probabilities(
     lambda_home = min(lambda_home, LAMBDA_CAP)
     lambda_away = min(lambda_away, LAMBDA_CAP)
 
-    # Build Dixon-Coles corrected scoreline probability matrix
+    # Dixon-Coles corrected scoreline probabilities
     rho = params["rho"]
-    matrix = [[0.0] * SCORELINE_MAX for _ in range(SCORELINE_MAX)]
-    for i in range(SCORELINE_MAX):
-        for j in range(SCORELINE_MAX):
-            prob = _poisson_pmf(i, lambda_home) * _poisson_pmf(j, lambda_away)
-            adj = _dixon_coles_adjustment(i, j, lambda_home, lambda_away, rho)
-            matrix[i][j] = max(prob * adj, 0.0)
-
-    # Renormalize — Dixon-Coles correction shifts probability mass
-    total_prob = sum(matrix[i][j] for i in range(SCORELINE_MAX) for j in range(SCORELINE_MAX))
-    if total_prob > 0:
-        for i in range(SCORELINE_MAX):
-            for j in range(SCORELINE_MAX):
-                matrix[i][j] /= total_prob
-
-    prob_home = sum(matrix[i][j] for i in range(SCORELINE_MAX) for j in range(SCORELINE_MAX) if i > j)
-    prob_draw = sum(matrix[i][i] for i in range(SCORELINE_MAX))
-    prob_away = sum(matrix[i][j] for i in range(SCORELINE_MAX) for j in range(SCORELINE_MAX) if i < j)
-
+    scores = compute_score_matrices(lambda_home, lambda_away, rho)
+    prob_home = float(scores["prob_home"][0])
+    prob_draw = float(scores["prob_draw"][0])
+    prob_away = float(scores["prob_away"][0])
     # xG performance: actual goals vs xG across recent matches per team
     def _xg_perf(matches: list[dict], is_home: bool) -> dict:
         goals_key = "home_score" if is_home else "away_score"
@@ -600,6 +709,8 @@ async def compute_poisson_probabilities(
         "prob_home": prob_home,
         "prob_draw": prob_draw,
         "prob_away": prob_away,
+        "prob_over": float(scores["prob_over"][0]),
+        "prob_btts": float(scores["prob_btts"][0]),
         "h2h_weight": h2h_weight_used,
         "home_rest_days": home_rest,
         "away_rest_days": away_rest,
@@ -676,6 +787,7 @@ async def compute_momentum_score(
     related_keys: list[str],
     *,
     before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
 ) -> dict:
     """Compute weighted form/momentum score for a team."""
     if not form_matches:
@@ -698,7 +810,9 @@ async def compute_momentum_score(
             points = 3 if ag > hg else (1 if ag == hg else 0)
 
         # Opponent strength weight from historical odds
-        opponent_weight = await _get_opponent_strength_weight(m, team_key, related_keys, before_date=before_date)
+        opponent_weight = await _get_opponent_strength_weight(
+            m, team_key, related_keys, before_date=before_date, features=features,
+        )
 
         recency_w = MOMENTUM_DECAY ** i
         combined_w = recency_w * opponent_weight
@@ -718,6 +832,7 @@ async def compute_momentum_score(
 async def _get_opponent_strength_weight(
     match: dict, team_key: str, related_keys: list[str],
     *, before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
 ) -> float:
     """Estimate opponent strength from their historical odds."""
     h_key = match.get("home_team_key", "")
@@ -727,20 +842,34 @@ async def _get_opponent_strength_weight(
         return 1.0
 
     # Look up the opponent's recent average odds (as home favorite indicator)
-    opp_query: dict = {
-        "sport_key": {"$in": related_keys},
-        "status": "final",
-        "$or": [{"home_team_key": opponent_key}, {"away_team_key": opponent_key}],
-        "odds.bookmakers": {"$ne": None},
-    }
-    if before_date:
-        opp_query["match_date"] = {"$lt": before_date}
-    recent = await _db.db.matches.find_one(
-        opp_query,
-        {"odds.bookmakers": 1},
-        sort=[("match_date", -1)],
-    )
+    if features is not None:
+        try:
+            recent_with_odds = features.matches_with_odds(
+                opponent_key, related_keys, limit=1, before_date=before_date,
+            )
+            recent = recent_with_odds[0] if recent_with_odds else None
+        except OutsideLoadedWindow:
+            features = None  # beyond the store's live window
+    if features is None:
+        opp_query: dict = {
+            "sport_key": {"$in": related_keys},
+            "status": "final",
+            "$or": [{"home_team_key": opponent_key}, {"away_team_key": opponent_key}],
+            "odds.bookmakers": {"$ne": None},
+        }
+        if before_date:
+            opp_query["match_date"] = {"$lt": before_date}
+        recent = await _db.db.matches.find_one(
+            opp_query,
+            {"odds.bookmakers": 1},
+            sort=[("match_date", -1)],
+        )
+
+    return _opponent_weight_from_odds(recent)
 
+
+def _opponent_weight_from_odds(recent: dict | None) -> float:
+    """Map the opponent's latest bookmaker home odds to a form weight."""
     if not recent or not recent.get("odds", {}).get("bookmakers"):
         return 1.0
 
@@ -763,13 +892,150 @@ async def _get_opponent_strength_weight(
 # Tier 3: Sharp movement detection
 # ---------------------------------------------------------------------------
 
-async def detect_sharp_movement(
-    match_id: str,
-    commence_time: Optional[datetime] = None,
-    *,
-    before_date: datetime | None = None,
-) -> dict:
-    """Analyze odds snapshots for significant line movement."""
+class LineMovementState(TypedDict):
+    """Incremental line-movement state for one match (``line_movement`` doc).
+
+    Advanced in O(1) per snapshot by advance_line_movement(); holds exactly
+    what line_movement_signals() needs, so a tip never re-scans the series.
+    *last_moves* are the per-outcome moves of the latest interval (only for
+    outcomes priced > 0 on both ends), kept for reversal detection.
+    """
+    opening: dict[str, float]
+    current: dict[str, float]
+    last_moves: dict[str, float]
+    snapshot_count: int
+    last_snapshot_at: datetime | None
+    steam_outcome: str | None
+    steam_drop_pct: float
+    reversal_outcome: str | None
+    late_cutoff: datetime | None
+    late_open: dict[str, float] | None
+    late_count: int
+
+
+def new_line_movement_state(commence_time: Optional[datetime] = None) -> LineMovementState:
+    """Empty state; *commence_time* enables late-money tracking."""
+    return {
+        "opening": {},
+        "current": {},
+        "last_moves": {},
+        "snapshot_count": 0,
+        "last_snapshot_at": None,
+        "steam_outcome": None,
+        "steam_drop_pct": 0.0,
+        "reversal_outcome": None,
+        "late_cutoff": _late_cutoff(commence_time),
+        "late_open": None,
+        "late_count": 0,
+    }
+
+
+def _late_cutoff(commence_time: Optional[datetime]) -> datetime | None:
+    if commence_time is None:
+        return None
+    return ensure_utc(commence_time) - timedelta(hours=LATE_MONEY_HOURS)
+
+
+def late_window_moved(state: LineMovementState, commence_time: Optional[datetime]) -> bool:
+    """Whether *commence_time* puts the late-money window somewhere else."""
+    cutoff = _late_cutoff(commence_time)
+    previous = state["late_cutoff"]
+    if previous is None or cutoff is None:
+        return (previous is None) != (cutoff is None)
+    return ensure_utc(previous) != cutoff
+
+
+def reschedule_line_movement(
+    state: LineMovementState,
+    commence_time: Optional[datetime],
+    snapshots: list[dict],
+) -> None:
+    """Move the late-money window to a new kickoff time (in place).
+
+    The late-money fields are rebuilt from *snapshots* (the match's stored
+    series before the next snapshot, oldest first), so the state matches a
+    replay against the new schedule.
+    """
+    state["late_cutoff"] = cutoff = _late_cutoff(commence_time)
+    state["late_open"] = None
+    state["late_count"] = 0
+    if cutoff is None:
+        return
+    for snap in snapshots:
+        if ensure_utc(snap["snapshot_at"]) >= cutoff:
+            if state["late_count"] == 0:
+                state["late_open"] = snap["odds"]
+            state["late_count"] += 1
+
+
+def advance_line_movement(
+    state: LineMovementState, odds: dict[str, float], snapshot_at: datetime,
+) -> tuple[str, float] | None:
+    """Fold one snapshot into *state* (in place).
+
+    Returns ``(outcome, drop_pct)`` when this interval alone is a steam move
+    (single-interval drop >= STEAM_VELOCITY_PCT), else None.
+    """
+    steam_now: tuple[str, float] | None = None
+    if state["snapshot_count"] == 0:
+        state["opening"] = odds
+    else:
+        current = state["current"]
+
+        # Steam velocity: largest single-interval drop so far
+        for outcome, val_curr in current.items():
+            if val_curr <= 0:
+                continue
+            interval_drop = ((val_curr - odds.get(outcome, val_curr)) / val_curr) * 100
+            if interval_drop > state["steam_drop_pct"]:
+                state["steam_drop_pct"] = interval_drop
+                state["steam_outcome"] = outcome
+            if interval_drop >= STEAM_VELOCITY_PCT and (
+                steam_now is None or interval_drop > steam_now[1]
+            ):
+                steam_now = (outcome, interval_drop)
+
+        # Reversal: previous move flipped sign with a large enough swing
+        if state["reversal_outcome"] is None:
+            for outcome, move_1 in state["last_moves"].items():
+                curr_val = current[outcome]
+                move_2 = odds.get(outcome, 0) - curr_val
+                if (move_1 > 0 and move_2 < 0) or (move_1 < 0 and move_2 > 0):
+                    if abs(move_2 / curr_val) * 100 >= REVERSAL_THRESHOLD_PCT:
+                        state["reversal_outcome"] = outcome
+                        break
+
+        state["last_moves"] = {
+            outcome: val - current.get(outcome, 0)
+            for outcome, val in odds.items()
+            if current.get(outcome, 0) > 0 and val > 0
+        }
+
+    # Late money: first snapshot inside the pre-kickoff window
+    late_cutoff = state["late_cutoff"]
+    if late_cutoff is not None and ensure_utc(snapshot_at) >= ensure_utc(late_cutoff):
+        if state["late_count"] == 0:
+            state["late_open"] = odds
+        state["late_count"] += 1
+
+    state["current"] = odds
+    state["snapshot_count"] += 1
+    state["last_snapshot_at"] = snapshot_at
+    return steam_now
+
+
+def replay_line_movement(
+    snapshots: list[dict], commence_time: Optional[datetime] = None,
+) -> LineMovementState:
+    """Build the state from chronologically sorted snapshots."""
+    state = new_line_movement_state(commence_time)
+    for snap in snapshots:
+        advance_line_movement(state, snap["odds"], snap["snapshot_at"])
+    return state
+
+
+def line_movement_signals(state: LineMovementState) -> dict:
+    """Sharp/steam/reversal signals from a line-movement state."""
     default = {
         "has_sharp_movement": False,
         "direction": None,
@@ -785,19 +1051,12 @@ async def detect_sharp_movement(
         "snapshot_count": 0,
     }
 
-    snap_query: dict = {"match_id": match_id}
-    if before_date:
-        snap_query["snapshot_at"] = {"$lt": before_date}
-    snapshots = await _db.db.odds_snapshots.find(
-        snap_query,
-    ).sort("snapshot_at", 1).to_list(length=200)
-
-    if len(snapshots) < 3:
-        default["snapshot_count"] = len(snapshots)
+    if state["snapshot_count"] < 3:
+        default["snapshot_count"] = state["snapshot_count"]
         return default
 
-    opening = snapshots[0]["odds"]
-    current = snapshots[-1]["odds"]
+    opening = state["opening"]
+    current = state["current"]
 
     # --- Signal 1: Sharp movement (opening vs current) ---
     max_drop = 0.0
@@ -817,66 +1076,19 @@ async def detect_sharp_movement(
 
     # Late money check
     is_late = False
-    if has_sharp and commence_time:
-        commence_time = ensure_utc(commence_time)
-        late_cutoff = commence_time - timedelta(hours=LATE_MONEY_HOURS)
-        late_snapshots = [s for s in snapshots if ensure_utc(s["snapshot_at"]) >= late_cutoff]
-        if len(late_snapshots) >= 2 and direction:
-            late_open = late_snapshots[0]["odds"].get(direction, 0)
-            late_curr = late_snapshots[-1]["odds"].get(direction, 0)
-            if late_open > 0:
-                late_drop = ((late_open - late_curr) / late_open) * 100
-                is_late = late_drop > SHARP_DROP_PCT * 0.5
+    if has_sharp and state["late_count"] >= 2 and direction:
+        late_open = state["late_open"].get(direction, 0)
+        late_curr = current.get(direction, 0)
+        if late_open > 0:
+            late_drop = ((late_open - late_curr) / late_open) * 100
+            is_late = late_drop > SHARP_DROP_PCT * 0.5
 
     # --- Signal 2: Steam velocity (single-interval whale moves) ---
-    has_steam = False
-    steam_outcome = None
-    steam_drop_pct = 0.0
-
-    for i in range(len(snapshots) - 1):
-        s_curr = snapshots[i]["odds"]
-        s_next = snapshots[i + 1]["odds"]
-        for outcome in s_curr:
-            val_curr = s_curr[outcome]
-            val_next = s_next.get(outcome, val_curr)
-            if val_curr <= 0:
-                continue
-            interval_drop = ((val_curr - val_next) / val_curr) * 100
-            if interval_drop > steam_drop_pct:
-                steam_drop_pct = interval_drop
-                steam_outcome = outcome
-        if steam_drop_pct >= STEAM_VELOCITY_PCT:
-            has_steam = True
-
-    if steam_drop_pct < STEAM_VELOCITY_PCT:
-        steam_outcome = None
-        steam_drop_pct = 0.0
+    steam_drop_pct = state["steam_drop_pct"]
+    has_steam = steam_drop_pct >= STEAM_VELOCITY_PCT
 
     # --- Signal 3: Reversal detection (direction flip) ---
-    has_reversal = False
-    reversal_outcome = None
-
-    for i in range(1, len(snapshots) - 1):
-        s_prev = snapshots[i - 1]["odds"]
-        s_curr = snapshots[i]["odds"]
-        s_next = snapshots[i + 1]["odds"]
-        for outcome in s_curr:
-            prev_val = s_prev.get(outcome, 0)
-            curr_val = s_curr.get(outcome, 0)
-            next_val = s_next.get(outcome, 0)
-            if prev_val <= 0 or curr_val <= 0:
-                continue
-            move_1 = curr_val - prev_val
-            move_2 = next_val - curr_val
-            # Sharp sign flip: moved one way then snapped back
-            if (move_1 > 0 and move_2 < 0) or (move_1 < 0 and move_2 > 0):
-                swing_pct = abs(move_2 / curr_val) * 100
-                if swing_pct >= REVERSAL_THRESHOLD_PCT:
-                    has_reversal = True
-                    reversal_outcome = outcome
-                    break
-        if has_reversal:
-            break
+    reversal_outcome = state["reversal_outcome"]
 
     return {
         "has_sharp_movement": has_sharp,
@@ -886,19 +1098,58 @@ async def detect_sharp_movement(
         "max_drop_pct": round(max_drop, 1),
         "is_late_money": is_late,
         "has_steam_move": has_steam,
-        "steam_outcome": steam_outcome,
-        "steam_drop_pct": round(steam_drop_pct, 1),
-        "has_reversal": has_reversal,
+        "steam_outcome": state["steam_outcome"] if has_steam else None,
+        "steam_drop_pct": round(steam_drop_pct, 1) if has_steam else 0.0,
+        "has_reversal": reversal_outcome is not None,
         "reversal_outcome": reversal_outcome,
-        "snapshot_count": len(snapshots),
+        "snapshot_count": state["snapshot_count"],
     }
 
 
+async def detect_sharp_movement(
+    match_id: str,
+    commence_time: Optional[datetime] = None,
+    *,
+    before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+) -> dict:
+    """Line-movement signals for a match.
+
+    Live tips read the persisted LineMovementState (kept current by the odds
+    poller). Backfill, and matches without a state yet, replay the snapshots.
+    """
+    if before_date is None:
+        if features is not None:
+            state = features.line_movement(match_id)
+        else:
+            state = await _db.db.line_movement.find_one({"_id": match_id}, {"_id": 0})
+        if state:
+            return line_movement_signals(state)
+
+    if features is not None:
+        snapshots = features.odds_snapshots(match_id, limit=200, before_date=before_date)
+    else:
+        series = await load_odds_snapshots([match_id], before_date=before_date, limit=200)
+        snapshots = series.get(match_id, [])
+
+    return _sharp_movement_from_snapshots(snapshots, commence_time)
+
+
+def _sharp_movement_from_snapshots(
+    snapshots: list[dict], commence_time: Optional[datetime] = None,
+) -> dict:
+    """Derive sharp/steam/reversal signals from chronologically sorted snapshots."""
+    return line_movement_signals(replay_line_movement(snapshots, commence_time))
+
+
 # ---------------------------------------------------------------------------
 # Bonus Tier: King's Choice (squad consensus)
 # ---------------------------------------------------------------------------
 
-async def compute_kings_choice(match_id: str, *, before_date: datetime | None = None) -> dict:
+async def compute_kings_choice(
+    match_id: str, *, before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+) -> dict:
     """Query bets from top-10% leaderboard users for this match."""
     default = {
         "has_kings_choice": False,
@@ -913,18 +1164,16 @@ async def compute_kings_choice(match_id: str, *, before_date: datetime | None =
     if before_date:
         return default
 
-    # Get total leaderboard size
-    total_users = await _db.db.leaderboard.count_documents({})
-    if total_users < 10:
-        return default
-
-    # Top 10% cutoff
-    top_n = max(int(total_users * 0.10), 3)
-    kings = await _db.db.leaderboard.find(
-        {}, {"user_id": 1},
-    ).sort("points", -1).limit(top_n).to_list(length=top_n)
+    if features is not None:
+        king_ids = features.king_ids()
+        if not king_ids:
+            return default
+        king_slips = features.king_slips(match_id)
+        return _kings_choice_from_slips(match_id, king_ids, king_slips)
 
-    king_ids = [k["user_id"] for k in kings]
+    # Top 10% of the leaderboard (in-memory rank index)
+    from app.services.leaderboard_service import get_king_ids
+    king_ids = await get_king_ids()
     if not king_ids:
         return default
 
@@ -938,6 +1187,22 @@ async def compute_kings_choice(match_id: str, *, before_date: datetime | None =
         {"selections": 1, "user_id": 1},
     ).to_list(length=len(king_ids))
 
+    return _kings_choice_from_slips(match_id, king_ids, king_slips)
+
+
+def _kings_choice_from_slips(
+    match_id: str, king_ids: list[str], king_slips: list[dict],
+) -> dict:
+    """Measure agreement among the kings' single slips for this match."""
+    default = {
+        "has_kings_choice": False,
+        "kings_pick": None,
+        "kings_pct": 0.0,
+        "total_kings": 0,
+        "kings_who_bet": 0,
+        "is_underdog_pick": False,
+    }
+
     if len(king_slips) < MIN_KINGS_TIPPED:
         return default
 
@@ -994,15 +1259,27 @@ async def compute_team_evd(
     n: int = N_TEAM_MATCHES,
     *,
     before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+    ratings: dict[str, list[dict]] | None = None,
 ) -> dict:
     """Compute how much a team outperforms market expectations."""
-    default = {
-        "evd": 0.0,
-        "matches_analyzed": 0,
-        "btb_count": 0,
-        "btb_ratio": 0.0,
-        "contributes": False,
-    }
+    if features is not None:
+        try:
+            matches = features.matches_with_odds(
+                team_key, related_keys, limit=n * 2, before_date=before_date,
+            )
+            return _evd_from_matches(team_key, matches, n)
+        except OutsideLoadedWindow:
+            pass  # beyond the store's live window
+    if ratings is not None:
+        try:
+            matches = rating_matches(
+                ratings[team_key], team_key, related_keys,
+                with_odds=True, limit=n * 2, before_date=before_date,
+            )
+            return _evd_from_matches(team_key, matches, n)
+        except HistoryTruncated:
+            pass  # older than the capped rating history
 
     # Fetch last n matches (home + away) that have odds data
     query: dict = {
@@ -1025,6 +1302,19 @@ async def compute_team_evd(
         },
     ).sort("match_date", -1).to_list(length=n * 2)  # fetch extra, filter below
 
+    return _evd_from_matches(team_key, matches, n)
+
+
+def _evd_from_matches(team_key: str, matches: list[dict], n: int) -> dict:
+    """Average (actual - implied) over the team's last n matches with usable odds."""
+    default = {
+        "evd": 0.0,
+        "matches_analyzed": 0,
+        "btb_count": 0,
+        "btb_ratio": 0.0,
+        "contributes": False,
+    }
+
     edges: list[float] = []
     btb_count = 0
 
@@ -1032,22 +1322,13 @@ async def compute_team_evd(
         if len(edges) >= n:
             break
 
-        # Determine perspective and extract team odds
+        # Determine perspective and extract team odds (team_ratings entries
+        # carry the first usable price precomputed)
         is_home = m.get("home_team_key") == team_key
-        odds_dict = m.get("odds", {}).get("bookmakers", {})
-
-        # Find the first bookmaker entry with usable odds
-        team_odds: float | None = None
-        for _bk, entry in odds_dict.items():
-            if not isinstance(entry, dict):
-                continue
-            if is_home:
-                team_odds = entry.get("home")
-            else:
-                team_odds = entry.get("away")
-            if team_odds and team_odds > 1.0:
-                break
-            team_odds = None
+        if "team_odds" in m:
+            team_odds = m["team_odds"]
+        else:
+            team_odds = first_usable_odds(m.get("odds", {}).get("bookmakers", {}), is_home)
 
         if not team_odds:
             continue
@@ -1292,8 +1573,15 @@ def _build_justification(
 # Orchestrator
 # ---------------------------------------------------------------------------
 
-async def generate_quotico_tip(match: dict, *, before_date: datetime | None = None) -> dict:
-    """Generate a QuoticoTip for a single match."""
+async def generate_quotico_tip(
+    match: dict, *, before_date: datetime | None = None,
+    features: TipFeatureStore | None = None,
+) -> dict:
+    """Generate a QuoticoTip for a single match.
+
+    When *features* is given, all history lookups are answered from the
+    in-memory TipFeatureStore instead of per-match Mongo queries.
+    """
     sport_key = match["sport_key"]
     current_odds = match.get("odds", {}).get("h2h", {})
 
@@ -1319,7 +1607,18 @@ async def generate_quotico_tip(match: dict, *, before_date: datetime | None = No
         return _no_signal_bet(match, f"Team not resolved: {', '.join(missing)}")
 
     # Fetch H2H + form data (needed for both Poisson blend and momentum)
-    context = await build_match_context(home_team, away_team, sport_key, h2h_limit=10, form_limit=5, before_date=before_date)
+    context = None
+    if features is not None:
+        try:
+            context = features.match_context(
+                home_key, away_key, related_keys, h2h_limit=10, form_limit=5, before_date=before_date,
+            )
+        except OutsideLoadedWindow:
+            pass  # beyond the store's live window
+    if context is None:
+        context = await build_match_context(
+            home_team, away_team, sport_key, h2h_limit=10, form_limit=5, before_date=before_date,
+        )
     h2h_data = context.get("h2h")
     h2h_summary = h2h_data["summary"] if h2h_data else None
     h2h_matches = h2h_data["matches"] if h2h_data else []
@@ -1327,10 +1626,14 @@ async def generate_quotico_tip(match: dict, *, before_date: datetime | None = No
     # Compute H2H lambdas for Poisson blend
     h2h_lambdas = _compute_h2h_lambdas(h2h_matches, home_key, away_key) if h2h_matches else None
 
+    # Team strengths + EVD: two team_ratings docs instead of history scans
+    ratings = await load_team_ratings([home_key, away_key]) if features is None else None
+
     # Tier 1: Dixon-Coles Poisson (with H2H blend + rest advantage)
     poisson = await compute_poisson_probabilities(
         home_key, away_key, sport_key, related_keys,
         match_date=match["match_date"], h2h_lambdas=h2h_lambdas, before_date=before_date,
+        features=features, ratings=ratings,
     )
     if not poisson:
         return _no_signal_bet(match, "Insufficient historical data for Poisson model")
@@ -1361,20 +1664,30 @@ async def generate_quotico_tip(match: dict, *, before_date: datetime | None = No
     home_form = context.get("home_form") or []
     away_form = context.get("away_form") or []
 
-    home_momentum = await compute_momentum_score(home_key, home_form, related_keys, before_date=before_date)
-    away_momentum = await compute_momentum_score(away_key, away_form, related_keys, before_date=before_date)
+    home_momentum = await compute_momentum_score(
+        home_key, home_form, related_keys, before_date=before_date, features=features,
+    )
+    away_momentum = await compute_momentum_score(
+        away_key, away_form, related_keys, before_date=before_date, features=features,
+    )
     momentum_gap = abs(home_momentum["momentum_score"] - away_momentum["momentum_score"])
 
     # Tier 3: Sharp Movement
     commence_time = match.get("match_date")
-    sharp = await detect_sharp_movement(match_id, commence_time, before_date=before_date)
+    sharp = await detect_sharp_movement(
+        match_id, commence_time, before_date=before_date, features=features,
+    )
 
     # Bonus: King's Choice
-    kings = await compute_kings_choice(match_id, before_date=before_date)
+    kings = await compute_kings_choice(match_id, before_date=before_date, features=features)
 
     # EVD: Beat the Books
-    evd_home = await compute_team_evd(home_key, related_keys, before_date=before_date)
-    evd_away = await compute_team_evd(away_key, related_keys, before_date=before_date)
+    evd_home = await compute_team_evd(
+        home_key, related_keys, before_date=before_date, features=features, ratings=ratings,
+    )
+    evd_away = await compute_team_evd(
+        away_key, related_keys, before_date=before_date, features=features, ratings=ratings,
+    )
 
     # Rest advantage signal
     rest_diff = poisson["home_rest_days"] - poisson["away_rest_days"]
@@ -1461,6 +1774,149 @@ async def generate_quotico_tip(match: dict, *, before_date: datetime | None = No
     }
 
 
+# ---------------------------------------------------------------------------
+# Batch refresh — shared by the tip worker and the odds poller
+# ---------------------------------------------------------------------------
+
+async def mark_tips_dirty(sport_key: str, match_ids: list[str]) -> None:
+    """Flag matches whose lines moved so their tips get recomputed.
+
+    Flags live in ``quotico_tip_dirty`` and are only cleared once a tip has
+    been written, so a restart resumes pending recomputes.
+    """
+    if not match_ids:
+        return
+    from pymongo import UpdateOne
+
+    now = utcnow()
+    ops = [
+        UpdateOne(
+            {"_id": match_id},
+            {"$set": {"sport_key": sport_key, "marked_at": now}},
+            upsert=True,
+        )
+        for match_id in match_ids
+    ]
+    await _db.db.quotico_tip_dirty.bulk_write(ops, ordered=False)
+
+
+async def dirty_tip_ids(sport_key: str) -> list[str]:
+    """Match ids with a pending tip recompute for *sport_key*."""
+    return await _db.db.quotico_tip_dirty.distinct("_id", {"sport_key": sport_key})
+
+
+async def _fresh_tip_ids(matches: list[dict], *, refresh_undated: bool) -> set[str]:
+    """Match ids whose stored tip was generated after the lines last moved.
+
+    One ``$in`` query for the whole batch. Uses ``odds.changed_at`` (falls back
+    to ``odds.updated_at`` for matches synced before it existed). Matches
+    without either count as fresh unless *refresh_undated* is set.
+    """
+    match_ids = [str(m["_id"]) for m in matches]
+    existing = await _db.db.quotico_tips.find(
+        {"match_id": {"$in": match_ids}}, {"_id": 0, "match_id": 1, "generated_at": 1},
+    ).to_list(length=len(match_ids))
+    generated_at = {t["match_id"]: ensure_utc(t["generated_at"]) for t in existing}
+
+    fresh: set[str] = set()
+    for match in matches:
+        match_id = str(match["_id"])
+        tip_generated = generated_at.get(match_id)
+        if tip_generated is None:
+            continue
+        odds = match.get("odds", {})
+        odds_changed = odds.get("changed_at") or odds.get("updated_at")
+        if odds_changed is None:
+            if not refresh_undated:
+                fresh.add(match_id)
+        elif tip_generated >= ensure_utc(odds_changed):
+            fresh.add(match_id)
+    return fresh
+
+
+async def refresh_quotico_tips(
+    matches: list[dict],
+    *,
+    enrich: bool = False,
+    refresh_undated: bool = True,
+    concurrency: int | None = None,
+) -> dict:
+    """Regenerate stale QuoticoTips for *matches* and upsert them in one bulk write.
+
+    Pipeline: bulk freshness check → TipFeatureStore load → generation fanned
+    out under a semaphore (optionally enriched with Qbot intelligence) →
+    single unordered ``bulk_write``. Dirty flags are cleared for every match
+    that is fresh or was written, unless re-marked since the run started;
+    failures stay flagged for the next run.
+    Returns counts plus per-stage timings in milliseconds, ready for
+    ``set_synced`` metrics.
+    """
+    from pymongo import UpdateOne
+
+    # Flags marked after this point may postdate the match docs we were given
+    run_start = utcnow()
+    timings: dict[str, int] = {}
+    t0 = _time.monotonic()
+
+    def _lap(stage: str) -> None:
+        nonlocal t0
+        now = _time.monotonic()
+        timings[stage] = int((now - t0) * 1000)
+        t0 = now
+
+    fresh_ids = await _fresh_tip_ids(matches, refresh_undated=refresh_undated)
+    stale = [m for m in matches if str(m["_id"]) not in fresh_ids]
+    _lap("freshness_ms")
+
+    # One bulk load answers every history lookup for this run
+    features = await TipFeatureStore.load(stale) if stale else None
+    _lap("features_ms")
+
+    if enrich:
+        from app.services.qbot_intelligence_service import enrich_tip
+
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.QUOTICO_TIP_CONCURRENCY))
+
+    async def _generate(match: dict) -> dict | None:
+        match_id = str(match["_id"])
+        async with semaphore:
+            try:
+                tip = await generate_quotico_tip(match, features=features)
+            except Exception as e:
+                logger.error("QuoticoTip generation failed for %s: %s", match_id, e)
+                return None
+            if enrich:
+                # Graceful — skips if no strategy
+                try:
+                    tip = await enrich_tip(tip)
+                except Exception:
+                    logger.warning("Qbot enrichment failed for %s", match_id, exc_info=True)
+            return tip
+
+    tips = [t for t in await asyncio.gather(*(_generate(m) for m in stale)) if t is not None]
+    _lap("generate_ms")
+
+    if tips:
+        ops = [UpdateOne({"match_id": t["match_id"]}, {"$set": t}, upsert=True) for t in tips]
+        await _db.db.quotico_tips.bulk_write(ops, ordered=False)
+    done_ids = list(fresh_ids) + [t["match_id"] for t in tips]
+    if done_ids:
+        await _db.db.quotico_tip_dirty.delete_many(
+            {"_id": {"$in": done_ids}, "marked_at": {"$lte": run_start}},
+        )
+    _lap("write_ms")
+
+    generated = sum(1 for t in tips if t.get("status") == "active")
+    return {
+        "matches": len(matches),
+        "fresh": len(fresh_ids),
+        "generated": generated,
+        "no_signal": len(tips) - generated,
+        "failed": len(stale) - len(tips),
+        "timings": timings,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Resolution helper
 # ---------------------------------------------------------------------------
@@ -0,0 +1,236 @@
+"""Team ratings — materialized per-team match history for the tip engine.
+
+One ``team_ratings`` document per team (``_id`` = team_key) holds every final
+match the team played as a compact entry, sorted by match_date:
+
+    match_id, match_date, sport_key, home_team_key, away_team_key,
+    result {home_score, away_score, home_xg, away_xg},
+    has_odds (bookmaker odds present), team_odds (first usable price for
+    this team, None if unusable)
+
+The sorted list doubles as the point-in-time history: "ratings as of D" is
+the slice before ``bisect_left(match_date, D)``. Attack/defense windows
+(last N at a venue) and EVD (last N with odds) are cut from that slice, so
+the engine's time-decayed averages come out identical to the query path.
+
+Each document keeps only the team's last ``MAX_ENTRIES`` matches. Reads
+that need older history (deep backtests) raise ``HistoryTruncated`` and the
+caller falls back to querying ``matches``.
+
+Entries are upserted on every path that finalizes or corrects a match
+(resolver, settlement queue, admin override, matchday sync, stale-match
+auto-close, xG enrichment); the ``_meta`` document marks that a full rebuild
+(tools/rebuild_team_ratings.py) has run, which readers require before
+trusting the table.
+"""
+
+import logging
+from bisect import bisect_left
+from datetime import datetime
+
+from bson import ObjectId
+
+import app.database as _db
+from app.utils import ensure_utc, utcnow
+
+logger = logging.getLogger("quotico.team_ratings")
+
+_META_ID = "_meta"
+
+# Per-team history cap (~8 seasons across all competitions)
+MAX_ENTRIES = 400
+
+_ENTRY_PROJECTION = {
+    "_id": 1, "match_date": 1, "sport_key": 1, "home_team_key": 1, "away_team_key": 1,
+    "result.home_score": 1, "result.away_score": 1,
+    "result.home_xg": 1, "result.away_xg": 1,
+    "odds.bookmakers": 1,
+}
+
+
+class HistoryTruncated(LookupError):
+    """The requested slice reaches past a team's capped history."""
+
+
+def first_usable_odds(bookmakers: dict, is_home: bool) -> float | None:
+    """First bookmaker price for the team (> 1.0), as used by EVD."""
+    for _bk, entry in (bookmakers or {}).items():
+        if not isinstance(entry, dict):
+            continue
+        team_odds = entry.get("home") if is_home else entry.get("away")
+        if team_odds and team_odds > 1.0:
+            return team_odds
+    return None
+
+
+def _entries_for(match: dict) -> dict[str, dict]:
+    """Rating entry per team key for one final match."""
+    result = match.get("result", {})
+    bookmakers = match.get("odds", {}).get("bookmakers")
+    base = {
+        "match_id": str(match["_id"]),
+        "match_date": match["match_date"],
+        "sport_key": match["sport_key"],
+        "home_team_key": match.get("home_team_key"),
+        "away_team_key": match.get("away_team_key"),
+        "result": {
+            k: result[k] for k in ("home_score", "away_score", "home_xg", "away_xg")
+            if k in result
+        },
+        "has_odds": bookmakers is not None,
+    }
+    entries = {}
+    for key, is_home in ((base["home_team_key"], True), (base["away_team_key"], False)):
+        if key:
+            entries[key] = {
+                **base,
+                "team_odds": first_usable_odds(bookmakers, is_home) if bookmakers else None,
+            }
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Write path
+# ---------------------------------------------------------------------------
+
+async def record_final_match(match: dict) -> None:
+    """Upsert a final match into both teams' rating documents (idempotent).
+
+    *match* must carry the final result. Re-recording replaces the entry, so
+    late corrections (score fixes, xG enrichment) can be pushed again.
+    """
+    from pymongo import UpdateOne
+
+    entries = _entries_for(match)
+    if not entries:
+        return
+    match_id = str(match["_id"])
+    now = utcnow()
+    ops = []
+    for team_key, entry in entries.items():
+        ops.append(UpdateOne(
+            {"_id": team_key}, {"$pull": {"entries": {"match_id": match_id}}},
+        ))
+        ops.append(UpdateOne(
+            {"_id": team_key},
+            {
+                "$push": {"entries": {
+                    "$each": [entry], "$sort": {"match_date": 1}, "$slice": -MAX_ENTRIES,
+                }},
+                "$set": {"updated_at": now},
+            },
+            upsert=True,
+        ))
+    await _db.db.team_ratings.bulk_write(ops, ordered=True)
+
+
+async def refresh_final_match(match_id: ObjectId) -> None:
+    """Re-record a match from its stored document if it is final.
+
+    For paths that write the final state straight to ``matches`` (admin
+    override, matchday sync, stale-match auto-close, xG enrichment).
+    """
+    match = await _db.db.matches.find_one(
+        {"_id": match_id, "status": "final"}, _ENTRY_PROJECTION,
+    )
+    if match:
+        await record_final_match(match)
+
+
+async def rebuild_team_ratings() -> dict:
+    """Rebuild every team's document from all final matches.
+
+    Streams finals in match_date order, then replaces each team document and
+    stamps ``_meta`` so readers start using the table.
+    """
+    from pymongo import ReplaceOne
+
+    per_team: dict[str, list[dict]] = {}
+    matches = 0
+    cursor = _db.db.matches.find(
+        {"status": "final"}, _ENTRY_PROJECTION,
+    ).sort("match_date", 1)
+    async for match in cursor:
+        for team_key, entry in _entries_for(match).items():
+            per_team.setdefault(team_key, []).append(entry)
+        matches += 1
+
+    now = utcnow()
+    ops = [
+        ReplaceOne(
+            {"_id": key}, {"entries": entries[-MAX_ENTRIES:], "updated_at": now}, upsert=True,
+        )
+        for key, entries in per_team.items()
+    ]
+    for i in range(0, len(ops), 500):
+        await _db.db.team_ratings.bulk_write(ops[i:i + 500], ordered=False)
+    await _db.db.team_ratings.delete_many(
+        {"_id": {"$nin": [*per_team, _META_ID]}},
+    )
+    await _db.db.team_ratings.update_one(
+        {"_id": _META_ID},
+        {"$set": {"built_at": now, "teams": len(per_team), "matches": matches}},
+        upsert=True,
+    )
+    logger.info("Team ratings rebuilt: %d teams from %d matches", len(per_team), matches)
+    return {"teams": len(per_team), "matches": matches}
+
+
+# ---------------------------------------------------------------------------
+# Read path
+# ---------------------------------------------------------------------------
+
+async def load_team_ratings(team_keys: list[str]) -> dict[str, list[dict]] | None:
+    """Entries per team key in one query; None until a full rebuild has run."""
+    docs = await _db.db.team_ratings.find(
+        {"_id": {"$in": [*team_keys, _META_ID]}},
+    ).to_list(length=len(team_keys) + 1)
+    by_id = {d["_id"]: d for d in docs}
+    if _META_ID not in by_id:
+        return None
+    return {key: by_id[key]["entries"] if key in by_id else [] for key in team_keys}
+
+
+def _entries_before(entries: list[dict], before_date: datetime | None) -> int:
+    """Number of entries strictly before *before_date* (bisect)."""
+    if before_date is None:
+        return len(entries)
+    return bisect_left(
+        entries, ensure_utc(before_date), key=lambda e: ensure_utc(e["match_date"]),
+    )
+
+
+def rating_matches(
+    entries: list[dict],
+    team_key: str,
+    related_keys: list[str],
+    *,
+    venue: str | None = None,
+    with_odds: bool = False,
+    limit: int,
+    before_date: datetime | None = None,
+) -> list[dict]:
+    """Team's last *limit* entries as of *before_date*, most recent first.
+
+    *venue* ("home"/"away") restricts to that side; *with_odds* keeps only
+    matches that carried bookmaker odds (the EVD candidate set). Raises
+    ``HistoryTruncated`` if fewer than *limit* entries remain and older
+    matches were dropped by the cap.
+    """
+    related = set(related_keys)
+    side_key = f"{venue}_team_key" if venue else None
+    picked: list[dict] = []
+    for i in range(_entries_before(entries, before_date) - 1, -1, -1):
+        entry = entries[i]
+        if entry["sport_key"] not in related:
+            continue
+        if side_key and entry.get(side_key) != team_key:
+            continue
+        if with_odds and not entry.get("has_odds"):
+            continue
+        picked.append(entry)
+        if len(picked) >= limit:
+            return picked
+    if len(entries) >= MAX_ENTRIES:
+        raise HistoryTruncated(team_key)
+    return picked
@@ -0,0 +1,396 @@
+"""Columnar tip dataset cache — resolved-tip features as memory-mapped arrays.
+
+The arena, the ensemble miner and strategy backtests all scan every resolved
+``quotico_tips`` document (with its ``tier_signals`` and ``qbot_logic``
+subdocuments) just to reduce each tip to a dozen numbers. This module keeps
+that reduction on disk, one ``.npy`` file per column per league:
+
+    <cache_dir>/<label>/current.json     pointer to the live version
+    <cache_dir>/<label>/<key>/*.npy      columns, sorted by (match_date, match_id)
+
+A version's *key* hashes the league, the tip count and the max
+``generated_at``; a cheap ``$group`` probe recomputes it, and an unchanged
+key means a load is just ``np.load(mmap_mode="r")``. When the key moves, only
+new tips (unknown match_ids) and regenerated ones (``generated_at`` past the
+cached max) are fetched and merged into a new version; tips that left the
+result set are dropped. Versions are written to a temp directory and renamed
+into place, so concurrent readers (miner seeds) never see a partial write;
+the superseded version is kept until the next publish for readers still
+opening it.
+
+Request handlers only open the published version (``open_tip_dataset``);
+refreshing is left to the qbot_backtests worker and the tools. Disk I/O and
+the column reduction run in a thread, off the event loop.
+
+Columns are raw per-tip features; reference-time dependent values (time
+weights) are derived by the consumer.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TypedDict
+
+import numpy as np
+
+import app.database as _db
+from app.config import settings
+from app.utils import ensure_utc
+
+logger = logging.getLogger("quotico.tip_dataset_cache")
+
+CACHE_SCHEMA = 1
+DEFAULT_CACHE_DIR = Path(settings.TIP_CACHE_DIR)
+
+# Sentinel for a missing match_date / generated_at in the int64 µs columns
+MISSING_US = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+TIP_PROJECTION = {
+    "_id": 0,
+    "match_id": 1,
+    "match_date": 1,
+    "generated_at": 1,
+    "edge_pct": 1,
+    "confidence": 1,
+    "implied_probability": 1,
+    "was_correct": 1,
+    "recommended_selection": 1,
+    "tier_signals": 1,
+    "qbot_logic": 1,
+}
+
+# Column name → dtype (match_id width is chosen per version)
+COLUMNS: dict[str, str] = {
+    "match_id": "U",
+    "match_us": "int64",       # match_date, µs since epoch
+    "generated_us": "int64",   # generated_at, µs since epoch
+    "iso_week": "int32",       # ISO year * 100 + week of match_date
+    "edge_pct": "float64",
+    "confidence": "float64",
+    "implied_prob": "float64",  # NaN when the tip has none
+    "was_correct": "bool",
+    "pick_type": "int8",        # 0=home, 1=draw, 2=away
+    "sharp_boost": "float64",
+    "momentum_boost": "float64",
+    "rest_boost": "float64",
+    "h2h_weight": "float64",
+    "bayes_conf": "float64",
+}
+
+
+class TipDatasetUnavailable(LookupError):
+    """No version of the league's tip dataset has been published yet."""
+
+
+class TipDataset(TypedDict):
+    key: str
+    sport_key: str | None
+    count: int
+    max_generated_at: str | None
+    columns: dict[str, np.ndarray]
+
+
+def to_us(dt: datetime | None) -> int:
+    """Exact integer microseconds since epoch (tz-naive = UTC)."""
+    if dt is None:
+        return int(MISSING_US)
+    return (ensure_utc(dt) - _EPOCH) // _ONE_US
+
+
+def from_us(us: int) -> datetime:
+    """UTC datetime for a µs column value (inverse of to_us)."""
+    return _EPOCH + timedelta(microseconds=int(us))
+
+
+def tip_columns(tips: list[dict]) -> dict[str, np.ndarray]:
+    """Reduce tip documents to the cached feature columns (input order)."""
+    n = len(tips)
+    cols = {
+        name: np.zeros(n, dtype=dtype)
+        for name, dtype in COLUMNS.items() if name != "match_id"
+    }
+    cols["match_id"] = np.array([str(t.get("match_id", "")) for t in tips], dtype=np.str_)
+    if n == 0:
+        cols["match_id"] = np.zeros(0, dtype="U24")
+
+    for i, tip in enumerate(tips):
+        cols["edge_pct"][i] = tip.get("edge_pct", 0.0)
+        cols["confidence"][i] = tip.get("confidence", 0.0)
+        cols["implied_prob"][i] = tip.get("implied_probability", np.nan)
+        cols["was_correct"][i] = bool(tip.get("was_correct", False))
+        cols["generated_us"][i] = to_us(tip.get("generated_at"))
+
+        md = tip.get("match_date")
+        if md:
+            cols["match_us"][i] = to_us(md)
+            iso = md.isocalendar()
+            cols["iso_week"][i] = iso[1] + iso[0] * 100
+        else:
+            cols["match_us"][i] = MISSING_US
+
+        pick = tip.get("recommended_selection")
+        cols["pick_type"][i] = 0 if pick == "1" else 1 if pick == "X" else 2
+
+        signals = tip.get("tier_signals") or {}
+
+        # Sharp: was there a sharp move agreeing with pick?
+        sharp_sig = signals.get("sharp_movement") or {}
+        if sharp_sig.get("has_sharp_movement") and sharp_sig.get("direction") == pick:
+            boost = 0.12 if sharp_sig.get("is_late_money") else 0.10
+            if sharp_sig.get("has_steam_move") and sharp_sig.get("steam_outcome") == pick:
+                boost += 0.03
+            cols["sharp_boost"][i] = boost
+
+        # Momentum: form gap agreeing with the pick
+        momentum_sig = signals.get("momentum") or {}
+        if momentum_sig.get("gap", 0.0) > 0.20:
+            home_m = (momentum_sig.get("home") or {}).get("momentum_score", 0.5)
+            away_m = (momentum_sig.get("away") or {}).get("momentum_score", 0.5)
+            if (pick == "1" and home_m > away_m) or (pick == "2" and away_m > home_m):
+                cols["momentum_boost"][i] = 0.08
+
+        # Rest advantage (can be None)
+        rest_sig = signals.get("rest_advantage") or {}
+        if rest_sig.get("contributes"):
+            diff = rest_sig.get("diff", 0)
+            if (pick == "1" and diff > 0) or (pick == "2" and diff < 0):
+                cols["rest_boost"][i] = 0.04
+
+        cols["h2h_weight"][i] = (signals.get("poisson") or {}).get("h2h_weight", 0.0)
+        cols["bayes_conf"][i] = (tip.get("qbot_logic") or {}).get("bayesian_confidence", 0.333)
+
+    return cols
+
+
+def _sorted_columns(cols: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Columns ordered by (match_date, match_id); missing dates sort first."""
+    order = np.lexsort((cols["match_id"], cols["match_us"]))
+    return {name: np.ascontiguousarray(col[order]) for name, col in cols.items()}
+
+
+def _concat_columns(parts: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+
+
+def _dataset_key(sport_key: str | None, count: int, max_generated_at: str | None) -> str:
+    raw = f"{CACHE_SCHEMA}|{sport_key or 'all'}|{count}|{max_generated_at}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def _base_query(sport_key: str | None) -> dict:
+    query: dict = {"status": "resolved", "was_correct": {"$ne": None}}
+    if sport_key:
+        query["sport_key"] = sport_key
+    return query
+
+
+# ---------------------------------------------------------------------------
+# On-disk versions
+# ---------------------------------------------------------------------------
+
+def _read_current(label_dir: Path) -> dict | None:
+    try:
+        with open(label_dir / "current.json") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("schema") != CACHE_SCHEMA:
+        return None
+    if not all((label_dir / manifest["key"] / f"{name}.npy").exists() for name in COLUMNS):
+        return None
+    return manifest
+
+
+def _open_version(label_dir: Path, key: str) -> dict[str, np.ndarray]:
+    return {
+        name: np.load(label_dir / key / f"{name}.npy", mmap_mode="r")
+        for name in COLUMNS
+    }
+
+
+def _write_version(label_dir: Path, manifest: dict, cols: dict[str, np.ndarray]) -> None:
+    """Write a version next to the live one and switch ``current.json`` to it."""
+    key = manifest["key"]
+    label_dir.mkdir(parents=True, exist_ok=True)
+    final_dir = label_dir / key
+    if not final_dir.exists():
+        tmp_dir = label_dir / f".{key}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        for name in COLUMNS:
+            np.save(tmp_dir / f"{name}.npy", cols[name], allow_pickle=False)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # Another process published the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    previous = _read_current(label_dir)
+    tmp_manifest = label_dir / f".current.json.tmp-{os.getpid()}"
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest, label_dir / "current.json")
+
+    # Drop versions older than the one just superseded: a reader that read the
+    # previous current.json may still be mapping its columns one by one
+    keep = {key}
+    if previous is not None:
+        keep.add(previous["key"])
+    for entry in label_dir.iterdir():
+        if entry.is_dir() and entry.name not in keep and not entry.name.startswith("."):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Load / refresh
+# ---------------------------------------------------------------------------
+
+async def _probe(query: dict) -> tuple[int, str | None]:
+    """Tip count and max generated_at (ISO) of the result set, in one pass."""
+    rows = await _db.db.quotico_tips.aggregate([
+        {"$match": query},
+        {"$group": {"_id": None, "n": {"$sum": 1}, "max_gen": {"$max": "$generated_at"}}},
+    ]).to_list(length=1)
+    if not rows:
+        return 0, None
+    max_gen = rows[0].get("max_gen")
+    return int(rows[0]["n"]), ensure_utc(max_gen).isoformat() if max_gen else None
+
+
+async def _fetch_columns(query: dict) -> dict[str, np.ndarray]:
+    tips = await _db.db.quotico_tips.find(query, TIP_PROJECTION).to_list(length=None)
+    return await asyncio.to_thread(tip_columns, tips)
+
+
+async def open_tip_dataset(
+    sport_key: str | None,
+    *,
+    cache_dir: Path | str = DEFAULT_CACHE_DIR,
+    key: str | None = None,
+) -> TipDataset:
+    """The published version of a league's tip dataset, without refreshing it.
+
+    Raises ``TipDatasetUnavailable`` until a version has been written. With
+    *key*, that version is opened instead (a worker process picking up the
+    version its parent loaded); it stays available until the next-but-one
+    publish.
+    """
+    label_dir = Path(cache_dir) / (sport_key or "all")
+    if key is not None:
+        try:
+            cols = await asyncio.to_thread(_open_version, label_dir, key)
+        except FileNotFoundError:
+            raise TipDatasetUnavailable(f"{sport_key or 'all'}@{key}") from None
+        manifest = {"key": key}
+    else:
+        # A publish between reading current.json and mapping the columns can
+        # remove the version; the retry picks up the newly published one
+        for attempt in range(2):
+            manifest = await asyncio.to_thread(_read_current, label_dir)
+            if manifest is None:
+                raise TipDatasetUnavailable(sport_key or "all")
+            try:
+                cols = await asyncio.to_thread(_open_version, label_dir, manifest["key"])
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise TipDatasetUnavailable(sport_key or "all") from None
+    return {
+        "key": manifest["key"],
+        "sport_key": sport_key,
+        "count": int(len(cols["match_id"])),
+        "max_generated_at": manifest.get("max_generated_at"),
+        "columns": cols,
+    }
+
+
+async def load_tip_dataset(
+    sport_key: str | None,
+    *,
+    cache_dir: Path | str = DEFAULT_CACHE_DIR,
+    rebuild: bool = False,
+) -> TipDataset:
+    """All resolved tips of a league (None = all leagues) as cached columns.
+
+    Opens the cached version when it is current, otherwise merges the delta
+    (or rebuilds on *rebuild* / first use) and publishes a new version.
+    """
+    query = _base_query(sport_key)
+    label_dir = Path(cache_dir) / (sport_key or "all")
+
+    count, max_gen = await _probe(query)
+    key = _dataset_key(sport_key, count, max_gen)
+    manifest = None if rebuild else await asyncio.to_thread(_read_current, label_dir)
+
+    if manifest is not None and manifest["key"] == key:
+        cols = await asyncio.to_thread(_open_version, label_dir, key)
+        logger.info("Tip cache hit: %s (%d tips, key=%s)", label_dir.name, count, key)
+    else:
+        cols = None
+        if manifest is not None:
+            cached = await asyncio.to_thread(_open_version, label_dir, manifest["key"])
+            cols = await _merge_delta(query, manifest, cached)
+        if cols is None:
+            cols = await asyncio.to_thread(_sorted_columns, await _fetch_columns(query))
+            logger.info("Tip cache built: %s (%d tips)", label_dir.name, len(cols["match_id"]))
+        # The delta may race with writers; publish what was actually read
+        manifest = {
+            "schema": CACHE_SCHEMA,
+            "key": _dataset_key(sport_key, len(cols["match_id"]), max_gen),
+            "sport_key": sport_key,
+            "count": int(len(cols["match_id"])),
+            "max_generated_at": max_gen,
+        }
+        await asyncio.to_thread(_write_version, label_dir, manifest, cols)
+        cols = await asyncio.to_thread(_open_version, label_dir, manifest["key"])
+        key = manifest["key"]
+
+    return {
+        "key": key,
+        "sport_key": sport_key,
+        "count": int(len(cols["match_id"])),
+        "max_generated_at": max_gen,
+        "columns": cols,
+    }
+
+
+async def _merge_delta(
+    query: dict,
+    manifest: dict,
+    cached: dict[str, np.ndarray],
+) -> dict[str, np.ndarray] | None:
+    """Cached columns updated with new/regenerated tips; None to rebuild."""
+    current_ids = await _db.db.quotico_tips.distinct("match_id", query)
+    current = np.array([str(m) for m in current_ids], dtype=np.str_)
+    cached_ids = np.asarray(cached["match_id"])
+    new_ids = current[~np.isin(current, cached_ids)]
+    # Mostly new data: a plain scan is cheaper than a huge $in
+    if new_ids.size > max(1000, cached_ids.size // 2):
+        return None
+
+    delta_or: list[dict] = []
+    if new_ids.size:
+        delta_or.append({"match_id": {"$in": new_ids.tolist()}})
+    if manifest.get("max_generated_at"):
+        cached_max = datetime.fromisoformat(manifest["max_generated_at"])
+        delta_or.append({"generated_at": {"$gt": cached_max}})
+    delta = (
+        await _fetch_columns({**query, "$or": delta_or})
+        if delta_or else tip_columns([])
+    )
+
+    keep = np.isin(cached_ids, current) & ~np.isin(cached_ids, delta["match_id"])
+    kept = {name: np.asarray(cached[name])[keep] for name in COLUMNS}
+    logger.info(
+        "Tip cache delta: +%d new/regenerated, -%d removed, %d kept",
+        len(delta["match_id"]), int((~keep).sum()), int(keep.sum()),
+    )
+    return await asyncio.to_thread(_sorted_columns, _concat_columns([kept, delta]))
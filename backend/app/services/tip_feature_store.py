@@ -0,0 +1,475 @@
+"""In-memory feature store for batch QuoticoTip generation.
+
+``generate_quotico_tip`` needs ~30 history lookups per fixture (team keys,
+H2H, form, league averages, home/away history, rest days, opponent strength,
+line movement, King's Choice, EVD). Run per fixture against Mongo, a
+matchday refresh costs O(30 × fixtures) round trips.
+
+``TipFeatureStore.load()`` fetches the relevant slice of ``matches`` (plus
+odds snapshots and King's Choice slips for the fixtures in the run) once,
+and indexes it into date-sorted columnar arrays per team and per league.
+Every lookup the engine makes is then answered in memory with the same
+filter, sort and limit semantics as the Mongo query it replaces, so tips
+are identical whichever source produced them.
+
+Live runs (the poller, every 15 minutes) and backfill replays only load a
+window of league history reaching ``WINDOW_LOOKBACK`` before the earliest
+fixture, plus the full head-to-head history of the fixture pairings. A lookup
+whose answer may reach past that window raises ``OutsideLoadedWindow`` and the
+caller runs its Mongo query instead (new or long-inactive teams).
+"""
+
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import app.database as _db
+from app.services.historical_service import sport_keys_for, summarize_h2h
+from app.services.odds_snapshot_service import load_odds_snapshots
+from app.utils import ensure_utc
+
+logger = logging.getLogger("quotico.tip_feature_store")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+_MATCH_PROJECTION = {
+    "_id": 0,
+    "match_date": 1, "sport_key": 1, "season_label": 1,
+    "home_team": 1, "away_team": 1, "home_team_key": 1, "away_team_key": 1,
+    "result.home_score": 1, "result.away_score": 1, "result.outcome": 1,
+    "result.home_xg": 1, "result.away_xg": 1,
+    "odds.bookmakers": 1,
+}
+
+_EMPTY_IDX = np.zeros(0, dtype=np.int64)
+
+# Look-back of windowed loads: league averages read the last 1000 finals of a league
+# (~3.3 seasons of an 18-team league), team lookups far fewer
+WINDOW_LOOKBACK = timedelta(days=4 * 365)
+# Rest days only need each fixture team's latest final (covers a summer break)
+WINDOW_REST_LOOKBACK = timedelta(days=120)
+
+
+class OutsideLoadedWindow(LookupError):
+    """The answer may depend on matches older than the store's loaded window."""
+
+
+def _to_us(dt: datetime) -> int:
+    """Exact integer microseconds since epoch (tz-naive = UTC)."""
+    return (ensure_utc(dt) - _EPOCH) // _ONE_US
+
+
+def _as_number(value) -> float:
+    """Mirror Mongo ``$sum``: non-numeric values contribute nothing."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return 0.0
+
+
+class TipFeatureStore:
+    """Columnar, per-team index over final matches for one tip-generation run."""
+
+    def __init__(
+        self,
+        docs: list[dict],
+        sport_keys: set[str],
+        *,
+        other_competitions: list[dict] | None = None,
+        snapshots: dict[str, list[dict]] | None = None,
+        line_states: dict[str, dict] | None = None,
+        king_ids: list[str] | None = None,
+        king_slips: list[dict] | None = None,
+        fixture_ids: set[str] | None = None,
+        horizon: datetime | None = None,
+        rest_horizon: datetime | None = None,
+    ) -> None:
+        """Index *docs* (final matches, sorted by match_date ascending).
+
+        *horizon* / *rest_horizon* mark bounded loads: *docs* hold every
+        related-league final from *horizon* on (plus older head-to-head
+        matches of the fixture pairs), rest-day dates are complete from
+        *rest_horizon* on.
+        """
+        self._docs = docs
+        self._sport_keys = sport_keys
+        self._horizon_us = _to_us(horizon) if horizon is not None else None
+        self._rest_horizon_us = _to_us(rest_horizon) if rest_horizon is not None else None
+        n = len(docs)
+
+        self._sport_codes: dict[str, int] = {}
+        self._team_codes: dict[str, int] = {}
+        self._dates = np.empty(n, dtype=np.int64)
+        self._sport = np.empty(n, dtype=np.int32)
+        self._home = np.empty(n, dtype=np.int32)
+        self._away = np.empty(n, dtype=np.int32)
+        self._home_scores = np.empty(n, dtype=np.float64)
+        self._away_scores = np.empty(n, dtype=np.float64)
+        self._has_outcome = np.empty(n, dtype=bool)
+        self._has_odds = np.empty(n, dtype=bool)
+
+        team_home: dict[str, list[int]] = {}
+        team_away: dict[str, list[int]] = {}
+        team_any: dict[str, list[int]] = {}
+        sport_rows: dict[int, list[int]] = {}
+
+        for i, doc in enumerate(docs):
+            result = doc.get("result") or {}
+            home_key = doc.get("home_team_key") or ""
+            away_key = doc.get("away_team_key") or ""
+            sport_code = self._sport_codes.setdefault(doc.get("sport_key", ""), len(self._sport_codes))
+
+            self._dates[i] = _to_us(doc["match_date"])
+            self._sport[i] = sport_code
+            self._home[i] = self._team_codes.setdefault(home_key, len(self._team_codes))
+            self._away[i] = self._team_codes.setdefault(away_key, len(self._team_codes))
+            self._home_scores[i] = _as_number(result.get("home_score"))
+            self._away_scores[i] = _as_number(result.get("away_score"))
+            self._has_outcome[i] = result.get("outcome") is not None
+            self._has_odds[i] = (doc.get("odds") or {}).get("bookmakers") is not None
+
+            sport_rows.setdefault(sport_code, []).append(i)
+            if home_key:
+                team_home.setdefault(home_key, []).append(i)
+                team_any.setdefault(home_key, []).append(i)
+            if away_key:
+                team_away.setdefault(away_key, []).append(i)
+                if away_key != home_key:
+                    team_any.setdefault(away_key, []).append(i)
+
+        def _freeze(rows: dict) -> dict:
+            return {k: np.asarray(v, dtype=np.int64) for k, v in rows.items()}
+
+        self._team_home = _freeze(team_home)
+        self._team_away = _freeze(team_away)
+        self._team_any = _freeze(team_any)
+        self._sport_rows = _freeze(sport_rows)
+
+        # Rest days count every competition, not just related leagues
+        rest_dates: dict[str, list[int]] = {
+            k: self._dates[v].tolist() for k, v in self._team_any.items()
+        }
+        for doc in other_competitions or []:
+            ts = _to_us(doc["match_date"])
+            for key in {doc.get("home_team_key"), doc.get("away_team_key")}:
+                if key:
+                    rest_dates.setdefault(key, []).append(ts)
+        self._rest_dates = {
+            k: np.sort(np.asarray(v, dtype=np.int64)) for k, v in rest_dates.items()
+        }
+
+        # Odds snapshots per fixture id, sorted by snapshot_at ascending
+        self._snapshots: dict[str, list[dict]] = snapshots or {}
+        self._snapshot_dates = {
+            mid: [ensure_utc(s["snapshot_at"]) for s in snaps]
+            for mid, snaps in self._snapshots.items()
+        }
+
+        # Persisted LineMovementState per fixture id (live runs only)
+        self._line_states = line_states or {}
+
+        # King's Choice: top-10% user ids + their single slips per fixture
+        self._king_ids = king_ids or []
+        self._king_slips: dict[str, list[dict]] = {}
+        for slip in king_slips or []:
+            seen: set[str] = set()
+            for sel in slip.get("selections", []):
+                mid = sel.get("match_id")
+                if mid in seen or (fixture_ids is not None and mid not in fixture_ids):
+                    continue
+                seen.add(mid)
+                self._king_slips.setdefault(mid, []).append(slip)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @classmethod
+    async def load(
+        cls, fixtures: list[dict], *, before_date: datetime | None = None,
+        replay: bool = False,
+    ) -> "TipFeatureStore":
+        """Load everything a run over *fixtures* needs in a handful of queries.
+
+        Matches are capped at *before_date* when given (backfill); individual
+        lookups still apply their own ``before_date`` on top.
+
+        *replay* loads a point-in-time store for a chronological backfill over
+        historical *fixtures*: full snapshot series and none of the live-only
+        state (line-movement states, King's Choice). Each tip is then cut at
+        its own match date by the lookups' ``before_date``.
+
+        Live and replay loads are windowed: history starts ``WINDOW_LOOKBACK``
+        before now (live) or before the earliest fixture (replay).
+        """
+        live = before_date is None and not replay
+        windowed = (live or replay) and bool(fixtures)
+        sport_keys: set[str] = set()
+        for f in fixtures:
+            sport_keys.update(sport_keys_for(f["sport_key"]))
+        fixture_teams = {
+            k for f in fixtures for k in (f.get("home_team_key"), f.get("away_team_key")) if k
+        }
+
+        horizon = rest_horizon = None
+        match_filter: dict = {"sport_key": {"$in": sorted(sport_keys)}, "status": "final"}
+        if before_date:
+            match_filter["match_date"] = {"$lt": before_date}
+        if windowed:
+            anchor = (
+                datetime.now(timezone.utc) if live
+                else min(ensure_utc(f["match_date"]) for f in fixtures)
+            )
+            horizon, rest_horizon = anchor - WINDOW_LOOKBACK, anchor - WINDOW_REST_LOOKBACK
+            older_exists = await _db.db.matches.find_one(
+                {**match_filter, "match_date": {"$lt": horizon}}, {"_id": 1},
+            )
+            if older_exists:
+                match_filter["match_date"] = {**match_filter.get("match_date", {}), "$gte": horizon}
+            else:
+                horizon = None  # the window already holds the leagues' whole history
+        docs = await _db.db.matches.find(
+            match_filter, _MATCH_PROJECTION,
+        ).sort("match_date", 1).to_list(length=None)
+
+        if horizon is not None:
+            # H2H summaries read the pair's whole history: add the older part
+            pairs = []
+            for f in fixtures:
+                home, away = f.get("home_team_key"), f.get("away_team_key")
+                if home and away:
+                    pairs.append({"home_team_key": home, "away_team_key": away})
+                    pairs.append({"home_team_key": away, "away_team_key": home})
+            if pairs:
+                older = await _db.db.matches.find(
+                    {
+                        "sport_key": {"$in": sorted(sport_keys)},
+                        "status": "final",
+                        "match_date": {"$lt": horizon},
+                        "$or": pairs,
+                    },
+                    _MATCH_PROJECTION,
+                ).sort("match_date", 1).to_list(length=None)
+                docs = older + docs
+
+        # Other competitions (cups, Europe) only feed rest-day lookups
+        if windowed:
+            team_keys = set(fixture_teams)
+        else:
+            team_keys = {
+                k for d in docs for k in (d.get("home_team_key"), d.get("away_team_key")) if k
+            }
+            team_keys.update(fixture_teams)
+        other_filter: dict = {
+            "sport_key": {"$nin": sorted(sport_keys)},
+            "status": "final",
+            "$or": [
+                {"home_team_key": {"$in": sorted(team_keys)}},
+                {"away_team_key": {"$in": sorted(team_keys)}},
+            ],
+        }
+        if before_date:
+            other_filter["match_date"] = {"$lt": before_date}
+        if windowed:
+            other_filter["match_date"] = {**other_filter.get("match_date", {}), "$gte": rest_horizon}
+        other = await _db.db.matches.find(
+            other_filter, {"_id": 0, "match_date": 1, "home_team_key": 1, "away_team_key": 1},
+        ).to_list(length=None) if team_keys else []
+
+        fixture_ids = {str(f["_id"]) for f in fixtures}
+
+        # Live runs read the poller-maintained line-movement state; snapshots
+        # are only needed for backfill and fixtures without a state yet
+        line_states: dict[str, dict] = {}
+        if live:
+            states = await _db.db.line_movement.find(
+                {"_id": {"$in": sorted(fixture_ids)}},
+            ).to_list(length=None)
+            line_states = {st.pop("_id"): st for st in states}
+        snapshots = await load_odds_snapshots(
+            sorted(fixture_ids - line_states.keys()), before_date=before_date,
+        )
+
+        # King's Choice cannot be reconstructed for backfill (see compute_kings_choice)
+        king_ids: list[str] = []
+        king_slips: list[dict] = []
+        if live:
+            from app.services.leaderboard_service import get_king_ids
+            king_ids = await get_king_ids()
+            if king_ids:
+                king_slips = await _db.db.betting_slips.find(
+                    {
+                        "selections.match_id": {"$in": sorted(fixture_ids)},
+                        "user_id": {"$in": king_ids},
+                        "type": "single",
+                    },
+                    {"selections": 1, "user_id": 1},
+                ).to_list(length=None)
+
+        logger.info(
+            "Feature store loaded: %d matches, %d other-competition dates, "
+            "%d snapshots, %d king slips for %d fixtures",
+            len(docs), len(other), sum(len(v) for v in snapshots.values()),
+            len(king_slips), len(fixtures),
+        )
+        return cls(
+            docs, sport_keys,
+            other_competitions=other,
+            snapshots=snapshots,
+            line_states=line_states,
+            king_ids=king_ids,
+            king_slips=king_slips,
+            fixture_ids=fixture_ids,
+            horizon=horizon,
+            rest_horizon=rest_horizon,
+        )
+
+    # ------------------------------------------------------------------
+    # Index helpers
+    # ------------------------------------------------------------------
+
+    def _select(
+        self,
+        idx: np.ndarray,
+        related_keys: list[str] | None,
+        before_date: datetime | None,
+        *,
+        require: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Filter date-ascending row indices by league set, cutoff and flag column."""
+        if before_date is not None and len(idx):
+            idx = idx[:np.searchsorted(self._dates[idx], _to_us(before_date), side="left")]
+        if related_keys is not None and not self._sport_keys.issubset(related_keys):
+            codes = [self._sport_codes[k] for k in related_keys if k in self._sport_codes]
+            idx = idx[np.isin(self._sport[idx], codes)]
+        if require is not None:
+            idx = idx[require[idx]]
+        return idx
+
+    def _latest(self, idx: np.ndarray, limit: int | None) -> list[dict]:
+        """Docs for the last *limit* rows, most recent first (``sort(-1).limit``)."""
+        rows = idx[::-1] if limit is None else idx[::-1][:limit]
+        return [self._docs[i] for i in rows]
+
+    def _check_window(self, idx: np.ndarray, limit: int | None) -> None:
+        """Raise unless the last *limit* rows of *idx* all lie inside the window."""
+        if self._horizon_us is None:
+            return
+        if limit is None or len(idx) < limit or self._dates[idx[-limit]] < self._horizon_us:
+            raise OutsideLoadedWindow
+
+    # ------------------------------------------------------------------
+    # Lookups (same semantics as the Mongo queries in quotico_tip_service)
+    # ------------------------------------------------------------------
+
+    def league_goal_totals(
+        self, sport_keys: list[str], *, limit: int, before_date: datetime | None = None,
+    ) -> dict | None:
+        """Sum home/away goals over the last *limit* finals in *sport_keys*."""
+        parts = [self._sport_rows[self._sport_codes[k]] for k in set(sport_keys) if k in self._sport_codes]
+        if not parts:
+            return None
+        idx = np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+        idx = self._select(idx, None, before_date)
+        self._check_window(idx, limit)
+        idx = idx[-limit:]
+        if not len(idx):
+            return None
+        return {
+            "total_home": float(self._home_scores[idx].sum()),
+            "total_away": float(self._away_scores[idx].sum()),
+            "count": len(idx),
+        }
+
+    def team_matches(
+        self, team_key: str, related_keys: list[str], *,
+        venue: str, limit: int, before_date: datetime | None = None,
+    ) -> list[dict]:
+        """Team's last *limit* finals at *venue* ("home"/"away"), most recent first."""
+        rows = self._team_home if venue == "home" else self._team_away
+        idx = self._select(rows.get(team_key, _EMPTY_IDX), related_keys, before_date)
+        self._check_window(idx, limit)
+        return self._latest(idx, limit)
+
+    def matches_with_odds(
+        self, team_key: str, related_keys: list[str], *,
+        limit: int, before_date: datetime | None = None,
+    ) -> list[dict]:
+        """Team's last *limit* finals (either venue) that carry bookmaker odds."""
+        idx = self._select(
+            self._team_any.get(team_key, _EMPTY_IDX), related_keys, before_date,
+            require=self._has_odds,
+        )
+        self._check_window(idx, limit)
+        return self._latest(idx, limit)
+
+    def last_match_date(self, team_key: str, before: datetime) -> datetime | None:
+        """Date of the team's last final match before *before*, any competition."""
+        dates = self._rest_dates.get(team_key)
+        pos = 0 if dates is None else int(np.searchsorted(dates, _to_us(before), side="left"))
+        if self._rest_horizon_us is not None and (pos == 0 or dates[pos - 1] < self._rest_horizon_us):
+            raise OutsideLoadedWindow
+        if pos == 0:
+            return None
+        return _EPOCH + timedelta(microseconds=int(dates[pos - 1]))
+
+    def match_context(
+        self, home_key: str, away_key: str, related_keys: list[str], *,
+        h2h_limit: int = 10, form_limit: int = 10, before_date: datetime | None = None,
+    ) -> dict:
+        """H2H + form context, shaped like ``build_match_context``."""
+        any_home = self._select(
+            self._team_any.get(home_key, _EMPTY_IDX), related_keys, before_date,
+            require=self._has_outcome,
+        )
+        home_code = self._team_codes.get(home_key, -1)
+        away_code = self._team_codes.get(away_key, -1)
+        pair = (
+            ((self._home[any_home] == home_code) & (self._away[any_home] == away_code))
+            | ((self._home[any_home] == away_code) & (self._away[any_home] == home_code))
+        )
+        h2h_idx = any_home[pair]
+
+        h2h_summary = summarize_h2h([self._docs[i] for i in h2h_idx[:500]], home_key)
+
+        any_away = self._select(
+            self._team_any.get(away_key, _EMPTY_IDX), related_keys, before_date,
+            require=self._has_outcome,
+        )
+        self._check_window(any_home, form_limit)
+        self._check_window(any_away, form_limit)
+        return {
+            "h2h": {
+                "summary": h2h_summary,
+                "matches": self._latest(h2h_idx, h2h_limit),
+            } if h2h_summary else None,
+            "home_form": self._latest(any_home, form_limit),
+            "away_form": self._latest(any_away, form_limit),
+            "home_team_key": home_key,
+            "away_team_key": away_key,
+        }
+
+    def odds_snapshots(
+        self, match_id: str, *, limit: int, before_date: datetime | None = None,
+    ) -> list[dict]:
+        """First *limit* snapshots for the match, oldest first."""
+        snaps = self._snapshots.get(match_id)
+        if not snaps:
+            return []
+        if before_date is not None:
+            snaps = snaps[:bisect_left(self._snapshot_dates[match_id], ensure_utc(before_date))]
+        return snaps[:limit]
+
+    def line_movement(self, match_id: str) -> dict | None:
+        """Persisted LineMovementState for the match, if the poller has one."""
+        return self._line_states.get(match_id)
+
+    def king_ids(self) -> list[str]:
+        """User ids of the top-10% leaderboard ("kings"), empty if < 10 users."""
+        return self._king_ids
+
+    def king_slips(self, match_id: str) -> list[dict]:
+        """Kings' single slips that include *match_id*."""
+        return self._king_slips.get(match_id, [])[:len(self._king_ids)]
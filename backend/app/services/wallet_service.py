@@ -164,6 +164,70 @@ async def credit_win(
     return wallet
 
 
+async def credit_settlement_batch(
+    batch_id: str, credits: dict[str, tuple[str, float]],
+) -> dict[str, float]:
+    """Credit a settlement batch's winnings, at most once per wallet.
+
+    *credits* maps wallet id → (user id, amount). All wallets are updated in
+    one unordered ``bulk_write``: each update is guarded by the wallet's
+    ``settlement_batches`` marker list and records the post-credit balance on
+    ``settlement_balances`` in the same atomic step, so a replayed batch gets
+    the balances of the original credit back instead of crediting again.
+    Returns wallet id → balance right after the batch's credit; missing
+    wallets are left out.
+    """
+    from pymongo import UpdateOne
+
+    if not credits:
+        return {}
+    now = utcnow()
+    ops = []
+    for wallet_id, (user_id, amount) in credits.items():
+        new_balance = {"$add": ["$balance", amount]}
+        ops.append(UpdateOne(
+            {
+                "_id": ObjectId(wallet_id),
+                "user_id": user_id,
+                "settlement_batches": {"$ne": batch_id},
+            },
+            [{"$set": {
+                "balance": new_balance,
+                "total_won": {"$add": [{"$ifNull": ["$total_won", 0]}, amount]},
+                "status": WalletStatus.active.value,
+                "bankrupt_since": None,
+                "updated_at": now,
+                "settlement_batches": {"$concatArrays": [
+                    {"$ifNull": ["$settlement_batches", []]}, [batch_id],
+                ]},
+                "settlement_balances": {"$concatArrays": [
+                    {"$ifNull": ["$settlement_balances", []]},
+                    [{"batch": batch_id, "balance": new_balance}],
+                ]},
+            }}],
+        ))
+    await _db.db.wallets.bulk_write(ops, ordered=False)
+
+    wallets = await _db.db.wallets.find(
+        {
+            "_id": {"$in": [ObjectId(w) for w in credits]},
+            "settlement_balances.batch": batch_id,
+        },
+        {"user_id": 1, "settlement_balances": {"$elemMatch": {"batch": batch_id}}},
+    ).to_list(length=len(credits))
+    balances = {
+        str(w["_id"]): w["settlement_balances"][0]["balance"]
+        for w in wallets
+        if w.get("user_id") == credits[str(w["_id"])][0]
+    }
+    if len(balances) < len(credits):
+        logger.warning(
+            "Settlement %s: %d of %d wallets not credited (missing or credited before balances were recorded)",
+            batch_id, len(credits) - len(balances), len(credits),
+        )
+    return balances
+
+
 async def mark_bankrupt_if_needed(wallet_id: str) -> None:
     """Check if wallet balance is <= 0 and mark as bankrupt."""
     now = utcnow()
@@ -185,6 +185,11 @@ async def match_and_enrich(
                     "result.xg_provider": "understat",
                 }},
             )
+            try:
+                from app.services.team_rating_service import refresh_final_match
+                await refresh_final_match(db_match["_id"])
+            except Exception:
+                logger.warning("Team ratings update failed for %s", db_match["_id"], exc_info=True)
 
         matched += 1
 
@@ -21,10 +21,11 @@ async def get_worker_state(worker_id: str) -> dict | None:
     return await _db.db.worker_state.find_one({"_id": worker_id})
 
 
-async def set_synced(worker_id: str, metrics: dict | None = None) -> None:
-    """Mark a worker as just synced, optionally storing run metrics."""
-    now = utcnow()
-    update: dict = {"synced_at": now}
+async def set_synced(
+    worker_id: str, metrics: dict | None = None, *, synced_at: datetime | None = None,
+) -> None:
+    """Mark a worker as synced (now, or at *synced_at*), optionally storing run metrics."""
+    update: dict = {"synced_at": synced_at or utcnow()}
     if metrics is not None:
         update["last_metrics"] = metrics
     await _db.db.worker_state.update_one(
@@ -1,5 +1,7 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from bson import ObjectId
 
 import app.database as _db
 from app.models.badge import BADGE_DEFINITIONS
@@ -10,161 +12,216 @@ logger = logging.getLogger("quotico.badge_engine")
 
 _STATE_KEY = "badge_engine"
 
+# Users per evaluation chunk (bounds the $in lists sent to Mongo)
+_CHUNK = 5000
+# Look-back overlap before the previous run's start: covers writes stamped
+# just before it but committed after its scan (re-evaluation is harmless,
+# awards are diffed)
+_OVERLAP = timedelta(minutes=5)
 
-async def check_badges() -> None:
-    """Background task: check all users for badge eligibility.
-
-    Smart sleep: skips if no bets resolved and no squads created since last run.
-    """
-    last_run = await get_synced_at(_STATE_KEY)
-    if last_run:
-        recent_bet = await _db.db.betting_slips.find_one(
-            {"resolved_at": {"$gte": last_run}},
-        )
-        recent_squad = await _db.db.squads.find_one(
-            {"created_at": {"$gte": last_run}},
-        )
-        if not recent_bet and not recent_squad:
-            logger.debug("Smart sleep: no activity since last run, skipping badge check")
-            return
+_CLASSIC = {"$in": ["single", "parlay"]}
+_BET_COUNT_BADGES = (("first_bet", 1), ("ten_bets", 10), ("fifty_bets", 50))
+_STREAK_WINDOW = 20
+_STREAK_LENGTH = 3
 
-    total_awarded = 0
-    async for user in _db.db.users.find({"is_deleted": False}, {"_id": 1, "points": 1}):
-        user_id = str(user["_id"])
-        awarded = await _check_user_badges(user_id, user)
-        total_awarded += awarded
 
-    await set_synced(_STATE_KEY)
-    if total_awarded > 0:
-        logger.info("Badge engine: awarded %d new badges", total_awarded)
+async def check_badges() -> None:
+    """Background task: award badges to users touched since the last run.
 
+    Each badge rule is one set query / aggregation over a chunk of users that
+    returns every eligible user id at once; the result is diffed against the
+    awards already stored and all new awards are written with one insert_many.
+    The first run evaluates every user.
 
-async def _check_user_badges(user_id: str, user: dict) -> int:
-    """Check and award badges for a single user. Returns count of new badges."""
-    # Get existing badges
-    existing = await _db.db.badges.find(
-        {"user_id": user_id}
-    ).to_list(length=100)
-    existing_keys = {b["badge_key"] for b in existing}
+    Smart sleep: skips if no user was touched since last run.
+    """
+    # Stored as the run's sync time, so activity during a long run is
+    # scanned again next time
+    run_start = utcnow()
+    last_run = await get_synced_at(_STATE_KEY)
+    scope = await _touched_user_ids(last_run - _OVERLAP if last_run else None)
+    if not scope:
+        logger.debug("Smart sleep: no activity since last run, skipping badge check")
+        return
 
     now = utcnow()
-    awarded = 0
-
-    # --- Bet count badges (classic single/parlay slips) ---
-    slip_filter = {"user_id": user_id, "type": {"$in": ["single", "parlay"]}}
-    bet_count = await _db.db.betting_slips.count_documents(slip_filter)
-
-    if bet_count >= 1 and "first_bet" not in existing_keys:
-        await _award(user_id, "first_bet", now)
-        awarded += 1
-
-    if bet_count >= 10 and "ten_bets" not in existing_keys:
-        await _award(user_id, "ten_bets", now)
-        awarded += 1
-
-    if bet_count >= 50 and "fifty_bets" not in existing_keys:
-        await _award(user_id, "fifty_bets", now)
-        awarded += 1
+    new_awards: list[dict] = []
+    for i in range(0, len(scope), _CHUNK):
+        chunk = scope[i:i + _CHUNK]
+        eligible = await _eligible_users(chunk)
+        existing = await _db.db.badges.find(
+            {"user_id": {"$in": chunk}}, {"user_id": 1, "badge_key": 1, "_id": 0},
+        ).to_list(length=None)
+        have = {(b["user_id"], b["badge_key"]) for b in existing}
+        new_awards.extend(
+            {"user_id": user_id, "badge_key": badge_key, "awarded_at": now}
+            for badge_key, user_ids in eligible.items()
+            for user_id in sorted(user_ids)
+            if (user_id, badge_key) not in have
+        )
 
-    # --- Win badges ---
-    won_count = await _db.db.betting_slips.count_documents(
-        {"user_id": user_id, "status": "won", "type": {"$in": ["single", "parlay"]}}
+    awarded = await _insert_awards(new_awards)
+    await set_synced(
+        _STATE_KEY,
+        {"users_checked": len(scope), "badges_awarded": awarded},
+        synced_at=run_start,
     )
+    if awarded > 0:
+        per_badge: dict[str, int] = {}
+        for doc in new_awards:
+            per_badge[doc["badge_key"]] = per_badge.get(doc["badge_key"], 0) + 1
+        logger.info(
+            "Badge engine: awarded %d new badges to %d checked users (%s)",
+            awarded, len(scope),
+            ", ".join(
+                f"{BADGE_DEFINITIONS.get(k, {}).get('name', k)}: {n}"
+                for k, n in sorted(per_badge.items())
+            ),
+        )
 
-    if won_count >= 1 and "first_win" not in existing_keys:
-        await _award(user_id, "first_win", now)
-        awarded += 1
-
-    # --- Underdog King: won a single bet with locked_odds > 4.0 ---
-    if "underdog_king" not in existing_keys:
-        underdog = await _db.db.betting_slips.find_one({
-            "user_id": user_id,
-            "status": "won",
-            "type": "single",
-            "selections.locked_odds": {"$gt": 4.0},
-        })
-        if underdog:
-            await _award(user_id, "underdog_king", now)
-            awarded += 1
-
-    # --- Hot Streak: 3 consecutive wins ---
-    if "hot_streak_3" not in existing_keys:
-        recent_slips = await _db.db.betting_slips.find(
-            {"user_id": user_id, "status": {"$in": ["won", "lost"]}, "type": {"$in": ["single", "parlay"]}}
-        ).sort("resolved_at", -1).limit(20).to_list(length=20)
 
+async def _touched_user_ids(since: datetime | None) -> list[str]:
+    """Non-deleted users with badge-relevant activity since ``since`` (all if None)."""
+    user_filter: dict = {"is_deleted": False}
+    if since is not None:
+        touched: set[str] = set()
+        touched.update(await _db.db.betting_slips.distinct(
+            "user_id", {"$or": [
+                {"created_at": {"$gte": since}},
+                {"submitted_at": {"$gte": since}},
+                {"resolved_at": {"$gte": since}},
+            ]},
+        ))
+        touched.update(await _db.db.points_transactions.distinct(
+            "user_id", {"created_at": {"$gte": since}},
+        ))
+        touched.update(await _db.db.squads.distinct(
+            "admin_id", {"created_at": {"$gte": since}},
+        ))
+        touched.update(await _db.db.battle_participations.distinct(
+            "user_id", {"joined_at": {"$gte": since}},
+        ))
+        touched.update(await _db.db.matchday_predictions.distinct(
+            "user_id", {"status": "resolved", "updated_at": {"$gte": since}},
+        ))
+        oids = [ObjectId(u) for u in touched if ObjectId.is_valid(u)]
+        if not oids:
+            return []
+        user_filter["_id"] = {"$in": oids}
+
+    users = await _db.db.users.find(user_filter, {"_id": 1}).to_list(length=None)
+    return [str(u["_id"]) for u in users]
+
+
+async def _eligible_users(chunk: list[str]) -> dict[str, set[str]]:
+    """Badge key -> user ids in ``chunk`` that currently qualify for it."""
+    in_chunk = {"$in": chunk}
+    eligible: dict[str, set[str]] = {key: set() for key in BADGE_DEFINITIONS}
+
+    # --- Bet count, first win, underdog king (classic single/parlay slips) ---
+    stats = await _db.db.betting_slips.aggregate([
+        {"$match": {"user_id": in_chunk, "type": _CLASSIC}},
+        {"$group": {
+            "_id": "$user_id",
+            "bets": {"$sum": 1},
+            "wins": {"$sum": {"$cond": [{"$eq": ["$status", "won"]}, 1, 0]}},
+            # Won a single bet with locked_odds > 4.0
+            "underdog": {"$max": {"$cond": [
+                {"$and": [
+                    {"$eq": ["$status", "won"]},
+                    {"$eq": ["$type", "single"]},
+                    {"$gt": [{"$max": "$selections.locked_odds"}, 4.0]},
+                ]},
+                1, 0,
+            ]}},
+        }},
+    ]).to_list(length=None)
+    for s in stats:
+        for badge_key, threshold in _BET_COUNT_BADGES:
+            if s["bets"] >= threshold:
+                eligible[badge_key].add(s["_id"])
+        if s["wins"] >= 1:
+            eligible["first_win"].add(s["_id"])
+        if s["underdog"]:
+            eligible["underdog_king"].add(s["_id"])
+
+    # --- Hot Streak: 3 consecutive wins within the last 20 resolved slips ---
+    for user_id, statuses in (await _recent_results(chunk)).items():
         streak = 0
-        for slip in recent_slips:
-            if slip["status"] == "won":
-                streak += 1
-                if streak >= 3:
-                    await _award(user_id, "hot_streak_3", now)
-                    awarded += 1
-                    break
-            else:
-                streak = 0
+        for status in statuses:
+            streak = streak + 1 if status == "won" else 0
+            if streak >= _STREAK_LENGTH:
+                eligible["hot_streak_3"].add(user_id)
+                break
 
     # --- Squad Leader: created a squad ---
-    if "squad_leader" not in existing_keys:
-        squad = await _db.db.squads.find_one({"admin_id": user_id})
-        if squad:
-            await _award(user_id, "squad_leader", now)
-            awarded += 1
+    eligible["squad_leader"].update(
+        await _db.db.squads.distinct("admin_id", {"admin_id": in_chunk}),
+    )
 
     # --- Battle Victor: participated in a battle ---
-    if "battle_victor" not in existing_keys:
-        participation = await _db.db.battle_participations.find_one({"user_id": user_id})
-        if participation:
-            await _award(user_id, "battle_victor", now)
-            awarded += 1
+    eligible["battle_victor"].update(
+        await _db.db.battle_participations.distinct("user_id", {"user_id": in_chunk}),
+    )
 
     # --- Century Points: 100+ points ---
-    if "century_points" not in existing_keys and user.get("points", 0) >= 100:
-        await _award(user_id, "century_points", now)
-        awarded += 1
+    rich = await _db.db.users.find(
+        {"_id": {"$in": [ObjectId(u) for u in chunk]}, "points": {"$gte": 100}},
+        {"_id": 1},
+    ).to_list(length=None)
+    eligible["century_points"].update(str(u["_id"]) for u in rich)
 
     # --- Matchday badges ---
-    if "matchday_debut" not in existing_keys:
-        matchday_pred = await _db.db.matchday_predictions.find_one({
-            "user_id": user_id, "status": "resolved",
-        })
-        if matchday_pred:
-            await _award(user_id, "matchday_debut", now)
-            awarded += 1
-
-    if "oracle" not in existing_keys:
-        exact_pred = await _db.db.matchday_predictions.find_one({
-            "user_id": user_id,
-            "predictions.points_earned": 3,
-        })
-        if exact_pred:
-            await _award(user_id, "oracle", now)
-            awarded += 1
-
-    if "perfect_matchday" not in existing_keys:
-        # Find a resolved prediction where ALL predictions scored 3
-        perfect = await _db.db.matchday_predictions.find_one({
-            "user_id": user_id,
+    eligible["matchday_debut"].update(await _db.db.matchday_predictions.distinct(
+        "user_id", {"user_id": in_chunk, "status": "resolved"},
+    ))
+    eligible["oracle"].update(await _db.db.matchday_predictions.distinct(
+        "user_id", {"user_id": in_chunk, "predictions.points_earned": 3},
+    ))
+    # A resolved prediction where ALL predictions scored 3
+    eligible["perfect_matchday"].update(await _db.db.matchday_predictions.distinct(
+        "user_id", {
+            "user_id": in_chunk,
             "status": "resolved",
             "predictions": {"$not": {"$elemMatch": {"points_earned": {"$ne": 3}}}},
             "predictions.0": {"$exists": True},  # At least 1 prediction
-        })
-        if perfect:
-            await _award(user_id, "perfect_matchday", now)
-            awarded += 1
-
-    return awarded
-
-
-async def _award(user_id: str, badge_key: str, now: datetime) -> None:
-    """Award a badge to a user."""
-    await _db.db.badges.insert_one({
-        "user_id": user_id,
-        "badge_key": badge_key,
-        "awarded_at": now,
-    })
-    badge = BADGE_DEFINITIONS.get(badge_key, {})
-    logger.info(
-        "Badge awarded: %s → %s (%s)",
-        user_id, badge_key, badge.get("name", "?"),
-    )
+        },
+    ))
+
+    return eligible
+
+
+async def _recent_results(chunk: list[str]) -> dict[str, list[str]]:
+    """Statuses of each user's last resolved classic slips, newest first."""
+    docs = await _db.db.betting_slips.aggregate([
+        {"$match": {
+            "user_id": {"$in": chunk},
+            "status": {"$in": ["won", "lost"]},
+            "type": _CLASSIC,
+        }},
+        {"$group": {
+            "_id": "$user_id",
+            "recent": {"$topN": {
+                "n": _STREAK_WINDOW,
+                "sortBy": {"resolved_at": -1},
+                "output": "$status",
+            }},
+        }},
+    ]).to_list(length=None)
+    return {d["_id"]: d["recent"] for d in docs}
+
+
+async def _insert_awards(docs: list[dict]) -> int:
+    """Insert award docs in one batch; awards raced in meanwhile are skipped."""
+    from pymongo.errors import BulkWriteError
+
+    if not docs:
+        return 0
+    try:
+        result = await _db.db.badges.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        return e.details.get("nInserted", 0)
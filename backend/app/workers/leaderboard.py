@@ -1,5 +1,8 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
 
 import app.database as _db
 from app.workers._state import recently_synced, set_synced
@@ -8,17 +11,30 @@ logger = logging.getLogger("quotico.leaderboard")
 
 _STATE_KEY = "leaderboard"
 
+_STAGING = "leaderboard_staging"
+_INDEXES = [[("points", -1)], [("rank", 1)]]
+
+# Serializes incremental updates with the rebuild's swap, so an update can't
+# land on the collection that is about to be replaced.
+_lock = asyncio.Lock()
+
+
+async def materialize_leaderboard(*, force: bool = False) -> None:
+    """Periodic repair: rebuild the leaderboard collection from users.
 
-async def materialize_leaderboard() -> None:
-    """Recompute the materialized leaderboard collection from users.
+    Incremental updates (``update_leaderboard_entries``) keep the collection
+    current between runs; this pass fixes anything they missed (alias changes,
+    admin edits, failed updates). The new ranking is written to a staging
+    collection and swapped in with a rename, so readers never see a partial
+    or empty leaderboard. The in-memory rank index is re-hydrated afterwards.
 
-    Smart sleep: skips if no points were awarded since last materialization.
-    Runs after match resolution to keep leaderboard up to date.
-    Stores alias (public name) instead of email — no PII in materialized view.
+    Smart sleep: skips if no points were awarded since last materialization
+    (unless *force*). Stores alias (public name) instead of email — no PII in
+    materialized view.
     """
     # Check if any points were awarded since last run
     from app.workers._state import get_synced_at
-    last_run = await get_synced_at(_STATE_KEY)
+    last_run = None if force else await get_synced_at(_STATE_KEY)
     if last_run:
         recent_activity = await _db.db.points_transactions.find_one(
             {"created_at": {"$gte": last_run}},
@@ -27,32 +43,150 @@ async def materialize_leaderboard() -> None:
             logger.debug("Smart sleep: no new points since last run, skipping leaderboard")
             return
 
+    from app.services.leaderboard_service import hydrate_leaderboard_index
+
     pipeline = [
         {"$match": {"is_deleted": False, "points": {"$gt": 0}}},
-        {"$sort": {"points": -1}},
-        {"$limit": 500},
-        {"$project": {"alias": 1, "points": 1, "is_bot": 1}},
+        {"$setWindowFields": {
+            "sortBy": {"points": -1},
+            "output": {"rank": {"$rank": {}}},
+        }},
+        {"$project": {
+            "_id": {"$toString": "$_id"},
+            "user_id": {"$toString": "$_id"},
+            "alias": {"$ifNull": ["$alias", "Anonymous"]},
+            "points": 1,
+            "rank": 1,
+            "is_bot": {"$ifNull": ["$is_bot", False]},
+        }},
+        {"$out": _STAGING},
     ]
 
-    users = await _db.db.users.aggregate(pipeline).to_list(length=500)
+    async with _lock:
+        await _db.db.users.aggregate(pipeline).to_list(length=None)
 
-    if not users:
-        return
+        staging = _db.db[_STAGING]
+        count = await staging.count_documents({})
+        if not count:
+            await staging.drop()
+            return
 
-    # Replace entire leaderboard collection
-    await _db.db.leaderboard.delete_many({})
-
-    docs = [
-        {
-            "user_id": str(u["_id"]),
-            "alias": u.get("alias", "Anonymous"),
-            "points": u["points"],
-            "rank": i + 1,
-            "is_bot": u.get("is_bot", False),
-        }
-        for i, u in enumerate(users)
-    ]
+        for keys in _INDEXES:
+            await staging.create_index(keys)
+        await staging.rename("leaderboard", dropTarget=True)
+        await hydrate_leaderboard_index()
 
-    await _db.db.leaderboard.insert_many(docs)
     await set_synced(_STATE_KEY)
-    logger.info("Leaderboard materialized: %d entries", len(docs))
+    logger.info("Leaderboard materialized: %d entries", count)
+
+
+async def migrate_leaderboard_keys() -> None:
+    """Startup: rebuild a leaderboard still keyed by ObjectId.
+
+    Incremental updates key entries by the user id string; run against an
+    older ObjectId-keyed collection they would duplicate every entry they
+    touch. Must run before the first incremental update.
+    """
+    if not await _db.db.leaderboard.find_one({"_id": {"$type": "objectId"}}, {"_id": 1}):
+        return
+    logger.info("Leaderboard keyed by ObjectId — rebuilding before incremental updates")
+    await materialize_leaderboard(force=True)
+    # No ranked users: the rebuild swapped nothing in
+    await _db.db.leaderboard.delete_many({"_id": {"$type": "objectId"}})
+
+
+# ---------- Incremental maintenance ----------
+
+async def update_leaderboard_entries(user_ids: list[str]) -> None:
+    """Sync the entries of users whose points just changed and re-rank.
+
+    Ranks are competition ranks (1 + users with strictly more points). A user
+    moving from p_old to p_new only shifts the users between those two
+    scores, so only entries in [min(p_old, p_new), max(p_old, p_new)] across
+    all changed users are re-ranked.
+    """
+    if not user_ids:
+        return
+    from pymongo import DeleteOne, UpdateOne
+
+    from app.services.leaderboard_service import leaderboard_index
+
+    oids = []
+    for user_id in user_ids:
+        try:
+            oids.append(ObjectId(user_id))
+        except InvalidId:
+            continue
+
+    async with _lock:
+        users = await _db.db.users.find(
+            {"_id": {"$in": oids}},
+            {"alias": 1, "points": 1, "is_bot": 1, "is_deleted": 1},
+        ).to_list(length=None)
+        current = await _db.db.leaderboard.find(
+            {"_id": {"$in": [str(o) for o in oids]}}, {"points": 1},
+        ).to_list(length=None)
+        old_points = {e["_id"]: e["points"] for e in current}
+
+        ops = []
+        lo = hi = None
+        for u in users:
+            user_id = str(u["_id"])
+            points = u.get("points", 0)
+            ranked = not u.get("is_deleted") and points > 0
+            old = old_points.get(user_id)
+            if ranked:
+                leaderboard_index.upsert(
+                    user_id, points, u.get("alias", "Anonymous"), u.get("is_bot", False),
+                )
+            else:
+                leaderboard_index.remove(user_id)
+            if old == points and ranked:
+                continue
+            if ranked:
+                ops.append(UpdateOne(
+                    {"_id": user_id},
+                    {"$set": {
+                        "user_id": user_id,
+                        "alias": u.get("alias", "Anonymous"),
+                        "points": points,
+                        "is_bot": u.get("is_bot", False),
+                    }},
+                    upsert=True,
+                ))
+            elif old is not None:
+                ops.append(DeleteOne({"_id": user_id}))
+            else:
+                continue
+            # Unranked counts as 0 points: entering or leaving the board shifts
+            # everyone below the entry's score
+            span = [points if ranked else 0, old if old is not None else 0]
+            lo = min(span) if lo is None else min(lo, *span)
+            hi = max(span) if hi is None else max(hi, *span)
+
+        if not ops:
+            return
+        await _db.db.leaderboard.bulk_write(ops, ordered=False)
+        await _rerank_range(lo, hi)
+
+
+async def _rerank_range(lo: float, hi: float) -> None:
+    """Recompute the ranks of all entries with lo <= points <= hi."""
+    from pymongo import UpdateOne
+
+    above = await _db.db.leaderboard.count_documents({"points": {"$gt": hi}})
+    entries = await _db.db.leaderboard.find(
+        {"points": {"$gte": lo, "$lte": hi}}, {"points": 1, "rank": 1},
+    ).sort("points", -1).to_list(length=None)
+
+    ops = []
+    rank = above
+    prev = None
+    for i, e in enumerate(entries):
+        if e["points"] != prev:
+            rank, prev = above + i + 1, e["points"]
+        if e.get("rank") != rank:
+            ops.append(UpdateOne({"_id": e["_id"]}, {"$set": {"rank": rank}}))
+
+    for i in range(0, len(ops), 1000):
+        await _db.db.leaderboard.bulk_write(ops[i:i + 1000], ordered=False)
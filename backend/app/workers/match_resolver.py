@@ -209,65 +209,216 @@ def recalculate_slip(
     return slip
 
 
-async def calculate_points_award(slip: dict, now: datetime) -> None:
-    """Award points or wallet credits based on resolved slip status."""
+def settlement_award(slip: dict) -> dict | None:
+    """Points or wallet credit owed for a slip that just reached a terminal state."""
     slip_type = slip.get("type", "single")
     slip_status = slip.get("status")
     slip_id = str(slip["_id"])
-    user_id = slip["user_id"]
     funding = slip.get("funding", "virtual")
     wallet_id = slip.get("wallet_id")
+    if slip_type not in ("single", "parlay"):
+        # matchday_round, fantasy, survivor — no immediate payout
+        # Leaderboards/standings derived from slip data separately
+        return None
 
-    if slip_type in ("single", "parlay"):
-        if slip_status == "won":
-            payout = slip.get("potential_payout", 0)
-            if payout <= 0:
-                return
-
-            if funding == "wallet" and wallet_id:
-                from app.services import wallet_service
-                squad_id = slip.get("squad_id", "")
-                await wallet_service.credit_win(
-                    wallet_id=wallet_id,
-                    user_id=user_id,
-                    squad_id=squad_id,
-                    amount=payout,
-                    reference_type="betting_slip",
-                    reference_id=slip_id,
-                    description=f"Won slip {slip_id}: {payout:.2f} coins",
-                )
-            else:
-                # Virtual: award points to user
-                await _db.db.users.update_one(
-                    {"_id": ObjectId(user_id)},
-                    {"$inc": {"points": payout}},
-                )
-                await _db.db.points_transactions.insert_one({
-                    "user_id": user_id,
-                    "bet_id": slip_id,
-                    "delta": payout,
-                    "scoring_version": 2,
+    base = {"user_id": slip["user_id"], "squad_id": slip.get("squad_id", "")}
+    if slip_status == "won":
+        payout = slip.get("potential_payout", 0)
+        if payout <= 0:
+            return None
+        if funding == "wallet" and wallet_id:
+            return {
+                **base,
+                "kind": "wallet",
+                "wallet_id": wallet_id,
+                "amount": payout,
+                "reference_type": "betting_slip",
+                "description": f"Won slip {slip_id}: {payout:.2f} coins",
+            }
+        # Virtual: award points to user
+        return {**base, "kind": "points", "amount": payout}
+
+    if slip_status == "void" and funding == "wallet" and wallet_id:
+        # Refund the stake for fully voided wallet-funded slips
+        stake = slip.get("stake", 0)
+        if stake > 0:
+            return {
+                **base,
+                "kind": "wallet",
+                "wallet_id": wallet_id,
+                "amount": stake,
+                "reference_type": "betting_slip_refund",
+                "description": f"Void refund slip {slip_id}: {stake:.2f} coins",
+            }
+    return None
+
+
+# ---------- Bulk settlement ----------
+#
+# A match settles in two steps. First every affected slip is written with its
+# new state in one unordered bulk_write; slips that earn something also get a
+# ``settlement`` subdocument {batch, award, flushed: False}. Then the batch's
+# awards are flushed: ledger rows (unique idempotency_key per slip), one
+# aggregated $inc per user and per wallet, and finally flushed=True.
+#
+# Every flush step is idempotent, so a crash anywhere is repaired by flushing
+# the batch again (replay_pending_settlements): ledger inserts skip existing
+# keys, and the user/wallet $inc only applies where the batch id is not yet
+# in the document's ``settlement_batches`` marker list. Wallets also record
+# their balance right after the batch's credit (``settlement_balances``), so
+# a replay writes the same balance_after as the first flush would have. A
+# marker is pulled only after the batch's slips are marked flushed, so it
+# stays in place for as long as the batch can be replayed.
+
+# Replays leave batches this young alone: their first flush may still be running
+_REPLAY_GRACE = timedelta(minutes=5)
+
+
+def _idempotency_key(slip_id: str) -> str:
+    return f"slip:{slip_id}"
+
+
+async def _insert_idempotent(collection, docs: list[dict]) -> int:
+    """insert_many that skips rows whose idempotency_key already exists."""
+    from pymongo.errors import BulkWriteError
+
+    if not docs:
+        return 0
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+async def _flush_settlement(batch_id: str, slips: list[dict], now: datetime) -> None:
+    """Apply the awards of one settlement batch (safe to repeat)."""
+    from pymongo import UpdateOne
+
+    from app.models.wallet import TransactionType
+
+    marker_push = {"settlement_batches": batch_id}
+    points = [s for s in slips if s["settlement"]["award"]["kind"] == "points"]
+    credits = [s for s in slips if s["settlement"]["award"]["kind"] == "wallet"]
+
+    if points:
+        await _insert_idempotent(_db.db.points_transactions, [
+            {
+                "user_id": s["settlement"]["award"]["user_id"],
+                "bet_id": str(s["_id"]),
+                "delta": s["settlement"]["award"]["amount"],
+                "scoring_version": 2,
+                "idempotency_key": _idempotency_key(str(s["_id"])),
+                "created_at": now,
+            }
+            for s in points
+        ])
+        per_user: dict[str, float] = {}
+        for s in points:
+            award = s["settlement"]["award"]
+            per_user[award["user_id"]] = per_user.get(award["user_id"], 0) + award["amount"]
+        await _db.db.users.bulk_write([
+            UpdateOne(
+                {"_id": ObjectId(user_id), "settlement_batches": {"$ne": batch_id}},
+                {"$inc": {"points": total}, "$push": marker_push},
+            )
+            for user_id, total in per_user.items()
+        ], ordered=False)
+        try:
+            from app.workers.leaderboard import update_leaderboard_entries
+            await update_leaderboard_entries(list(per_user))
+        except Exception:
+            # The periodic leaderboard rebuild repairs it
+            logger.warning("Leaderboard update failed for batch %s", batch_id, exc_info=True)
+
+    if credits:
+        from app.services.wallet_service import credit_settlement_batch
+
+        per_wallet: dict[str, dict] = {}
+        for s in sorted(credits, key=lambda s: s["_id"]):
+            award = s["settlement"]["award"]
+            entry = per_wallet.setdefault(
+                award["wallet_id"], {"user_id": award["user_id"], "amount": 0, "slips": []},
+            )
+            entry["amount"] += award["amount"]
+            entry["slips"].append(s)
+
+        # Balance right after this batch's credit, recorded on each wallet
+        # when first applied so a replay logs the same values
+        balances = await credit_settlement_batch(batch_id, {
+            wallet_id: (entry["user_id"], entry["amount"])
+            for wallet_id, entry in per_wallet.items()
+        })
+        tx_docs = []
+        for wallet_id, entry in per_wallet.items():
+            if wallet_id not in balances:
+                continue
+            balance = balances[wallet_id]
+            # balance_after per transaction: walk the batch's credits back
+            # from the post-credit balance
+            for s in reversed(entry["slips"]):
+                award = s["settlement"]["award"]
+                tx_docs.append({
+                    "wallet_id": wallet_id,
+                    "user_id": award["user_id"],
+                    "squad_id": award["squad_id"],
+                    "type": TransactionType.BET_WON.value,
+                    "amount": award["amount"],
+                    "balance_after": balance,
+                    "reference_type": award["reference_type"],
+                    "reference_id": str(s["_id"]),
+                    "description": award["description"],
+                    "idempotency_key": _idempotency_key(str(s["_id"])),
                     "created_at": now,
                 })
+                balance -= award["amount"]
+        await _insert_idempotent(_db.db.wallet_transactions, tx_docs[::-1])
+
+    await _db.db.betting_slips.update_many(
+        {"_id": {"$in": [s["_id"] for s in slips]}, "settlement.batch": batch_id},
+        {"$set": {"settlement.flushed": True}},
+    )
+
+    # The batch can no longer be replayed: drop its markers (a crash before
+    # this point only leaves a stale marker behind)
+    if points:
+        await _db.db.users.update_many(
+            {"_id": {"$in": [ObjectId(u) for u in per_user]}},
+            {"$pull": {"settlement_batches": batch_id}},
+        )
+    if credits:
+        await _db.db.wallets.update_many(
+            {"_id": {"$in": [ObjectId(w) for w in per_wallet]}},
+            {"$pull": {
+                "settlement_batches": batch_id,
+                "settlement_balances": {"batch": batch_id},
+            }},
+        )
 
-        elif slip_status == "void" and funding == "wallet" and wallet_id:
-            # Refund the stake for fully voided wallet-funded slips
-            from app.services import wallet_service
-            stake = slip.get("stake", 0)
-            squad_id = slip.get("squad_id", "")
-            if stake > 0:
-                await wallet_service.credit_win(
-                    wallet_id=wallet_id,
-                    user_id=user_id,
-                    squad_id=squad_id,
-                    amount=stake,
-                    reference_type="betting_slip_refund",
-                    reference_id=slip_id,
-                    description=f"Void refund slip {slip_id}: {stake:.2f} coins",
-                )
-
-    # matchday_round, fantasy, survivor — no immediate payout
-    # Leaderboards/standings derived from slip data separately
+
+async def replay_pending_settlements() -> int:
+    """Flush settlement batches left unfinished by a crash; returns slips replayed."""
+    now = utcnow()
+    pending = await _db.db.betting_slips.find(
+        # settlement.batch keeps the query on the partial (flushed=False) index
+        {"settlement.batch": {"$exists": True}, "settlement.flushed": False},
+        {"user_id": 1, "settlement": 1},
+    ).to_list(length=None)
+    by_batch: dict[str, list[dict]] = {}
+    for slip in pending:
+        settled_at = slip["settlement"].get("at")
+        if settled_at is not None and ensure_utc(settled_at) > now - _REPLAY_GRACE:
+            continue
+        by_batch.setdefault(slip["settlement"]["batch"], []).append(slip)
+    replayed = 0
+    for batch_id, slips in by_batch.items():
+        logger.warning("Replaying settlement batch %s (%d slips)", batch_id, len(slips))
+        await _flush_settlement(batch_id, slips, now)
+        replayed += len(slips)
+    return replayed
 
 
 def auto_lock_selections(
@@ -321,6 +472,9 @@ async def resolve_matches() -> None:
 
     Smart sleep: skips sports with no started-but-unresolved matches.
     Safety margin: polls each sport at least once every 6 hours.
+    Confirmed results are enqueued on the settlement queue and settled at the
+    end of the sweep; matches the live poller already handed over are usually
+    final by then, so their sports sleep.
     """
     now = utcnow()
 
@@ -351,6 +505,12 @@ async def resolve_matches() -> None:
         except Exception as e:
             logger.error("Resolution failed for %s: %s", sport_key, e)
 
+    from app.workers.settlement_queue import settle_queued_matches
+    try:
+        await settle_queued_matches()
+    except Exception:
+        logger.exception("Settlement queue drain failed")
+
     await _auto_close_stale_matches(now)
     await cleanup_stale_drafts()
 
@@ -386,6 +546,11 @@ async def _auto_close_stale_matches(now: datetime) -> None:
                 {"$set": update},
             )
             match_id = str(match["_id"])
+            try:
+                from app.services.team_rating_service import refresh_final_match
+                await refresh_final_match(match["_id"])
+            except Exception:
+                logger.warning("Team ratings update failed for %s", match_id, exc_info=True)
             logger.warning(
                 "Auto-closed stale match %s (%s vs %s, %s) — no provider result, needs admin review",
                 match_id, match.get("home_team"), match.get("away_team"), sport_key,
@@ -401,6 +566,7 @@ async def _resolve_match(
 
     Universal resolver: handles all slip types (single, parlay, matchday_round,
     survivor, fantasy) via resolve_selection() + recalculate_slip() dispatch.
+    Slips are resolved in memory and flushed in bulk (see "Bulk settlement").
     """
     now = utcnow()
     match_id = str(match["_id"])
@@ -422,7 +588,7 @@ async def _resolve_match(
     affected_slips = await _db.db.betting_slips.find({
         "selections.match_id": match_id,
         "status": {"$in": ["pending", "partial", "draft"]},
-    }).to_list(length=10000)
+    }).to_list(length=None)
 
     # Pre-fetch squad configs for all affected slips (batch, not N+1)
     squad_ids = list({s["squad_id"] for s in affected_slips if s.get("squad_id")})
@@ -444,8 +610,11 @@ async def _resolve_match(
                 config = sq.get("game_mode_config", {})
             squad_config_map[str(sq["_id"])] = config
 
-    resolved_count = 0
-    awarded_count = 0
+    from pymongo import UpdateOne
+
+    batch_id = f"{match_id}:{ObjectId()}"
+    slip_ops: list = []
+    awarded: list[dict] = []
 
     for slip in affected_slips:
         # Skip pure drafts — only process if the slip has locked/pending selections
@@ -480,10 +649,8 @@ async def _resolve_match(
             continue
 
         # Recalculate slip-level status
-        old_status = slip["status"]
         recalculate_slip(slip, now, squad_config=squad_config)
 
-        # Persist updated slip
         update_fields: dict = {
             "selections": slip["selections"],
             "status": slip["status"],
@@ -502,22 +669,28 @@ async def _resolve_match(
         if slip.get("streak") is not None and slip.get("type") == "survivor":
             update_fields["streak"] = slip["streak"]
 
-        await _db.db.betting_slips.update_one(
-            {"_id": slip["_id"]},
-            {"$set": update_fields},
-        )
-        resolved_count += 1
-
         # Award points/credits for terminal states
+        award = None
         if slip["status"] in ("won", "lost", "void", "resolved"):
-            try:
-                await calculate_points_award(slip, now)
-                if slip["status"] == "won":
-                    awarded_count += 1
-            except Exception as e:
-                logger.error(
-                    "Points award failed for slip %s: %s", str(slip["_id"]), e,
-                )
+            award = settlement_award(slip)
+        if award is not None:
+            slip["settlement"] = {"batch": batch_id, "award": award, "flushed": False, "at": now}
+            update_fields["settlement"] = slip["settlement"]
+            awarded.append(slip)
+
+        slip_ops.append(UpdateOne({"_id": slip["_id"]}, {"$set": update_fields}))
+
+    # Persist all slip states (and pending awards) first, then flush the awards
+    for i in range(0, len(slip_ops), 1000):
+        await _db.db.betting_slips.bulk_write(slip_ops[i:i + 1000], ordered=False)
+    resolved_count = len(slip_ops)
+    awarded_count = sum(1 for s in awarded if s["status"] == "won")
+    if awarded:
+        try:
+            await _flush_settlement(batch_id, awarded, now)
+        except Exception as e:
+            # Left flushed=False; replay_pending_settlements() retries the batch
+            logger.error("Settlement flush failed for batch %s: %s", batch_id, e)
 
     logger.info(
         "Resolved %s (%s vs %s): %s %d-%d | %d slips affected, %d awarded",
@@ -530,6 +703,21 @@ async def _resolve_match(
     from app.routers.ws import live_manager
     await live_manager.broadcast_match_resolved(match_id, result)
 
+    # Fold the result into both teams' rating history
+    try:
+        from app.services.team_rating_service import record_final_match
+        await record_final_match({
+            **match,
+            "result": {
+                **match.get("result", {}),
+                "outcome": result,
+                "home_score": home_score,
+                "away_score": away_score,
+            },
+        })
+    except Exception:
+        logger.warning("Team ratings update failed for %s", match_id, exc_info=True)
+
     # Update QuoticoTip for backtesting
     bet_doc = await _db.db.quotico_tips.find_one({"match_id": match_id})
     if bet_doc:
@@ -543,6 +731,14 @@ async def _resolve_match(
         )
 
 
+async def _enqueue_result(match: dict, score: dict) -> None:
+    """Hand a provider-confirmed result to the settlement queue."""
+    from app.workers.settlement_queue import enqueue_settlement
+    await enqueue_settlement(
+        str(match["_id"]), match.get("sport_key", ""), source="resolver", score=score,
+    )
+
+
 async def _find_match_by_team(
     sport_key: str, score_data: dict
 ) -> Optional[dict]:
@@ -584,10 +780,7 @@ async def _resolve_german_league(sport_key: str) -> None:
             for score in secondary:
                 match = await _find_match_by_team(sport_key, score)
                 if match:
-                    await _resolve_match(
-                        match, score["result"],
-                        score["home_score"], score["away_score"],
-                    )
+                    await _enqueue_result(match, score)
         return
 
     for p_score in primary:
@@ -612,17 +805,29 @@ async def _resolve_german_league(sport_key: str) -> None:
                 p_score["home_score"], p_score["away_score"],
             )
 
-        await _resolve_match(
-            match, p_score["result"],
-            p_score["home_score"], p_score["away_score"],
-        )
+        await _enqueue_result(match, p_score)
+
+
+def _same_fixture(a: dict, b: dict) -> bool:
+    """Same home and away team, kicking off within 6 hours of each other."""
+    if not (
+        teams_match(a.get("home_team", ""), b.get("home_team", ""))
+        and teams_match(a.get("away_team", ""), b.get("away_team", ""))
+    ):
+        return False
+    try:
+        return abs(parse_utc(a["utc_date"]) - parse_utc(b["utc_date"])) <= timedelta(hours=6)
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return False
 
 
 def _cross_validate(
     primary_score: dict, secondary_scores: list[dict]
 ) -> Optional[bool]:
+    # Match the fixture, not just the home team: the secondary feed may be an
+    # older cache holding the team's previous home game
     for s in secondary_scores:
-        if not teams_match(primary_score["home_team"], s["home_team"]):
+        if not _same_fixture(primary_score, s):
             continue
 
         if (
@@ -649,10 +854,7 @@ async def _resolve_via_football_data(sport_key: str) -> None:
     for score in scores:
         match = await _find_match_by_team(sport_key, score)
         if match:
-            await _resolve_match(
-                match, score["result"],
-                score["home_score"], score["away_score"],
-            )
+            await _enqueue_result(match, score)
 
 
 # ---------- Fallback: TheOddsAPI (costs credits) ----------
@@ -674,8 +876,8 @@ async def _resolve_via_odds_api(sport_key: str) -> None:
         if not match:
             continue
 
-        await _resolve_match(
-            match, score_data["result"],
-            score_data.get("home_score", 0),
-            score_data.get("away_score", 0),
-        )
+        await _enqueue_result(match, {
+            "result": score_data["result"],
+            "home_score": score_data.get("home_score", 0),
+            "away_score": score_data.get("away_score", 0),
+        })
@@ -199,6 +199,15 @@ async def _sync_single_matchday(
     )
 
 
+async def _record_team_ratings(match_id) -> None:
+    """Fold a match finalized (or re-scored) by the sync into team ratings."""
+    try:
+        from app.services.team_rating_service import refresh_final_match
+        await refresh_final_match(match_id)
+    except Exception:
+        logger.warning("Team ratings update failed for %s", match_id, exc_info=True)
+
+
 async def _find_or_create_match(
     sport_key: str, season: int, matchday_number: int,
     provider_match: dict, now: datetime,
@@ -262,6 +271,12 @@ async def _find_or_create_match(
         await _db.db.matches.update_one(
             {"_id": existing["_id"]}, {"$set": update}
         )
+        old_result = existing.get("result") or {}
+        if update.get("status") == "final" and (
+            existing.get("status") != "final"
+            or (old_result.get("home_score"), old_result.get("away_score")) != (hs, aws)
+        ):
+            await _record_team_ratings(existing["_id"])
         return await _db.db.matches.find_one({"_id": existing["_id"]})
 
     # No match found — create a new one
@@ -305,6 +320,8 @@ async def _find_or_create_match(
     try:
         insert_result = await _db.db.matches.insert_one(doc)
         doc["_id"] = insert_result.inserted_id
+        if status == "final":
+            await _record_team_ratings(doc["_id"])
         return doc
     except Exception as e:
         # Duplicate key — race condition, fetch existing
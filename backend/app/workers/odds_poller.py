@@ -1,5 +1,5 @@
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from pymongo.errors import DuplicateKeyError
 
@@ -26,6 +26,7 @@ async def poll_odds() -> None:
     any_polled = False
     total_matches = 0
     total_odds_changed = 0
+    tip_timings: dict[str, int] = {}
 
     for sport_key in SUPPORTED_SPORTS:
         has_imminent = await _db.db.matches.find_one({
@@ -67,8 +68,12 @@ async def poll_odds() -> None:
                     await live_manager.broadcast_odds_updated(sport_key, odds_changed)
                 except Exception:
                     logger.warning("WS broadcast failed for %s", sport_key, exc_info=True)
-                # Chain: regenerate QuoticoTip candidates for this sport
-                await _generate_candidates(sport_key)
+            # Chain: regenerate QuoticoTip candidates for matches whose lines
+            # moved (plus any recomputes left pending by an earlier run)
+            tip_stats = await _generate_candidates(sport_key, result["changed_ids"])
+            if tip_stats:
+                for stage, ms in tip_stats["timings"].items():
+                    tip_timings[stage] = tip_timings.get(stage, 0) + ms
         except Exception as e:
             logger.error("Poll failed for %s: %s", sport_key, e)
 
@@ -76,6 +81,7 @@ async def poll_odds() -> None:
         await set_synced("odds_poller", metrics={
             "matches": total_matches,
             "odds_changed": total_odds_changed,
+            "tip_timings": tip_timings,
         })
         usage = odds_provider.api_usage
         logger.info(
@@ -87,10 +93,12 @@ async def poll_odds() -> None:
 
 async def _snapshot_odds(sport_key: str) -> None:
     """Record current odds as a point-in-time snapshot for line movement tracking."""
+    from app.services.odds_snapshot_service import append_snapshots
+
     now = utcnow()
     matches = await _db.db.matches.find(
         {"sport_key": sport_key, "status": "scheduled"},
-        {"_id": 1, "metadata.theoddsapi_id": 1, "sport_key": 1, "odds": 1},
+        {"_id": 1, "metadata.theoddsapi_id": 1, "sport_key": 1, "odds": 1, "match_date": 1},
     ).to_list(length=200)
 
     if not matches:
@@ -108,9 +116,81 @@ async def _snapshot_odds(sport_key: str) -> None:
         }
         for m in matches
     ]
-    await _db.db.odds_snapshots.insert_many(docs, ordered=False)
+    await append_snapshots(docs)
     logger.debug("Snapshotted odds for %d %s matches", len(docs), sport_key)
 
+    commence = {str(m["_id"]): m.get("match_date") for m in matches}
+    await _update_line_movement(sport_key, docs, commence)
+
+
+async def _update_line_movement(
+    sport_key: str, docs: list[dict], commence: dict[str, datetime | None],
+) -> None:
+    """Fold fresh snapshots into each match's LineMovementState (O(1) per match).
+
+    Matches without a state yet are seeded by replaying their stored series
+    (which already includes *docs*). Steam moves detected in this interval are
+    pushed to live clients right away.
+    """
+    from pymongo import ReplaceOne
+
+    from app.services.odds_snapshot_service import load_odds_snapshots
+    from app.services.quotico_tip_service import (
+        advance_line_movement,
+        late_window_moved,
+        replay_line_movement,
+        reschedule_line_movement,
+    )
+
+    match_ids = [d["match_id"] for d in docs]
+    existing = await _db.db.line_movement.find(
+        {"_id": {"$in": match_ids}},
+    ).to_list(length=len(match_ids))
+    states = {st.pop("_id"): st for st in existing}
+    missing = [mid for mid in match_ids if mid not in states]
+    history = await load_odds_snapshots(missing) if missing else {}
+    # Rescheduled matches rebuild their late-money window from the series
+    # stored before this poll's snapshot
+    rescheduled = {
+        mid for mid, st in states.items() if late_window_moved(st, commence.get(mid))
+    }
+    earlier = (
+        await load_odds_snapshots(
+            list(rescheduled), before_date=min(d["snapshot_at"] for d in docs),
+        )
+        if rescheduled else {}
+    )
+
+    ops = []
+    steam_moves: list[tuple[str, str, float]] = []
+    for doc in docs:
+        match_id = doc["match_id"]
+        state = states.get(match_id)
+        if state is None:
+            state = replay_line_movement(
+                history.get(match_id) or [doc], commence.get(match_id),
+            )
+        else:
+            if match_id in rescheduled:
+                reschedule_line_movement(
+                    state, commence.get(match_id), earlier.get(match_id, []),
+                )
+            steam = advance_line_movement(state, doc["odds"], doc["snapshot_at"])
+            if steam:
+                steam_moves.append((match_id, *steam))
+        ops.append(ReplaceOne({"_id": match_id}, state, upsert=True))
+    if ops:
+        await _db.db.line_movement.bulk_write(ops, ordered=False)
+
+    if steam_moves:
+        logger.info("Steam moves in %s: %d", sport_key, len(steam_moves))
+        try:
+            from app.routers.ws import live_manager
+            for match_id, outcome, drop_pct in steam_moves:
+                await live_manager.broadcast_steam_move(match_id, sport_key, outcome, drop_pct)
+        except Exception:
+            logger.warning("WS steam broadcast failed for %s", sport_key, exc_info=True)
+
 
 async def _is_initial_load(sport_key: str) -> bool:
     """Check if we have any matches at all for this sport (first run)."""
@@ -118,51 +198,27 @@ async def _is_initial_load(sport_key: str) -> bool:
     return existing is None
 
 
-async def _generate_candidates(sport_key: str) -> None:
-    """Generate/refresh QuoticoTip candidates for a sport after odds change.
+async def _generate_candidates(sport_key: str, changed_ids: list[str]) -> dict | None:
+    """Generate/refresh QuoticoTip candidates for matches whose odds moved.
 
     Phase 1 of the Q-Bot pipeline: EV analysis runs immediately when odds
     arrive so candidates are always fresh. Actual betting happens at T-15min
     in run_qbot_bets().
-    """
-    from app.services.quotico_tip_service import generate_quotico_tip
 
-    now = utcnow()
-    matches = await _db.db.matches.find(
-        {"sport_key": sport_key, "status": "scheduled", "match_date": {"$gt": now}},
-    ).to_list(length=200)
-
-    if not matches:
-        return
-
-    generated = 0
-    no_signal = 0
-
-    for match in matches:
-        match_id = str(match["_id"])
+    *changed_ids* are flagged dirty first; the whole dirty set for the sport is
+    then drained, so recomputes interrupted by a restart are picked up on the
+    next poll. Returns the batch stats (incl. per-stage timings), or None when
+    nothing is pending.
+    """
+    from bson import ObjectId
 
-        # Skip if existing QuoticoTip is still fresh (generated after last odds update)
-        existing = await _db.db.quotico_tips.find_one(
-            {"match_id": match_id}, {"generated_at": 1},
-        )
-        if existing:
-            odds_updated = match.get("odds", {}).get("updated_at")
-            if odds_updated:
-                bet_generated = ensure_utc(existing["generated_at"])
-                if bet_generated >= ensure_utc(odds_updated):
-                    continue
+    from app.services.quotico_tip_service import (
+        dirty_tip_ids,
+        mark_tips_dirty,
+        refresh_quotico_tips,
+    )
 
-        try:
-            qbet = await generate_quotico_tip(match)
-            await _db.db.quotico_tips.update_one(
-                {"match_id": match_id}, {"$set": qbet}, upsert=True,
-            )
-            if qbet.get("status") == "active":
-                generated += 1
-            else:
-                no_signal += 1
-        except Exception as e:
-            logger.error("QuoticoTip generation failed for %s: %s", match_id, e)
+    now = utcnow()
 
     # Expire stale candidates (match started)
     expired = await _db.db.quotico_tips.update_many(
@@ -170,11 +226,35 @@ async def _generate_candidates(sport_key: str) -> None:
         {"$set": {"status": "expired"}},
     )
 
-    if generated or no_signal or expired.modified_count:
+    await mark_tips_dirty(sport_key, changed_ids)
+    pending = await dirty_tip_ids(sport_key)
+    if not pending:
+        return None
+
+    matches = await _db.db.matches.find(
+        {
+            "_id": {"$in": [ObjectId(mid) for mid in pending]},
+            "status": "scheduled",
+            "match_date": {"$gt": now},
+        },
+    ).to_list(length=len(pending))
+
+    # Flags for matches that kicked off (or vanished) can never be served
+    eligible = {str(m["_id"]) for m in matches}
+    gone = [mid for mid in pending if mid not in eligible]
+    if gone:
+        await _db.db.quotico_tip_dirty.delete_many({"_id": {"$in": gone}})
+    if not matches:
+        return None
+
+    stats = await refresh_quotico_tips(matches, refresh_undated=False)
+    stats["expired"] = expired.modified_count
+    if stats["generated"] or stats["no_signal"] or stats["expired"]:
         logger.info(
             "QuoticoTips for %s: %d generated, %d no_signal, %d expired",
-            sport_key, generated, no_signal, expired.modified_count,
+            sport_key, stats["generated"], stats["no_signal"], stats["expired"],
         )
+    return stats
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,44 @@
+import logging
+
+import app.database as _db
+
+logger = logging.getLogger("quotico.qbot_backtests")
+
+
+async def refresh_qbot_backtests() -> None:
+    """Bring the Qbot Lab list backtests up to date with newly resolved tips.
+
+    Covers the strategies the list page shows (active, shadow and the latest
+    per league) for its penultimate-season window. Each league's tip dataset
+    is loaded once; curves whose dataset version is unchanged are left as is,
+    the rest are extended (or recomputed after a DNA change).
+    """
+    from app.services.qbot_backtest_service import load_backtest_curve, season_window_since
+    from app.services.tip_dataset_cache import load_tip_dataset
+
+    strategies = await _db.db.qbot_strategies.find(
+        {"dna": {"$exists": True, "$ne": {}}},
+    ).sort("created_at", -1).to_list(2000)
+
+    by_sport: dict[str, list[dict]] = {}
+    for doc in strategies:
+        docs = by_sport.setdefault(doc.get("sport_key", "all"), [])
+        if not docs or doc.get("is_active") or doc.get("is_shadow"):
+            docs.append(doc)
+
+    since_date = season_window_since()
+    refreshed = 0
+    for sport_key, docs in by_sport.items():
+        try:
+            dataset = await load_tip_dataset(None if sport_key in (None, "", "all") else sport_key)
+        except Exception:
+            logger.exception("Backtest refresh: tip dataset for %s failed", sport_key)
+            continue
+        for doc in docs:
+            try:
+                await load_backtest_curve(doc, since_date=since_date, dataset=dataset)
+                refreshed += 1
+            except Exception:
+                logger.exception("Backtest refresh failed for strategy %s", doc["_id"])
+
+    logger.info("Qbot backtests refreshed: %d strategies", refreshed)
@@ -7,8 +7,8 @@ upcoming soccer matches. Uses smart sleep to skip when no odds have been updated
 import logging
 
 import app.database as _db
-from app.services.quotico_tip_service import generate_quotico_tip
-from app.utils import ensure_utc, utcnow
+from app.services.quotico_tip_service import refresh_quotico_tips
+from app.utils import ensure_utc
 from app.workers._state import get_synced_at, set_synced
 
 logger = logging.getLogger("quotico.quotico_tip_worker")
@@ -21,15 +21,13 @@ async def generate_quotico_tips() -> None:
 
     Smart sleep: only runs if odds have been updated since last bet generation.
     """
-    now = utcnow()
-
-    # Smart sleep: check if any odds were polled since our last run
+    # Smart sleep: check if any lines moved since our last run
     target_statuses = ["scheduled", "live"]
     last_run = await get_synced_at(_STATE_KEY)
     if last_run:
         last_run = ensure_utc(last_run)
         recent_odds_update = await _db.db.matches.find_one(
-            {"odds.updated_at": {"$gte": last_run}, "status": {"$in": target_statuses}},
+            {"odds.changed_at": {"$gte": last_run}, "status": {"$in": target_statuses}},
         )
         if not recent_odds_update:
             # Still generate tips for live matches that have none
@@ -58,44 +56,7 @@ async def generate_quotico_tips() -> None:
         await set_synced(_STATE_KEY)
         return
 
-    generated = 0
-    no_signal = 0
-    fresh = 0
-
-    for match in matches:
-        match_id = str(match["_id"])
-
-        # Check if existing bet is still fresh (generated after last odds update)
-        existing = await _db.db.quotico_tips.find_one(
-            {"match_id": match_id},
-            {"generated_at": 1},
-        )
-        if existing:
-            odds_updated = ensure_utc(match.get("odds", {}).get("updated_at") or now)
-            bet_generated = ensure_utc(existing["generated_at"])
-            if bet_generated >= odds_updated:
-                fresh += 1
-                continue
-
-        try:
-            bet = await generate_quotico_tip(match)
-            # Enrich with Qbot intelligence (graceful — skips if no strategy)
-            try:
-                from app.services.qbot_intelligence_service import enrich_tip
-                bet = await enrich_tip(bet)
-            except Exception:
-                logger.warning("Qbot enrichment failed for %s", match_id, exc_info=True)
-            await _db.db.quotico_tips.update_one(
-                {"match_id": match_id},
-                {"$set": bet},
-                upsert=True,
-            )
-            if bet.get("status") == "active":
-                generated += 1
-            else:
-                no_signal += 1
-        except Exception as e:
-            logger.error("Failed to generate bet for %s: %s", match_id, e)
+    stats = await refresh_quotico_tips(matches, enrich=True)
 
     # Expire tips only for matches that reached a terminal state (final/cancelled)
     final_match_ids = await _db.db.matches.distinct(
@@ -107,8 +68,10 @@ async def generate_quotico_tips() -> None:
         {"$set": {"status": "expired"}},
     )
 
-    await set_synced(_STATE_KEY)
+    stats["expired"] = expired.modified_count
+    await set_synced(_STATE_KEY, metrics=stats)
     logger.info(
-        "QuoticoTips: %d generated, %d no_signal, %d fresh, %d expired",
-        generated, no_signal, fresh, expired.modified_count,
+        "QuoticoTips: %d generated, %d no_signal, %d fresh, %d expired (%s)",
+        stats["generated"], stats["no_signal"], stats["fresh"], stats["expired"],
+        ", ".join(f"{k}={v}" for k, v in stats["timings"].items()),
     )
@@ -0,0 +1,305 @@
+"""Settlement queue — settle matches as soon as their final score is confirmed.
+
+Producers enqueue match-finished events into the durable ``settlement_queue``
+collection (one document per match, ``_id`` = match id):
+
+- the live-score poller, when a match drops out of the live feed
+- the match resolver, with the final score it already fetched and validated
+
+The consumer runs every 30 seconds. It first replays settlement batches whose
+award flush was interrupted, then claims due entries, confirms the score
+from finished results the providers already hold in memory (German leagues are
+cross-validated against football-data.org exactly as in the resolver) and
+settles the match via ``_resolve_match``; a match that is already final but
+still has open legs (an attempt that failed after writing the result) is
+settled again from its stored result. It never calls a provider itself:
+those results come from the resolver's finished-scores fetches and from final
+scores the OpenLigaDB and football-data.org live polls merge in. TheOddsAPI
+leagues are settled through the resolver's own enqueue, which carries the
+score. Unconfirmed entries are retried with exponential backoff;
+after ``_MAX_ATTEMPTS`` they are parked as ``failed`` until a new event re-arms
+them. Events arriving while an entry is claimed are kept on it and re-arm it
+when the claim is released. A crashed consumer's claim expires after
+``_LEASE``.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+import app.database as _db
+from app.providers.football_data import (
+    SPORT_TO_COMPETITION,
+    football_data_provider,
+    teams_match,
+)
+from app.providers.openligadb import openligadb_provider
+from app.utils import ensure_utc, parse_utc, utcnow
+from app.workers.match_resolver import (
+    GERMAN_LEAGUES,
+    _cross_validate,
+    _resolve_match,
+    replay_pending_settlements,
+)
+
+logger = logging.getLogger("quotico.settlement_queue")
+
+_BATCH = 200
+_LEASE = timedelta(minutes=5)
+_RETRY_BASE = timedelta(seconds=30)
+_RETRY_MAX = timedelta(minutes=15)
+_MAX_ATTEMPTS = 12
+_KICKOFF_TOLERANCE = timedelta(hours=6)
+
+# One consumer at a time: the 30-second job and the resolver's drain would
+# otherwise settle two legs of one slip concurrently, and _resolve_match
+# rewrites the whole selections array.
+_lock = asyncio.Lock()
+
+
+# ---------- Producers ----------
+
+async def enqueue_settlement(
+    match_id: str, sport_key: str, *, source: str, score: dict | None = None,
+) -> None:
+    """Record a match-finished event.
+
+    ``score`` ({result, home_score, away_score}) is passed when the caller has
+    already confirmed the final result; without it the consumer looks the
+    result up itself. Every event re-arms the entry for an immediate attempt.
+    An entry that is currently claimed gets the score and a ``rearm`` flag
+    instead, which the consumer honours when it releases the claim; settled
+    entries are left untouched.
+    """
+    now = utcnow()
+    fields: dict = {
+        "sport_key": sport_key,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "updated_at": now,
+    }
+    if score is not None:
+        fields["score"] = {
+            "result": score["result"],
+            "home_score": score["home_score"],
+            "away_score": score["away_score"],
+        }
+    try:
+        await _db.db.settlement_queue.update_one(
+            {"_id": match_id, "status": {"$nin": ["done", "processing"]}},
+            {
+                "$set": fields,
+                "$setOnInsert": {"enqueued_at": now},
+                "$addToSet": {"sources": source},
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Already settled, or being settled right now: hand the event to the
+        # running attempt
+        rearm: dict = {"rearm": True}
+        if "score" in fields:
+            rearm["score"] = fields["score"]
+        await _db.db.settlement_queue.update_one(
+            {"_id": match_id, "status": "processing"},
+            {"$set": rearm, "$addToSet": {"sources": source}},
+        )
+
+
+# ---------- Consumer ----------
+
+def _backoff(attempts: int) -> timedelta:
+    return min(_RETRY_BASE * (2 ** max(attempts - 1, 0)), _RETRY_MAX)
+
+
+def _score_for_match(match: dict, scores: list[dict]) -> Optional[dict]:
+    """Find the provider score for a DB match by home team + kickoff."""
+    kickoff = ensure_utc(match["match_date"])
+    for score in scores:
+        if not teams_match(match.get("home_team", ""), score.get("home_team", "")):
+            continue
+        try:
+            if abs(parse_utc(score["utc_date"]) - kickoff) <= _KICKOFF_TOLERANCE:
+                return score
+        except (KeyError, ValueError, TypeError, AttributeError):
+            continue
+    return None
+
+
+def _finished_feeds(sport_key: str) -> dict[str, list[dict]]:
+    """Finished scores per provider as already cached (the feeds the resolver reads)."""
+    if sport_key in GERMAN_LEAGUES:
+        return {
+            "primary": openligadb_provider.cached_finished_scores(sport_key),
+            "secondary": football_data_provider.cached_finished_scores(sport_key),
+        }
+    if sport_key in SPORT_TO_COMPETITION:
+        return {"primary": football_data_provider.cached_finished_scores(sport_key)}
+    # TheOddsAPI matches only arrive via the resolver, with their score
+    return {"primary": []}
+
+
+def _confirm_score(match: dict, feeds: dict[str, list[dict]]) -> tuple[Optional[dict], str]:
+    """Return (confirmed score, reason) for a match from the finished feeds."""
+    primary = feeds.get("primary", [])
+    secondary = feeds.get("secondary")
+
+    if secondary is not None and not primary:
+        # Resolver policy: OpenLigaDB empty -> football-data.org alone
+        score = _score_for_match(match, secondary)
+        return (score, "confirmed") if score else (None, "no final score yet")
+
+    score = _score_for_match(match, primary)
+    if not score:
+        return None, "no final score yet"
+    if secondary is not None and _cross_validate(score, secondary) is False:
+        return None, "provider score mismatch"
+    return score, "confirmed"
+
+
+async def _settle_entry(entry: dict, feeds: dict[str, list[dict]]) -> tuple[bool, str]:
+    """Settle one claimed entry. Returns (finished, reason)."""
+    try:
+        match = await _db.db.matches.find_one({"_id": ObjectId(entry["_id"])})
+    except InvalidId:
+        match = None
+    if not match:
+        return True, "match not found"
+    result = match.get("result") or {}
+    if match.get("status") == "final" and result.get("outcome") is not None:
+        # _resolve_match writes the result before the slips; a failed attempt
+        # can leave open legs on a final match, which are settled from it here
+        open_leg = await _db.db.betting_slips.find_one(
+            {
+                "status": {"$in": ["pending", "partial", "draft"]},
+                "selections": {"$elemMatch": {
+                    "match_id": str(match["_id"]),
+                    "status": {"$in": ["pending", "locked"]},
+                }},
+            },
+            {"_id": 1},
+        )
+        if not open_leg:
+            return True, "already resolved"
+        await _resolve_match(
+            match, result["outcome"], result.get("home_score"), result.get("away_score"),
+        )
+        return True, "resumed settlement"
+
+    score = entry.get("score")
+    reason = "confirmed"
+    if score is None:
+        score, reason = _confirm_score(match, feeds)
+        if score is None:
+            return False, reason
+
+    await _resolve_match(match, score["result"], score["home_score"], score["away_score"])
+    return True, reason
+
+
+async def _claim(entry: dict, now: datetime) -> Optional[dict]:
+    return await _db.db.settlement_queue.find_one_and_update(
+        {"_id": entry["_id"], "status": entry["status"], "updated_at": entry.get("updated_at")},
+        {
+            "$set": {"status": "processing", "lease_until": now + _LEASE, "updated_at": now},
+            "$unset": {"rearm": ""},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def settle_queued_matches() -> int:
+    """Consume due settlement-queue entries. Returns the number of matches settled."""
+    async with _lock:
+        return await _drain_queue()
+
+
+async def _drain_queue() -> int:
+    # Finish award flushes interrupted by a crash before settling anything new
+    try:
+        await replay_pending_settlements()
+    except Exception:
+        logger.exception("Settlement replay failed")
+
+    now = utcnow()
+    due = await _db.db.settlement_queue.find({
+        "$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now}},
+            {"status": "processing", "lease_until": {"$lte": now}},
+        ],
+    }).sort("next_attempt_at", 1).to_list(length=_BATCH)
+    if not due:
+        return 0
+
+    by_sport: dict[str, list[dict]] = {}
+    for entry in due:
+        by_sport.setdefault(entry.get("sport_key", ""), []).append(entry)
+
+    settled = 0
+    for sport_key, entries in by_sport.items():
+        feeds = _finished_feeds(sport_key)
+
+        for entry in entries:
+            claimed = await _claim(entry, now)
+            if not claimed:
+                continue  # re-armed or claimed elsewhere since the scan
+
+            try:
+                finished, reason = await _settle_entry(claimed, feeds)
+            except Exception as e:
+                logger.error("Settlement of match %s failed: %s", claimed["_id"], e)
+                finished, reason = False, f"error: {e}"
+
+            done_at = utcnow()
+            if finished:
+                await _db.db.settlement_queue.update_one(
+                    {"_id": claimed["_id"], "status": "processing"},
+                    {"$set": {
+                        "status": "done", "reason": reason,
+                        "settled_at": done_at, "updated_at": done_at,
+                    }, "$unset": {"lease_until": "", "rearm": ""}},
+                )
+                settled += 1
+                enqueued_at = claimed.get("enqueued_at")
+                if enqueued_at:
+                    logger.info(
+                        "Settlement queue: match %s %s after %.0fs",
+                        claimed["_id"], reason,
+                        (done_at - ensure_utc(enqueued_at)).total_seconds(),
+                    )
+                continue
+
+            attempts = claimed.get("attempts", 0) + 1
+            status = "failed" if attempts >= _MAX_ATTEMPTS else "pending"
+            released = await _db.db.settlement_queue.update_one(
+                {"_id": claimed["_id"], "status": "processing", "rearm": {"$ne": True}},
+                {"$set": {
+                    "status": status, "attempts": attempts, "reason": reason,
+                    "next_attempt_at": done_at + _backoff(attempts), "updated_at": done_at,
+                }, "$unset": {"lease_until": ""}},
+            )
+            if not released.matched_count:
+                # An event (possibly with the score) arrived during the attempt
+                rearmed = await _db.db.settlement_queue.update_one(
+                    {"_id": claimed["_id"], "status": "processing", "rearm": True},
+                    {"$set": {
+                        "status": "pending", "attempts": 0, "reason": reason,
+                        "next_attempt_at": done_at, "updated_at": done_at,
+                    }, "$unset": {"lease_until": "", "rearm": ""}},
+                )
+                if rearmed.matched_count:
+                    continue
+            if status == "failed":
+                logger.warning(
+                    "Settlement queue: giving up on match %s after %d attempts (%s) — needs admin review",
+                    claimed["_id"], attempts, reason,
+                )
+
+    return settled
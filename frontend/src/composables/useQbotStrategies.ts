@@ -32,6 +32,16 @@ export interface QbotStrategyIdentity {
   created_at: string;
 }
 
+export interface QbotBacktestSummary {
+  starting_bankroll: number;
+  ending_bankroll: number;
+  total_bets: number;
+  wins: number;
+  win_rate: number;
+  weighted_roi: number;
+  computed_at: string;
+}
+
 export interface QbotStrategy {
   id: string;
   sport_key: string;
@@ -72,6 +82,7 @@ export interface QbotStrategy {
     bets_diff: number;
     sharpe_diff: number;
   } | null;
+  backtest_summary?: QbotBacktestSummary | null;
 }
 
 export interface QbotStrategiesResponse {
@@ -0,0 +1,158 @@
+"""
+Odds snapshot migration — copy legacy ``odds_snapshots`` docs into day buckets.
+
+Streams the old one-document-per-snapshot collection in (match_id, snapshot_at)
+order and appends each snapshot to ``odds_snapshot_buckets`` via the same
+write path the odds poller uses. Matches that already have buckets (written by
+the poller after the deploy, or by an earlier interrupted run) are rebuilt from
+the merged, de-duplicated series, so the tool is safe to re-run.
+
+Usage:
+    # Migrate everything:
+    python -m tools.migrate_odds_snapshots
+
+    # Show counts without writing:
+    python -m tools.migrate_odds_snapshots --dry-run
+
+    # Drop the legacy collection after a successful migration:
+    python -m tools.migrate_odds_snapshots --drop-old
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add backend to Python path so we can import app modules
+sys.path.insert(0, "backend")
+
+# Default to local MongoDB when not set
+if "MONGO_URI" not in os.environ:
+    os.environ["MONGO_URI"] = "mongodb://localhost:27017/quotico"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  %(levelname)-7s  %(message)s",
+    datefmt="%H:%M:%S",
+)
+log = logging.getLogger("migrate_odds_snapshots")
+
+
+async def run_migration(batch_size: int, dry_run: bool, drop_old: bool) -> None:
+    import app.database as _db
+    from app.services.odds_snapshot_service import append_snapshots, load_odds_snapshots
+    from app.utils import ensure_utc
+
+    await _db.connect_db()
+    log.info("Connected to MongoDB: %s", _db.db.name)
+
+    already = set(await _db.db.odds_snapshot_buckets.distinct("match_id"))
+    legacy_total = await _db.db.odds_snapshots.estimated_document_count()
+    log.info(
+        "Legacy snapshots: ~%d, matches already bucketed: %d%s",
+        legacy_total, len(already), " [DRY RUN]" if dry_run else "",
+    )
+
+    t0 = time.monotonic()
+    migrated = 0
+    merged = 0
+    skipped = 0
+    batch: list[dict] = []
+
+    async def flush() -> None:
+        nonlocal batch, migrated
+        if batch and not dry_run:
+            await append_snapshots(batch, ordered=True)
+        migrated += len(batch)
+        batch = []
+        log.info("  %d snapshots migrated (%.1fs)", migrated, time.monotonic() - t0)
+
+    async def rebuild(match_id: str, legacy: list[dict]) -> None:
+        """Merge legacy snapshots with existing buckets and rewrite them in order."""
+        nonlocal merged
+        existing = (await load_odds_snapshots([match_id], with_lines=True)).get(match_id, [])
+        by_ts = {ensure_utc(s["snapshot_at"]): s for s in legacy}
+        for s in existing:
+            by_ts.setdefault(ensure_utc(s["snapshot_at"]), {**legacy[0], **s})
+        series = [by_ts[ts] for ts in sorted(by_ts)]
+        if not dry_run:
+            await _db.db.odds_snapshot_buckets.delete_many({"match_id": match_id})
+            await append_snapshots(series, ordered=True)
+        merged += 1
+
+    current_id: str | None = None
+    pending: list[dict] = []
+    cursor = _db.db.odds_snapshots.find(
+        {}, {"_id": 0},
+    ).sort([("match_id", 1), ("snapshot_at", 1)])
+    async for snap in cursor:
+        match_id = snap.get("match_id")
+        if not match_id or not snap.get("snapshot_at"):
+            skipped += 1
+            continue
+        # Old docs stored totals under totals_odds
+        if "totals" not in snap and "totals_odds" in snap:
+            snap["totals"] = snap.pop("totals_odds")
+
+        if match_id != current_id:
+            if pending:
+                await rebuild(current_id, pending)
+                pending = []
+            current_id = match_id
+        if match_id in already:
+            pending.append(snap)
+            continue
+
+        batch.append(snap)
+        if len(batch) >= batch_size:
+            await flush()
+
+    if pending:
+        await rebuild(current_id, pending)
+    await flush()
+
+    bucket_count = await _db.db.odds_snapshot_buckets.estimated_document_count()
+    log.info("=" * 60)
+    log.info("ODDS SNAPSHOT MIGRATION COMPLETE%s", " [DRY RUN]" if dry_run else "")
+    log.info("  Snapshots migrated: %d", migrated)
+    log.info("  Matches merged:     %d", merged)
+    log.info("  Skipped:            %d", skipped)
+    log.info("  Buckets now:        %d", bucket_count)
+    log.info("  Total time:         %.1fs", time.monotonic() - t0)
+    log.info("=" * 60)
+
+    if drop_old and not dry_run:
+        await _db.db.odds_snapshots.drop()
+        log.info("Dropped legacy odds_snapshots collection")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate odds_snapshots into per-match day buckets",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Snapshots per bulk write (default: 1000)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Count snapshots without writing to DB",
+    )
+    parser.add_argument(
+        "--drop-old", action="store_true",
+        help="Drop the legacy odds_snapshots collection afterwards",
+    )
+
+    args = parser.parse_args()
+
+    asyncio.run(run_migration(
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        drop_old=args.drop_old,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,20 @@ Usage:
     python -m tools.qbot_ensemble_miner --sport soccer_epl
     python -m tools.qbot_ensemble_miner --multi --runs 7 --base-seed 42
     python -m tools.qbot_ensemble_miner --sport soccer_epl --mode deep
+    python -m tools.qbot_ensemble_miner --multi --runs 7 --seed-workers 4
+
+Tips are loaded once per league and shared by every seed; with
+--seed-workers each seed process maps the same cached tip-dataset version
+(memory-mapped, so the pages are shared) instead of reloading the tips.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import concurrent.futures
 import math
+import multiprocessing
 import os
 import sys
 from datetime import datetime, timezone
@@ -30,6 +37,8 @@ CV_ROBUST_MAX = 0.10
 CV_UNSTABLE_MIN = 0.30
 CV_EPSILON = 1e-9
 _ARENA: Any = None
+# Dataset of a seed worker process (opened by _open_seed_dataset)
+_SEED_DATASET: dict[str, Any] | None = None
 
 
 def _arena():
@@ -99,6 +108,8 @@ async def _run_one_seed(
     generations: int,
     candidate_workers: int,
     lookback_years: int,
+    dataset: dict[str, Any] | None = None,
+    reference_now: datetime | None = None,
 ) -> dict[str, Any]:
     if mode == "deep":
         result = await _arena().run_evolution_deep(
@@ -110,6 +121,8 @@ async def _run_one_seed(
             resume=False,
             candidate_workers=candidate_workers,
             lookback_years=lookback_years,
+            dataset=dataset,
+            reference_now=reference_now,
         )
     else:
         result = await _arena().run_evolution(
@@ -122,10 +135,33 @@ async def _run_one_seed(
             search_mode=mode,
             candidate_workers=candidate_workers,
             lookback_years=lookback_years,
+            dataset=dataset,
+            reference_now=reference_now,
         )
     return result
 
 
+def _open_seed_dataset(location: dict[str, Any]) -> None:
+    """Seed-pool initializer: map the tip-dataset version the parent loaded."""
+    global _SEED_DATASET
+    from app.services.tip_dataset_cache import open_tip_dataset
+
+    dataset = asyncio.run(open_tip_dataset(
+        location["sport_key"], cache_dir=location["cache_dir"], key=location["key"],
+    ))
+    lo, hi = location["offset"], location["offset"] + location["count"]
+    _SEED_DATASET = {
+        **dataset,
+        "count": location["count"],
+        "columns": {name: col[lo:hi] for name, col in dataset["columns"].items()},
+    }
+
+
+def _run_one_seed_sync(sport_key: str | None, kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Process-pool entry: one seed against the worker's mapped dataset."""
+    return asyncio.run(_run_one_seed(sport_key, dataset=_SEED_DATASET, **kwargs))
+
+
 def _build_consensus(
     run_results: list[dict[str, Any]],
 ) -> tuple[dict[str, float], list[dict[str, Any]], dict[str, Any]]:
@@ -372,29 +408,74 @@ async def _mine_sport(
     dry_run: bool,
     with_archetypes: bool,
     lookback_years: int,
+    seed_workers: int = 1,
 ) -> dict[str, Any]:
     sport_label = sport_key or "all"
     print(f"\n=== Ensemble mining: {sport_label} | runs={runs} | mode={mode} ===")
 
-    run_results: list[dict[str, Any]] = []
-    for i in range(runs):
-        seed = base_seed + i
-        print(f"Run {i + 1}/{runs} with seed={seed}")
-        result = await _run_one_seed(
-            sport_key,
-            seed=seed,
-            mode=mode,
-            population_size=population_size,
-            generations=generations,
-            candidate_workers=candidate_workers,
-            lookback_years=lookback_years,
-        )
-        run_results.append(result)
+    # One load and one time-weight reference for every seed, so a seed's
+    # result does not depend on when or where it ran
+    dataset = await _arena().load_tips(sport_key, lookback_years=lookback_years)
+    reference_now = _utcnow()
+    seed_kwargs = [
+        {
+            "seed": base_seed + i,
+            "mode": mode,
+            "population_size": population_size,
+            "generations": generations,
+            "candidate_workers": candidate_workers,
+            "lookback_years": lookback_years,
+            "reference_now": reference_now,
+        }
+        for i in range(runs)
+    ]
+
+    def _report(i: int, result: dict[str, Any]) -> None:
         if "error" in result:
-            print(f"  -> failed: {result.get('error')}")
+            print(f"  -> run {i + 1} (seed={base_seed + i}) failed: {result.get('error')}")
         else:
             roi = float((result.get("validation_fitness") or {}).get("roi", 0.0))
-            print(f"  -> ROI={roi:+.4f}")
+            print(f"  -> run {i + 1} (seed={base_seed + i}) ROI={roi:+.4f}")
+
+    run_results: list[dict[str, Any]] = [{} for _ in range(runs)]
+    workers = min(seed_workers, runs)
+    if workers > 1:
+        print(f"Running {runs} seeds on {workers} processes")
+        # forkserver/spawn, not fork: this process runs an asyncio loop and
+        # Motor's threads. Workers get the dataset's cache location and map
+        # the same version, so the columns are shared through the page cache.
+        location = {
+            "cache_dir": str(_arena().TIP_CACHE_DIR),
+            "sport_key": sport_key,
+            "key": dataset["key"],
+            "offset": dataset["offset"],
+            "count": dataset["count"],
+        }
+        methods = multiprocessing.get_all_start_methods()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn",
+            ),
+            initializer=_open_seed_dataset,
+            initargs=(location,),
+        ) as pool:
+            futures = {
+                pool.submit(_run_one_seed_sync, sport_key, kw): i
+                for i, kw in enumerate(seed_kwargs)
+            }
+            for future in concurrent.futures.as_completed(futures):
+                i = futures[future]
+                try:
+                    run_results[i] = future.result()
+                except Exception as e:
+                    run_results[i] = {"error": str(e)}
+                _report(i, run_results[i])
+    else:
+        for i, kw in enumerate(seed_kwargs):
+            print(f"Run {i + 1}/{runs} with seed={kw['seed']}")
+            run_results[i] = await _run_one_seed(sport_key, dataset=dataset, **kw)
+            _report(i, run_results[i])
 
     consensus_dna, gene_rows, summary = _build_consensus(run_results)
     _print_gene_table(gene_rows)
@@ -440,6 +521,7 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument("--population", type=int, default=None, help="Population size override")
     parser.add_argument("--generations", type=int, default=None, help="Generations override")
     parser.add_argument("--candidate-workers", type=int, default=1, help="Per-run candidate stress workers")
+    parser.add_argument("--seed-workers", type=int, default=1, help="Processes running seeds side by side (default: 1)")
     parser.add_argument("--lookback-years", type=int, default=8, help="Load only tips from the last N years")
     parser.add_argument("--with-archetypes", action="store_true", help="Also persist profit_hunter and volume_grinder")
     parser.add_argument("--dry-run", action="store_true", help="Do not persist ensemble strategy")
@@ -480,6 +562,7 @@ async def _run(args: argparse.Namespace) -> None:
                 dry_run=args.dry_run,
                 with_archetypes=bool(args.with_archetypes),
                 lookback_years=max(1, int(args.lookback_years)),
+                seed_workers=max(1, int(args.seed_workers)),
             )
     finally:
         await _db.close_db()
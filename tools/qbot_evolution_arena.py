@@ -18,6 +18,9 @@ Usage:
     python -m tools.qbot_evolution_arena --watch 6h                # periodic tip reload
     python -m tools.qbot_evolution_arena --mode deep               # 5-fold CV pessimistic
     python -m tools.qbot_evolution_arena --generations 50 --population 300
+    python -m tools.qbot_evolution_arena --population 1000 --float32   # large populations
+    python -m tools.qbot_evolution_arena --population 1000 --eval-workers 8   # all cores
+    python -m tools.qbot_evolution_arena --rebuild-tip-cache       # rescan tips into tip_cache/
 """
 
 import argparse
@@ -29,7 +32,9 @@ import os
 import signal as _signal
 import sys
 import time
-from collections import defaultdict
+import weakref
+from collections import OrderedDict, defaultdict
+from collections.abc import Sequence
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -129,6 +134,9 @@ MC_FINAL_PATHS = 30000
 MC_FAIL_FAST_CHECK_PATHS = (500, 1000)
 MC_FAIL_FAST_CHECK_LIMITS = (0.30, 0.25)
 BOOTSTRAP_VECTOR_MAX_CELLS = 20_000_000
+EVAL_CHUNK_CELLS = 262_144  # (bots x tips) cells per evaluate_population chunk (~2 MB float64)
+FITNESS_CACHE_SIZE = 100_000  # LRU entries (DNA x dataset x settings) kept across generations
+FITNESS_CACHE_PRECISION = 6   # DNA rounding for cache keys (as _dna_cache_key)
 
 # Mode defaults (tuned for 32GB dedicated memory)
 MODE_DEFAULTS = {
@@ -138,6 +146,7 @@ MODE_DEFAULTS = {
 
 # Mining mode
 CHECKPOINT_DIR = Path("checkpoints")
+TIP_CACHE_DIR = Path("tip_cache")
 CHECKPOINT_INTERVAL = 5
 STAGNATION_THRESHOLD = 20
 RADIATION_MUTATION_RATE = 0.25
@@ -175,37 +184,78 @@ async def load_tips(
     sport_key: str | None,
     *,
     lookback_years: int = DEFAULT_LOOKBACK_YEARS,
-) -> list[dict]:
-    """Load all resolved tips from MongoDB."""
-    import app.database as _db
+    rebuild_cache: bool = False,
+) -> dict:
+    """Load all resolved tips as columns from the on-disk tip cache.
 
-    query = {"status": "resolved", "was_correct": {"$ne": None}}
-    if sport_key:
-        query["sport_key"] = sport_key
+    Returns the ``TipDataset`` (see app.services.tip_dataset_cache) with its
+    columns cut to the lookback window; slices of the memory-mapped arrays,
+    so nothing is copied until vectorization. ``offset`` is the window's
+    start row in the cached version.
+    """
+    from app.services.tip_dataset_cache import load_tip_dataset
+
+    dataset = await load_tip_dataset(sport_key, cache_dir=TIP_CACHE_DIR, rebuild=rebuild_cache)
+    columns = dataset["columns"]
+    lo = 0
     if lookback_years > 0:
-        now = _utcnow()
-        cutoff = now - timedelta(days=365 * lookback_years)
-        query["match_date"] = {"$gte": cutoff}
-
-    projection = {
-        "match_id": 1,
-        "sport_key": 1,
-        "match_date": 1,
-        "edge_pct": 1,
-        "confidence": 1,
-        "implied_probability": 1,
-        "was_correct": 1,
-        "recommended_selection": 1,
-        "tier_signals": 1,
-        "qbot_logic": 1,
-    }
+        cutoff = _utcnow() - timedelta(days=365 * lookback_years)
+        lo = int(np.searchsorted(columns["match_us"], _to_us(cutoff), side="left"))
+    hi = min(len(columns["match_us"]), lo + 100_000)
+    columns = {name: col[lo:hi] for name, col in columns.items()}
 
-    tips = await _db.db.quotico_tips.find(
-        query, projection,
-    ).sort("match_date", 1).to_list(length=100_000)
+    log.info("Loaded %d resolved tips (lookback=%dy, cache=%s)", hi - lo, lookback_years, dataset["key"])
+    return {**dataset, "count": hi - lo, "offset": lo, "columns": columns}
 
-    log.info("Loaded %d resolved tips (lookback=%dy)", len(tips), lookback_years)
-    return tips
+
+def week_segments(iso_week: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Segment the tip axis into runs of equal ``iso_week``.
+
+    Returns ``(week_starts, week_of_run)``: the start offset of every run and
+    the index of the run's week in ``np.unique(iso_week)``. Tips arrive
+    sorted by match_date, so each week is normally a single run and
+    ``week_of_run`` is ``arange(n_weeks)``.
+    """
+    if iso_week.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    week_starts = np.flatnonzero(np.r_[True, iso_week[1:] != iso_week[:-1]])
+    _, week_of_run = np.unique(iso_week[week_starts], return_inverse=True)
+    return week_starts.astype(np.int64), week_of_run.astype(np.int64)
+
+
+def weekly_sums(
+    values: np.ndarray,
+    data: dict[str, np.ndarray],
+    *,
+    lo: int = 0,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Per-week sums of *values* along the last axis (one segmented reduction).
+
+    *values* covers tips ``[lo, lo + values.shape[-1])``; sums are added into
+    *out* (``(..., n_weeks)``), which is allocated when omitted.
+    """
+    week_starts = data["week_starts"]
+    week_of_run = data["week_of_run"]
+    n_weeks = int(week_of_run.max()) + 1 if week_of_run.size else 0
+    if out is None:
+        out = np.zeros(values.shape[:-1] + (n_weeks,), dtype=np.float64)
+    hi = lo + values.shape[-1]
+    if hi <= lo:
+        return out
+
+    # Runs overlapping [lo, hi): the one containing lo through the last starting before hi
+    first = int(np.searchsorted(week_starts, lo, side="right")) - 1
+    last = int(np.searchsorted(week_starts, hi, side="left"))
+    offsets = np.maximum(week_starts[first:last], lo) - lo
+    run_sums = np.add.reduceat(values, offsets, axis=-1, dtype=np.float64)
+    runs = week_of_run[first:last]
+    if runs.size < 2 or np.all(runs[1:] > runs[:-1]):
+        out[..., runs] += run_sums
+    else:
+        # A week split over several runs (unsorted input)
+        np.add.at(np.moveaxis(out, -1, 0), runs, np.moveaxis(run_sums, -1, 0))
+    return out
 
 
 def vectorize_tips(
@@ -215,113 +265,73 @@ def vectorize_tips(
     reference_now: datetime | None = None,
 ) -> dict[str, np.ndarray]:
     """Convert tip documents to numpy arrays for vectorized evaluation."""
-    n = len(tips)
+    from app.services.tip_dataset_cache import tip_columns
+
+    return vectorize_columns(
+        tip_columns(tips), lookback_years=lookback_years, reference_now=reference_now,
+    )
+
+
+def vectorize_columns(
+    columns: dict[str, np.ndarray],
+    *,
+    lo: int = 0,
+    hi: int | None = None,
+    lookback_years: int = DEFAULT_LOOKBACK_YEARS,
+    reference_now: datetime | None = None,
+) -> dict[str, np.ndarray]:
+    """Evaluation arrays for tips ``[lo, hi)`` of the cached tip columns.
+
+    Adds what depends on the run rather than the tip (time weights relative
+    to *reference_now*, odds fallback) and the week segments
+    (``week_starts``, ``week_of_run``) used by every weekly-Sharpe reduction.
+    """
+    from app.services.tip_dataset_cache import MISSING_US
+
     ref_now = reference_now or _utcnow()
+    cols = {name: np.asarray(col[lo:hi]) for name, col in columns.items()}
 
-    edge_pct = np.zeros(n, dtype=np.float64)
-    confidence = np.zeros(n, dtype=np.float64)
-    implied_prob = np.zeros(n, dtype=np.float64)
-    was_correct = np.zeros(n, dtype=np.bool_)
-    iso_week = np.zeros(n, dtype=np.int32)
-    time_weight = np.zeros(n, dtype=np.float64)
-
-    # Signal-specific boost amounts (pre-computed from tier_signals)
-    sharp_boost = np.zeros(n, dtype=np.float64)
-    momentum_boost = np.zeros(n, dtype=np.float64)
-    rest_boost = np.zeros(n, dtype=np.float64)
-
-    # New v2 arrays
-    pick_type = np.zeros(n, dtype=np.int8)         # 0=home, 1=draw, 2=away
-    h2h_weight_tip = np.zeros(n, dtype=np.float64)  # from tier_signals.poisson.h2h_weight
-    bayes_conf = np.zeros(n, dtype=np.float64)      # from qbot_logic.bayesian_confidence
-
-    # We need odds to compute Kelly stake and profit
-    odds = np.zeros(n, dtype=np.float64)
-
-    for i, tip in enumerate(tips):
-        edge_pct[i] = tip.get("edge_pct", 0.0)
-        confidence[i] = tip.get("confidence", 0.0)
-        implied_prob[i] = tip.get("implied_probability", 0.33)
-        was_correct[i] = bool(tip.get("was_correct", False))
-
-        # ISO week for Sharpe bucketing
-        md = tip.get("match_date")
-        if md:
-            iso_week[i] = md.isocalendar()[1] + md.isocalendar()[0] * 100
-            time_weight[i] = get_time_weight(md, reference_now=ref_now, lookback_years=lookback_years)
-        else:
-            iso_week[i] = 0
-            time_weight[i] = TIME_WEIGHT_FLOOR
-
-        # Odds approximation from implied probability
-        ip = implied_prob[i]
-        odds[i] = (1.0 / ip) if ip > 0.01 else 10.0
-
-        # Extract signal contributions
-        signals = tip.get("tier_signals", {})
-
-        # Sharp: was there a sharp move agreeing with pick?
-        sharp_sig = signals.get("sharp_movement", {})
-        if sharp_sig.get("has_sharp_movement") and sharp_sig.get("direction") == tip.get("recommended_selection"):
-            sharp_boost[i] = 0.10
-            if sharp_sig.get("is_late_money"):
-                sharp_boost[i] = 0.12
-            if sharp_sig.get("has_steam_move") and sharp_sig.get("steam_outcome") == tip.get("recommended_selection"):
-                sharp_boost[i] += 0.03
-
-        # Momentum: how much form gap contributes
-        momentum_sig = signals.get("momentum", {})
-        gap = momentum_sig.get("gap", 0.0)
-        if gap > 0.20:
-            # Check if momentum direction agrees with pick
-            home_m = momentum_sig.get("home", {}).get("momentum_score", 0.5)
-            away_m = momentum_sig.get("away", {}).get("momentum_score", 0.5)
-            pick = tip.get("recommended_selection")
-            if (pick == "1" and home_m > away_m) or (pick == "2" and away_m > home_m):
-                momentum_boost[i] = 0.08
-
-        # Rest advantage (can be None)
-        rest_sig = signals.get("rest_advantage") or {}
-        if rest_sig.get("contributes"):
-            diff = rest_sig.get("diff", 0)
-            pick = tip.get("recommended_selection")
-            if (pick == "1" and diff > 0) or (pick == "2" and diff < 0):
-                rest_boost[i] = 0.04
-
-        # Pick type encoding (for venue bias genes)
-        pick = tip.get("recommended_selection")
-        if pick == "1":
-            pick_type[i] = 0
-        elif pick == "X":
-            pick_type[i] = 1
-        else:
-            pick_type[i] = 2
+    # ISO week for Sharpe bucketing; linear time decay to the lookback horizon
+    match_us = cols["match_us"]
+    has_date = match_us != MISSING_US
+    days_old = np.maximum(0.0, (_to_us(ref_now) - match_us) / 1e6 / 86400.0)
+    horizon_days = max(1.0, float(lookback_years) * 365.0)
+    time_weight = np.where(
+        has_date, np.maximum(TIME_WEIGHT_FLOOR, 1.0 - days_old / horizon_days), TIME_WEIGHT_FLOOR,
+    )
 
-        # H2H weight from Poisson signal (nullable -> 0.0)
-        poisson_sig = signals.get("poisson") or {}
-        h2h_weight_tip[i] = poisson_sig.get("h2h_weight", 0.0)
+    # Odds approximation from implied probability
+    implied_prob = np.where(np.isnan(cols["implied_prob"]), 0.33, cols["implied_prob"])
+    odds = np.full(implied_prob.shape, 10.0)
+    np.divide(1.0, implied_prob, out=odds, where=implied_prob > 0.01)
 
-        # Bayesian confidence from qbot_logic (nullable -> 0.333 prior)
-        qbot = tip.get("qbot_logic") or {}
-        bayes_conf[i] = qbot.get("bayesian_confidence", 0.333)
+    iso_week = np.where(has_date, cols["iso_week"], 0).astype(np.int32)
+    week_starts, week_of_run = week_segments(iso_week)
 
     return {
-        "edge_pct": edge_pct,
-        "confidence": confidence,
+        "edge_pct": cols["edge_pct"].astype(np.float64),
+        "confidence": cols["confidence"].astype(np.float64),
         "implied_prob": implied_prob,
-        "was_correct": was_correct,
+        "was_correct": cols["was_correct"].astype(np.bool_),
         "odds": odds,
         "iso_week": iso_week,
         "time_weight": time_weight,
-        "sharp_boost": sharp_boost,
-        "momentum_boost": momentum_boost,
-        "rest_boost": rest_boost,
-        "pick_type": pick_type,
-        "h2h_weight": h2h_weight_tip,
-        "bayes_conf": bayes_conf,
+        "sharp_boost": cols["sharp_boost"].astype(np.float64),
+        "momentum_boost": cols["momentum_boost"].astype(np.float64),
+        "rest_boost": cols["rest_boost"].astype(np.float64),
+        "pick_type": cols["pick_type"].astype(np.int8),
+        "h2h_weight": cols["h2h_weight"].astype(np.float64),
+        "bayes_conf": cols["bayes_conf"].astype(np.float64),
+        "week_starts": week_starts,
+        "week_of_run": week_of_run,
     }
 
 
+def column_date(columns: dict[str, np.ndarray], i: int) -> datetime:
+    """match_date of tip *i* of the cached tip columns."""
+    return _EPOCH + timedelta(microseconds=int(columns["match_us"][i]))
+
+
 # ---------------------------------------------------------------------------
 # Fitness evaluation (fully vectorized via 2D broadcasting)
 # ---------------------------------------------------------------------------
@@ -333,9 +343,17 @@ def evaluate_population(
     min_bets_for_fitness: int = MIN_BETS_FOR_FITNESS,
     penalty_k: float = SOFT_PENALTY_K,
     penalty_lambda: float = SOFT_PENALTY_LAMBDA,
+    float32: bool = False,
+    chunk_cells: int = EVAL_CHUNK_CELLS,
 ) -> np.ndarray:
     """Evaluate fitness for all bots simultaneously.
 
+    The tip axis is walked in chunks of ~``chunk_cells / P`` tips, so the
+    (P, chunk) intermediates stay cache-sized and peak memory does not grow
+    with N. Totals, the running equity curve (cumulative P&L, running peak,
+    max drawdown) and weekly P&L are carried between chunks in float64;
+    ``float32=True`` halves the per-chunk working set.
+
     Args:
         population: (P, 13) array of DNA parameters
         data: vectorized tip arrays of shape (N,)
@@ -343,120 +361,218 @@ def evaluate_population(
     Returns:
         (P,) array of fitness scores
     """
+    return evaluate_prefixes(
+        population, data, [data["edge_pct"].shape[0]],
+        min_bets_for_fitness=min_bets_for_fitness,
+        penalty_k=penalty_k,
+        penalty_lambda=penalty_lambda,
+        float32=float32,
+        chunk_cells=chunk_cells,
+    )[0]
+
+
+def evaluate_prefixes(
+    population: np.ndarray,
+    data: dict[str, np.ndarray],
+    prefix_ends: Sequence[int],
+    *,
+    min_bets_for_fitness: int = MIN_BETS_FOR_FITNESS,
+    penalty_k: float = SOFT_PENALTY_K,
+    penalty_lambda: float = SOFT_PENALTY_LAMBDA,
+    float32: bool = False,
+    chunk_cells: int = EVAL_CHUNK_CELLS,
+) -> np.ndarray:
+    """(F, P) fitness on the tip prefixes ``data[:end]`` for each of *prefix_ends*.
+
+    One pass over the tips: chunks are cut at every prefix end, and the
+    carried state (totals, equity curve, weekly P&L) is scored there, so the
+    expanding deep-mode training folds cost one evaluation of the longest.
+    """
     P = population.shape[0]
     N = data["edge_pct"].shape[0]
+    dtype = np.float32 if float32 else np.float64
+    pop = population.astype(dtype, copy=False)
 
     # Extract DNA columns -> (P, 1) for broadcasting
-    min_edge    = population[:, 0:1]
-    min_conf    = population[:, 1:2]
-    sharp_w     = population[:, 2:3]
-    momentum_w  = population[:, 3:4]
-    rest_w      = population[:, 4:5]
-    kelly_f     = population[:, 5:6]
-    max_s       = population[:, 6:7]
-    home_bias_w = population[:, 7:8]
-    away_bias_w = population[:, 8:9]
-    h2h_w       = population[:, 9:10]
-    draw_thresh = population[:, 10:11]
-    vol_buffer  = population[:, 11:12]
-    bayes_trust = population[:, 12:13]
-
-    # Tip arrays -> (1, N) for broadcasting
-    edge    = data["edge_pct"][np.newaxis, :]
-    conf    = data["confidence"][np.newaxis, :]
-    imp     = data["implied_prob"][np.newaxis, :]
-    correct = data["was_correct"][np.newaxis, :]
-    odds    = data["odds"][np.newaxis, :]
-    s_boost = data["sharp_boost"][np.newaxis, :]
-    m_boost = data["momentum_boost"][np.newaxis, :]
-    r_boost = data["rest_boost"][np.newaxis, :]
-    pick    = data["pick_type"][np.newaxis, :]      # (1, N) int8
-    h2h_t   = data["h2h_weight"][np.newaxis, :]     # (1, N)
-    bayes_c = data["bayes_conf"][np.newaxis, :]     # (1, N)
-    t_weight = data["time_weight"][np.newaxis, :]   # (1, N)
-
-    # --- Confidence pipeline ---
-    # 1. Base: signal-weighted boosts
-    adj_conf = conf + sharp_w * s_boost + momentum_w * m_boost + rest_w * r_boost
-
-    # 2. Venue bias: multiply by home_bias or away_bias based on pick type
-    is_home = (pick == 0)
-    is_draw = (pick == 1)
-    is_away = (pick == 2)
-    bias = is_home * home_bias_w + is_draw * 1.0 + is_away * away_bias_w
-    adj_conf = adj_conf * bias
+    min_edge    = pop[:, 0:1]
+    min_conf    = pop[:, 1:2]
+    sharp_w     = pop[:, 2:3]
+    momentum_w  = pop[:, 3:4]
+    rest_w      = pop[:, 4:5]
+    kelly_f     = pop[:, 5:6]
+    max_s       = pop[:, 6:7]
+    home_bias_w = pop[:, 7:8]
+    away_bias_w = pop[:, 8:9]
+    h2h_w       = pop[:, 9:10]
+    draw_thresh = pop[:, 10:11]
+    vol_buffer  = pop[:, 11:12]
+    bayes_trust = pop[:, 12:13]
 
-    # 3. H2H amplification
-    adj_conf = adj_conf + h2h_w * h2h_t * 0.10
-
-    # 4. Bayesian trust blending
     blend_weight = np.clip(bayes_trust * 0.5, 0.0, 0.75)
-    adj_conf = (1.0 - blend_weight) * adj_conf + blend_weight * bayes_c
-
-    adj_conf = np.clip(adj_conf, 0.0, 0.99)
-
-    # --- Filter mask ---
-    mask = (edge >= min_edge) & (conf >= min_conf)
-
-    # Draw gate: draws must exceed draw_threshold on ADJUSTED confidence
-    # IMPORTANT: applied AFTER full confidence pipeline
-    draw_gate = is_draw & (adj_conf < draw_thresh)
-    mask = mask & ~draw_gate
-
-    # --- Kelly with volatility buffer ---
-    buffered_edge = adj_conf - imp - vol_buffer
-    buffered_edge = np.maximum(buffered_edge, 0.0)
-    denom = np.maximum(odds - 1.0, 0.01)
-    kelly_raw = kelly_f * buffered_edge / denom
-    kelly_raw = np.maximum(kelly_raw, 0.0)
     safety_cap = MAX_STAKE_BANKROLL_FRACTION * 1000.0
     stake_cap = np.minimum(max_s, safety_cap)
-    stake = np.minimum(kelly_raw, stake_cap)
 
-    # Apply mask
-    stake = stake * mask
+    # Weekly Sharpe accumulators, filled per chunk from the week segments
+    week_of_run = data["week_of_run"]
+    n_weeks = int(week_of_run.max()) + 1 if week_of_run.size else 0
+    weekly_pnl = np.zeros((P, n_weeks), dtype=np.float64) if n_weeks >= 4 else None
+
+    # Running state carried across chunks
+    total_staked = np.zeros(P, dtype=np.float64)
+    total_profit = np.zeros(P, dtype=np.float64)
+    bet_count = np.zeros(P, dtype=np.int64)
+    cum_last = np.zeros(P, dtype=np.float64)     # equity after the previous chunk
+    cum_peak = np.full(P, -np.inf)               # running max of the equity curve
+    max_dd = np.full(P, -np.inf)
+
+    fitness = np.zeros((len(prefix_ends), P), dtype=np.float64)
+    score_at: dict[int, list[int]] = defaultdict(list)
+    for f, end in enumerate(prefix_ends):
+        score_at[min(max(int(end), 0), N)].append(f)
+
+    def score(end: int) -> None:
+        if end not in score_at:
+            return
+        if weekly_pnl is not None:
+            runs = int(np.searchsorted(data["week_starts"], end, side="left"))
+            present = np.unique(week_of_run[:runs])
+            if present.size == n_weeks:
+                weekly = weekly_pnl
+            elif present.size >= 4:
+                weekly = np.ascontiguousarray(weekly_pnl[:, present])
+            else:
+                weekly = None
+        else:
+            weekly = None
+        row = _fitness_from_state(
+            total_staked, total_profit, bet_count, max_dd, cum_peak, weekly,
+            n_tips=end, min_bets_for_fitness=min_bets_for_fitness,
+            penalty_k=penalty_k, penalty_lambda=penalty_lambda,
+        )
+        for f in score_at[end]:
+            fitness[f] = row
+
+    score(0)
+    step = max(1, chunk_cells // max(P, 1))
+    cuts = sorted(set(range(0, N, step)).union(e for e in score_at if 0 < e < N))
+    for lo, hi in zip(cuts, cuts[1:] + [N]):
+
+        # Tip arrays -> (1, chunk) for broadcasting
+        edge    = data["edge_pct"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        conf    = data["confidence"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        imp     = data["implied_prob"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        correct = data["was_correct"][np.newaxis, lo:hi]
+        odds    = data["odds"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        s_boost = data["sharp_boost"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        m_boost = data["momentum_boost"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        r_boost = data["rest_boost"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        pick    = data["pick_type"][np.newaxis, lo:hi]
+        h2h_t   = data["h2h_weight"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        bayes_c = data["bayes_conf"][np.newaxis, lo:hi].astype(dtype, copy=False)
+        t_weight = data["time_weight"][np.newaxis, lo:hi].astype(dtype, copy=False)
+
+        # --- Confidence pipeline ---
+        # 1. Base: signal-weighted boosts
+        adj_conf = conf + sharp_w * s_boost + momentum_w * m_boost + rest_w * r_boost
+
+        # 2. Venue bias: multiply by home_bias or away_bias based on pick type
+        is_home = (pick == 0)
+        is_draw = (pick == 1)
+        is_away = (pick == 2)
+        bias = is_home * home_bias_w + is_draw * dtype(1.0) + is_away * away_bias_w
+        adj_conf = adj_conf * bias
+
+        # 3. H2H amplification
+        adj_conf = adj_conf + h2h_w * h2h_t * dtype(0.10)
+
+        # 4. Bayesian trust blending
+        adj_conf = (1.0 - blend_weight) * adj_conf + blend_weight * bayes_c
+
+        adj_conf = np.clip(adj_conf, 0.0, 0.99)
+
+        # --- Filter mask ---
+        mask = (edge >= min_edge) & (conf >= min_conf)
+
+        # Draw gate: draws must exceed draw_threshold on ADJUSTED confidence
+        # IMPORTANT: applied AFTER full confidence pipeline
+        draw_gate = is_draw & (adj_conf < draw_thresh)
+        mask = mask & ~draw_gate
+
+        # --- Kelly with volatility buffer ---
+        buffered_edge = adj_conf - imp - vol_buffer
+        buffered_edge = np.maximum(buffered_edge, 0.0)
+        denom = np.maximum(odds - 1.0, 0.01)
+        kelly_raw = kelly_f * buffered_edge / denom
+        kelly_raw = np.maximum(kelly_raw, 0.0)
+        stake = np.minimum(kelly_raw, stake_cap)
+
+        # Apply mask
+        stake = stake * mask
+
+        # Profit per bet
+        profit = np.where(correct, stake * (odds - 1.0), -stake)
+        weighted_profit = profit * t_weight
+
+        total_staked += (stake * t_weight).sum(axis=1, dtype=np.float64)
+        total_profit += weighted_profit.sum(axis=1, dtype=np.float64)
+        bet_count += mask.sum(axis=1)
+
+        # --- Equity curve: continue the cumulative sum from the previous chunk ---
+        cum_profit = np.cumsum(
+            np.concatenate([cum_last[:, np.newaxis], weighted_profit * mask], axis=1),
+            axis=1, dtype=np.float64,
+        )[:, 1:]
+        cum_max = np.maximum(np.maximum.accumulate(cum_profit, axis=1), cum_peak[:, np.newaxis])
+        max_dd = np.maximum(max_dd, (cum_max - cum_profit).max(axis=1))
+        cum_peak = cum_max[:, -1]
+        cum_last = cum_profit[:, -1]
+
+        # --- Weekly P&L accumulators ---
+        if weekly_pnl is not None:
+            weekly_sums(weighted_profit, data, lo=lo, out=weekly_pnl)
+
+        score(hi)
+
+    return fitness
 
-    # Profit per bet
-    profit = np.where(correct, stake * (odds - 1.0), -stake)
-    weighted_profit = profit * t_weight
-    weighted_stake = stake * t_weight
+
+def _fitness_from_state(
+    total_staked: np.ndarray,
+    total_profit: np.ndarray,
+    bet_count: np.ndarray,
+    max_dd: np.ndarray,
+    cum_peak: np.ndarray,
+    weekly_pnl: np.ndarray | None,
+    *,
+    n_tips: int,
+    min_bets_for_fitness: int,
+    penalty_k: float,
+    penalty_lambda: float,
+) -> np.ndarray:
+    """(P,) fitness from the carried evaluation state after *n_tips* tips."""
+    P = total_staked.shape[0]
 
     # --- ROI per bot ---
-    total_staked = weighted_stake.sum(axis=1)
-    total_profit = weighted_profit.sum(axis=1)
-    roi = np.where(total_staked > 0, total_profit / total_staked, -1.0)
-
-    # --- Bet count ---
-    bet_count = mask.sum(axis=1)
-
-    # --- Max Drawdown per bot (vectorized) ---
-    cum_profit = np.cumsum(weighted_profit * mask, axis=1)
-    cum_max = np.maximum.accumulate(cum_profit, axis=1)
-    drawdown = cum_max - cum_profit
-    max_dd = drawdown.max(axis=1)
-    peak_equity = np.maximum(cum_max.max(axis=1), 1.0)
+    roi = np.where(total_staked > 0, total_profit / np.where(total_staked > 0, total_staked, 1.0), -1.0)
+
+    # --- Max Drawdown per bot ---
+    if n_tips == 0:
+        max_dd = np.zeros(P, dtype=np.float64)
+        cum_peak = np.zeros(P, dtype=np.float64)
+    peak_equity = np.maximum(cum_peak, 1.0)
     max_dd_pct = max_dd / peak_equity
 
     # --- Weekly Sharpe Ratio ---
-    iso_weeks = data["iso_week"]
-    unique_weeks = np.unique(iso_weeks)
-    n_weeks = len(unique_weeks)
-
     sharpe = np.zeros(P, dtype=np.float64)
 
-    if n_weeks >= 4:
-        weekly_pnl = np.zeros((P, n_weeks), dtype=np.float64)
-        for w_idx, week in enumerate(unique_weeks):
-            week_mask = iso_weeks == week
-            weekly_pnl[:, w_idx] = weighted_profit[:, week_mask].sum(axis=1)
-
+    if weekly_pnl is not None:
         weekly_mean = weekly_pnl.mean(axis=1)
         weekly_std = weekly_pnl.std(axis=1, ddof=1)
 
         valid_std = weekly_std > 1e-6
         sharpe = np.where(
             valid_std,
-            weekly_mean / weekly_std * np.sqrt(52),
+            weekly_mean / np.where(valid_std, weekly_std, 1.0) * np.sqrt(52),
             0.0,
         )
 
@@ -472,6 +588,225 @@ def evaluate_population(
     return fitness
 
 
+# ---------------------------------------------------------------------------
+# Shared-memory evaluation pool (--eval-workers N)
+# ---------------------------------------------------------------------------
+
+# Worker-side views onto the parent's shared tip arrays (set by the initializer)
+_WORKER_DATASETS: list[dict[str, np.ndarray]] = []
+_WORKER_BLOCKS: list = []
+
+
+def _attach_shared_datasets(specs: list[dict[str, tuple[str, str, tuple]]]) -> None:
+    """Pool initializer: map every shared tip array as a zero-copy view."""
+    from multiprocessing import shared_memory
+
+    for spec in specs:
+        arrays: dict[str, np.ndarray] = {}
+        for key, (name, dtype, shape) in spec.items():
+            block = shared_memory.SharedMemory(name=name)
+            _WORKER_BLOCKS.append(block)
+            arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        _WORKER_DATASETS.append(arrays)
+
+
+def _evaluate_shared_slice(
+    dataset: int,
+    population: np.ndarray,
+    prefix_ends: list[int],
+    chunk_cells: int,
+    kwargs: dict,
+) -> np.ndarray:
+    """Worker task: (F, slice) fitness of a population slice on a shared dataset."""
+    return evaluate_prefixes(
+        population, _WORKER_DATASETS[dataset], prefix_ends, chunk_cells=chunk_cells, **kwargs,
+    )
+
+
+def _release_evaluator(pool, blocks: list) -> None:
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+    for block in blocks:
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class PopulationEvaluator:
+    """Fitness evaluation for a GA run, optionally spread over worker processes.
+
+    With ``workers > 1`` every dataset's tip arrays are copied once into
+    ``multiprocessing.shared_memory`` and a persistent process pool attaches
+    zero-copy views at startup. Workers live for the whole run; a generation
+    only ships (P/workers, 13) DNA slices out and fitness slices back. Slices
+    use the same tip-chunk width as a single-process call, so fitness is
+    bit-identical to ``evaluate_population``.
+
+    Fitness is memoized across generations in a bounded LRU keyed by the
+    rounded DNA, *version* (the dataset identity), the dataset/prefixes and
+    the fitness settings: elites and unchanged children are not re-evaluated,
+    and duplicates within a generation are evaluated once. Misses are
+    evaluated with the chunk width of the full population, so cached and
+    fresh values are identical. ``last_hit_rate`` reports the latest call.
+    """
+
+    def __init__(
+        self,
+        datasets: list[dict[str, np.ndarray]],
+        *,
+        workers: int = 1,
+        float32: bool = False,
+        version: str = "",
+        cache_size: int = FITNESS_CACHE_SIZE,
+    ) -> None:
+        self.datasets = datasets
+        self.workers = max(1, int(workers))
+        self.float32 = float32
+        self.version = version
+        self.cache_size = max(0, int(cache_size))
+        self._cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_lookups = 0
+        self.last_hit_rate = 0.0
+        self._pool = None
+        blocks: list = []
+        if self.workers > 1:
+            import multiprocessing
+            from multiprocessing import shared_memory
+
+            specs = []
+            for data in datasets:
+                spec = {}
+                for key, arr in data.items():
+                    arr = np.ascontiguousarray(arr)
+                    block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+                    np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+                    blocks.append(block)
+                    spec[key] = (block.name, arr.dtype.str, arr.shape)
+                specs.append(spec)
+            # forkserver/spawn, not fork: the arena runs an asyncio loop and
+            # Motor's threads, which a forked child would inherit mid-state.
+            # Workers only need the block names (the initializer attaches
+            # them) and share the parent's resource tracker, so only the
+            # parent's unlink() releases the blocks.
+            methods = multiprocessing.get_all_start_methods()
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn",
+                ),
+                initializer=_attach_shared_datasets,
+                initargs=(specs,),
+            )
+            log.info(
+                "Evaluation pool: %d workers, %d datasets, %.1f MB shared",
+                self.workers, len(datasets), sum(b.size for b in blocks) / 1e6,
+            )
+        self._finalizer = weakref.finalize(self, _release_evaluator, self._pool, blocks)
+
+    def evaluate(self, population: np.ndarray, dataset: int = 0, **kwargs) -> np.ndarray:
+        """(P,) fitness of *population* on ``datasets[dataset]``."""
+        return self.evaluate_all(population, [dataset], **kwargs)[0]
+
+    def evaluate_all(
+        self, population: np.ndarray, datasets: list[int] | None = None, **kwargs,
+    ) -> np.ndarray:
+        """(D, P) fitness on several datasets in one fan-out."""
+        ids = list(range(len(self.datasets))) if datasets is None else datasets
+        return np.concatenate(self._fan_out(
+            population, [(d, [self.datasets[d]["edge_pct"].shape[0]]) for d in ids], kwargs,
+        ))
+
+    def evaluate_prefixes(
+        self, population: np.ndarray, prefix_ends: Sequence[int], dataset: int = 0, **kwargs,
+    ) -> np.ndarray:
+        """(F, P) fitness on the prefixes of one dataset (deep-mode folds)."""
+        return self._fan_out(population, [(dataset, list(prefix_ends))], kwargs)[0]
+
+    def _fan_out(
+        self,
+        population: np.ndarray,
+        jobs: list[tuple[int, list[int]]],
+        kwargs: dict,
+    ) -> list[np.ndarray]:
+        """One (F, P) result per ``(dataset, prefix_ends)`` job."""
+        kwargs.setdefault("float32", self.float32)
+        chunk_cells = kwargs.pop("chunk_cells", EVAL_CHUNK_CELLS)
+        P = population.shape[0]
+        step = max(1, chunk_cells // max(P, 1))
+        settings = tuple(sorted(kwargs.items()))
+        rounded = np.round(population.astype(np.float64), FITNESS_CACHE_PRECISION)
+        row_keys = [row.tobytes() for row in rounded]
+
+        results: list[np.ndarray] = []
+        pending: list[tuple] = []  # (dataset, ends, job_key, missing keys, key -> rows)
+        for d, ends in jobs:
+            out = np.empty((len(ends), P), dtype=np.float64)
+            job_key = (self.version, d, tuple(ends), settings)
+            missing: dict[bytes, list[int]] = {}
+            for i, row_key in enumerate(row_keys):
+                cached = self._cache.get((job_key, row_key))
+                if cached is None:
+                    missing.setdefault(row_key, []).append(i)
+                else:
+                    self._cache.move_to_end((job_key, row_key))
+                    out[:, i] = cached
+            results.append(out)
+            pending.append((d, ends, job_key, list(missing), missing))
+
+        lookups = P * len(jobs)
+        hits = lookups - sum(len(idx) for *_, missing in pending for idx in missing.values())
+        self.cache_lookups += lookups
+        self.cache_hits += hits
+        self.last_hit_rate = hits / lookups if lookups else 0.0
+
+        # Evaluate one representative row per missing DNA
+        rows = [np.array([missing[k][0] for k in keys], dtype=np.intp) for _, _, _, keys, missing in pending]
+        if self._pool is None:
+            fresh = [
+                evaluate_prefixes(
+                    population[idx], self.datasets[d], ends, chunk_cells=step * idx.size, **kwargs,
+                ) if idx.size else np.empty((len(ends), 0))
+                for (d, ends, *_), idx in zip(pending, rows)
+            ]
+        else:
+            futures = [
+                [
+                    self._pool.submit(
+                        _evaluate_shared_slice, d, population[part], ends, step * part.size, kwargs,
+                    )
+                    for part in np.array_split(idx, min(self.workers, idx.size)) if part.size
+                ]
+                for (d, ends, *_), idx in zip(pending, rows)
+            ]
+            fresh = [
+                np.concatenate([f.result() for f in row], axis=1) if row else np.empty((len(ends), 0))
+                for row, (_, ends, *_) in zip(futures, pending)
+            ]
+
+        for out, (_, _, job_key, keys, missing), values in zip(results, pending, fresh):
+            for j, row_key in enumerate(keys):
+                value = values[:, j]
+                out[:, missing[row_key]] = value[:, np.newaxis]
+                if self.cache_size:
+                    self._cache[(job_key, row_key)] = value.copy()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def close(self) -> None:
+        """Stop the workers and release the shared memory (idempotent)."""
+        self._finalizer()
+
+    def __enter__(self) -> "PopulationEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
 # ---------------------------------------------------------------------------
 # Genetic operators
 # ---------------------------------------------------------------------------
@@ -674,6 +1009,7 @@ def _cached_monte_carlo(
     fail_fast: bool,
     rng: np.random.Generator,
     cache: dict[tuple, dict],
+    profile: dict[str, np.ndarray] | None = None,
 ) -> dict:
     key = ("mc", n_paths, fail_fast, _dna_cache_key(dna))
     if key not in cache:
@@ -683,6 +1019,7 @@ def _cached_monte_carlo(
             n_paths=n_paths,
             fail_fast=fail_fast,
             rng=rng,
+            profile=profile,
         )
     return cache[key]
 
@@ -781,6 +1118,8 @@ def _stress_test_with_rescue(
     safety_floor_reached = False
     early_stop_low_improvement = False
     rescue_applied = False
+    # Risk scaling leaves the active bets unchanged: compress them once
+    profile = bet_profile(candidate, tip_data)
     mc_pref_key = ("mc", mc_prefilter_paths, True, _dna_cache_key(candidate))
     mc_pref_hit = mc_pref_key in mc_cache
     t_mc_pref = time.perf_counter()
@@ -791,6 +1130,7 @@ def _stress_test_with_rescue(
         fail_fast=True,
         rng=rng,
         cache=mc_cache,
+        profile=profile,
     )
     timing["mc_prefilter_s"] += time.perf_counter() - t_mc_pref
     timing["mc_prefilter_calls"] += 1
@@ -818,6 +1158,7 @@ def _stress_test_with_rescue(
             fail_fast=True,
             rng=rng,
             cache=mc_cache,
+            profile=profile,
         )
         timing["mc_prefilter_s"] += time.perf_counter() - t_mc_pref
         timing["mc_prefilter_calls"] += 1
@@ -857,6 +1198,7 @@ def _stress_test_with_rescue(
             fail_fast=False,
             rng=rng,
             cache=mc_cache,
+            profile=profile,
         )
         timing["mc_final_s"] = time.perf_counter() - t_mc_final
         passed = bs_final["p_positive"] >= bootstrap_threshold and mc_final["ruin_prob"] <= ruin_threshold
@@ -1030,8 +1372,17 @@ async def run_evolution(
     search_mode: str = "quick",
     candidate_workers: int = 1,
     lookback_years: int = DEFAULT_LOOKBACK_YEARS,
+    float32: bool = False,
+    eval_workers: int = 1,
+    rebuild_cache: bool = False,
+    dataset: dict | None = None,
+    reference_now: datetime | None = None,
 ) -> dict:
-    """Run staged GA search and return the best feasible strategy."""
+    """Run staged GA search and return the best feasible strategy.
+
+    *dataset* (from load_tips) and *reference_now* let callers running many
+    seeds share one loaded dataset and time-weight reference.
+    """
     import app.database as _db
 
     global _shutdown_requested
@@ -1041,29 +1392,31 @@ async def run_evolution(
     rng = np.random.default_rng(seed)
 
     # Load and vectorize data
-    tips = await load_tips(sport_key, lookback_years=lookback_years)
-    if len(tips) < 100:
-        log.error("Not enough resolved tips (%d < 100). Aborting.", len(tips))
+    if dataset is None:
+        dataset = await load_tips(sport_key, lookback_years=lookback_years, rebuild_cache=rebuild_cache)
+    tips = dataset["columns"]
+    n_tips = dataset["count"]
+    if n_tips < 100:
+        log.error("Not enough resolved tips (%d < 100). Aborting.", n_tips)
         _signal.signal(_signal.SIGINT, prev_handler)
-        return {"error": "insufficient_data", "tip_count": len(tips)}
+        return {"error": "insufficient_data", "tip_count": n_tips}
 
     # Temporal split: 80% training, 20% validation
-    split_idx = int(len(tips) * 0.80)
-    train_tips = tips[:split_idx]
-    val_tips = tips[split_idx:]
-    log.info("Split: %d training / %d validation tips", len(train_tips), len(val_tips))
-
-    ref_now = _utcnow()
-    train_data = vectorize_tips(train_tips, lookback_years=lookback_years, reference_now=ref_now)
-    val_data = vectorize_tips(val_tips, lookback_years=lookback_years, reference_now=ref_now)
+    split_idx = int(n_tips * 0.80)
+    n_val = n_tips - split_idx
+    log.info("Split: %d training / %d validation tips", split_idx, n_val)
+
+    ref_now = reference_now or _utcnow()
+    train_data = vectorize_columns(tips, hi=split_idx, lookback_years=lookback_years, reference_now=ref_now)
+    val_data = vectorize_columns(tips, lo=split_idx, lookback_years=lookback_years, reference_now=ref_now)
     validation_window = {
         "source": "arena_quick_80_20",
         "split_ratio": 0.8,
-        "tips_total": len(tips),
-        "train_tips": len(train_tips),
-        "validation_tips": len(val_tips),
-        "start_date": _ensure_utc(val_tips[0]["match_date"]).isoformat() if val_tips else None,
-        "end_date": _ensure_utc(val_tips[-1]["match_date"]).isoformat() if val_tips else None,
+        "tips_total": n_tips,
+        "train_tips": split_idx,
+        "validation_tips": n_val,
+        "start_date": column_date(tips, split_idx).isoformat() if n_val else None,
+        "end_date": column_date(tips, n_tips - 1).isoformat() if n_val else None,
     }
 
     base_ranges = {k: tuple(v) for k, v in DNA_RANGES.items()}
@@ -1128,105 +1481,131 @@ async def run_evolution(
         population = random_population(population_size, rng, dna_ranges=base_ranges)
 
     population_seed = population.copy()
+    evaluator = PopulationEvaluator(
+        [train_data], workers=eval_workers, float32=float32,
+        version=f"{dataset['key']}:0:{split_idx}:{lookback_years}:{ref_now.isoformat()}",
+    )
 
-    for stage in stages:
-        if stage["stage_id"] == 2 and stage_outputs and stage_outputs[0]["has_deployable"]:
-            break
+    try:
+        for stage in stages:
+            if stage["stage_id"] == 2 and stage_outputs and stage_outputs[0]["has_deployable"]:
+                break
 
-        dna_ranges = stage["dna_ranges"]
-        min_bets = stage["min_bets"]
-        log.info(
-            "Starting GA stage %d (%s): min_bets=%d",
-            stage["stage_id"],
-            stage["name"],
-            min_bets,
-        )
+            dna_ranges = stage["dna_ranges"]
+            min_bets = stage["min_bets"]
+            log.info(
+                "Starting GA stage %d (%s): min_bets=%d",
+                stage["stage_id"],
+                stage["name"],
+                min_bets,
+            )
 
-        # Clip carried population into current stage search-space
-        pop = population_seed.copy()
-        for j, gene in enumerate(DNA_GENES):
-            lo, hi = dna_ranges[gene]
-            pop[:, j] = np.clip(pop[:, j], lo, hi)
-
-        n_elites = max(int(population_size * ELITE_FRACTION), 2)
-        n_children = population_size - n_elites
-        candidate_pool = QUICK_CANDIDATE_POOL if search_mode == "quick" else DEEP_CANDIDATE_POOL
-        bootstrap_cache: dict[tuple, dict] = {}
-        mc_cache: dict[tuple, dict] = {}
-        stage_best_hist: list[float] = []
-        stage_avg_hist: list[float] = []
-        stage_t0 = time.monotonic()
-        stagnant_gens = 0
-        prev_best = -np.inf
-
-        for gen in range(start_gen, generations):
-            if _shutdown_requested:
-                log.info("Graceful shutdown: saving checkpoint at gen %d", gen)
-                _save_checkpoint(sport_key, gen - 1, pop, stage_best_hist, rng)
-                break
+            # Clip carried population into current stage search-space
+            pop = population_seed.copy()
+            for j, gene in enumerate(DNA_GENES):
+                lo, hi = dna_ranges[gene]
+                pop[:, j] = np.clip(pop[:, j], lo, hi)
+
+            n_elites = max(int(population_size * ELITE_FRACTION), 2)
+            n_children = population_size - n_elites
+            candidate_pool = QUICK_CANDIDATE_POOL if search_mode == "quick" else DEEP_CANDIDATE_POOL
+            bootstrap_cache: dict[tuple, dict] = {}
+            mc_cache: dict[tuple, dict] = {}
+            stage_best_hist: list[float] = []
+            stage_avg_hist: list[float] = []
+            stage_t0 = time.monotonic()
+            stagnant_gens = 0
+            prev_best = -np.inf
 
-            fitness = evaluate_population(pop, train_data, min_bets_for_fitness=min_bets)
-            best_idx = int(np.argmax(fitness))
-            best_fit = float(fitness[best_idx])
-            avg_fit = float(fitness.mean())
+            for gen in range(start_gen, generations):
+                if _shutdown_requested:
+                    log.info("Graceful shutdown: saving checkpoint at gen %d", gen)
+                    _save_checkpoint(sport_key, gen - 1, pop, stage_best_hist, rng)
+                    break
 
-            stage_best_hist.append(best_fit)
-            stage_avg_hist.append(avg_fit)
+                fitness = evaluator.evaluate(pop, min_bets_for_fitness=min_bets)
+                best_idx = int(np.argmax(fitness))
+                best_fit = float(fitness[best_idx])
+                avg_fit = float(fitness.mean())
 
-            if gen % 5 == 0 or gen == generations - 1:
-                log.info(
-                    "Stage %d Gen %2d/%d | Best fitness: %.4f | Avg: %.4f | Pop: %d",
-                    stage["stage_id"], gen + 1, generations, best_fit, avg_fit, population_size,
-                )
+                stage_best_hist.append(best_fit)
+                stage_avg_hist.append(avg_fit)
 
-            if gen > start_gen and gen % CHECKPOINT_INTERVAL == 0 and stage["stage_id"] == 1:
-                _save_checkpoint(sport_key, gen, pop, stage_best_hist, rng)
+                log.info("Stage %d Gen %d fitness cache hit rate: %.0f%%",
+                          stage["stage_id"], gen + 1, evaluator.last_hit_rate * 100)
+                if gen % 5 == 0 or gen == generations - 1:
+                    log.info(
+                        "Stage %d Gen %2d/%d | Best fitness: %.4f | Avg: %.4f | Pop: %d",
+                        stage["stage_id"], gen + 1, generations, best_fit, avg_fit, population_size,
+                    )
 
-            if best_fit <= prev_best + 1e-6:
-                stagnant_gens += 1
-            else:
-                stagnant_gens = 0
-            prev_best = best_fit
+                if gen > start_gen and gen % CHECKPOINT_INTERVAL == 0 and stage["stage_id"] == 1:
+                    _save_checkpoint(sport_key, gen, pop, stage_best_hist, rng)
 
-            elites = select_elites(pop, fitness, n_elites)
-            children = crossover(elites, n_children, rng)
+                if best_fit <= prev_best + 1e-6:
+                    stagnant_gens += 1
+                else:
+                    stagnant_gens = 0
+                prev_best = best_fit
 
-            if stagnant_gens >= STAGNATION_THRESHOLD:
-                log.warning(
-                    "RADIATION EVENT at gen %d — spiking mutation to %.0f%%",
-                    gen, RADIATION_MUTATION_RATE * 100,
-                )
-                children = mutate(
-                    children,
-                    rng,
-                    mutation_rate=RADIATION_MUTATION_RATE,
-                    dna_ranges=dna_ranges,
-                )
-                stagnant_gens = 0
-            else:
-                children = mutate(children, rng, dna_ranges=dna_ranges)
+                elites = select_elites(pop, fitness, n_elites)
+                children = crossover(elites, n_children, rng)
 
-            pop = np.vstack([elites, children])
+                if stagnant_gens >= STAGNATION_THRESHOLD:
+                    log.warning(
+                        "RADIATION EVENT at gen %d — spiking mutation to %.0f%%",
+                        gen, RADIATION_MUTATION_RATE * 100,
+                    )
+                    children = mutate(
+                        children,
+                        rng,
+                        mutation_rate=RADIATION_MUTATION_RATE,
+                        dna_ranges=dna_ranges,
+                    )
+                    stagnant_gens = 0
+                else:
+                    children = mutate(children, rng, dna_ranges=dna_ranges)
 
-        stage_elapsed = time.monotonic() - stage_t0
-        log.info(
-            "Stage %d complete in %.1fs (%d generations)",
-            stage["stage_id"], stage_elapsed, generations,
-        )
+                pop = np.vstack([elites, children])
 
-        final_fitness = evaluate_population(pop, train_data, min_bets_for_fitness=min_bets)
-        top_indices = np.argsort(final_fitness)[-min(candidate_pool, population_size):][::-1]
-        candidates: list[dict] = []
-        candidate_specs = [
-            (rank_idx, int(pop_idx), int(rng.integers(0, 2**63 - 1)))
-            for rank_idx, pop_idx in enumerate(top_indices, 1)
-        ]
-        if candidate_workers > 1 and len(candidate_specs) > 1:
-            max_workers = min(candidate_workers, len(candidate_specs))
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
-                futures = [
-                    pool.submit(
-                        _evaluate_single_candidate,
+            stage_elapsed = time.monotonic() - stage_t0
+            log.info(
+                "Stage %d complete in %.1fs (%d generations)",
+                stage["stage_id"], stage_elapsed, generations,
+            )
+
+            final_fitness = evaluator.evaluate(pop, min_bets_for_fitness=min_bets)
+            top_indices = np.argsort(final_fitness)[-min(candidate_pool, population_size):][::-1]
+            candidates: list[dict] = []
+            candidate_specs = [
+                (rank_idx, int(pop_idx), int(rng.integers(0, 2**63 - 1)))
+                for rank_idx, pop_idx in enumerate(top_indices, 1)
+            ]
+            if candidate_workers > 1 and len(candidate_specs) > 1:
+                max_workers = min(candidate_workers, len(candidate_specs))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    futures = [
+                        pool.submit(
+                            _evaluate_single_candidate,
+                            dna=pop[pop_idx].copy(),
+                            fitness_value=float(final_fitness[pop_idx]),
+                            pool_rank=rank_idx,
+                            train_data=train_data,
+                            val_data=val_data,
+                            rng_seed=seed_i,
+                            require_positive_roi=True,
+                            bootstrap_cache=None,
+                            mc_cache=None,
+                        )
+                        for rank_idx, pop_idx, seed_i in candidate_specs
+                    ]
+                    for fut in concurrent.futures.as_completed(futures):
+                        result = fut.result()
+                        if result is not None:
+                            candidates.append(result)
+            else:
+                for rank_idx, pop_idx, seed_i in candidate_specs:
+                    result = _evaluate_single_candidate(
                         dna=pop[pop_idx].copy(),
                         fitness_value=float(final_fitness[pop_idx]),
                         pool_rank=rank_idx,
@@ -1234,95 +1613,80 @@ async def run_evolution(
                         val_data=val_data,
                         rng_seed=seed_i,
                         require_positive_roi=True,
-                        bootstrap_cache=None,
-                        mc_cache=None,
+                        bootstrap_cache=bootstrap_cache,
+                        mc_cache=mc_cache,
                     )
-                    for rank_idx, pop_idx, seed_i in candidate_specs
-                ]
-                for fut in concurrent.futures.as_completed(futures):
-                    result = fut.result()
                     if result is not None:
                         candidates.append(result)
-        else:
-            for rank_idx, pop_idx, seed_i in candidate_specs:
-                result = _evaluate_single_candidate(
-                    dna=pop[pop_idx].copy(),
-                    fitness_value=float(final_fitness[pop_idx]),
-                    pool_rank=rank_idx,
+
+            if not candidates:
+                # Fallback if no positive-ROI candidates survived the prefilter
+                fallback_idx = int(np.argmax(final_fitness))
+                fallback_seed = int(rng.integers(0, 2**63 - 1))
+                fallback = _evaluate_single_candidate(
+                    dna=pop[fallback_idx].copy(),
+                    fitness_value=float(final_fitness[fallback_idx]),
+                    pool_rank=1,
                     train_data=train_data,
                     val_data=val_data,
-                    rng_seed=seed_i,
-                    require_positive_roi=True,
-                    bootstrap_cache=bootstrap_cache,
-                    mc_cache=mc_cache,
+                    rng_seed=fallback_seed,
+                    require_positive_roi=False,
+                    bootstrap_cache=bootstrap_cache if candidate_workers <= 1 else None,
+                    mc_cache=mc_cache if candidate_workers <= 1 else None,
                 )
-                if result is not None:
-                    candidates.append(result)
-
-        if not candidates:
-            # Fallback if no positive-ROI candidates survived the prefilter
-            fallback_idx = int(np.argmax(final_fitness))
-            fallback_seed = int(rng.integers(0, 2**63 - 1))
-            fallback = _evaluate_single_candidate(
-                dna=pop[fallback_idx].copy(),
-                fitness_value=float(final_fitness[fallback_idx]),
-                pool_rank=1,
-                train_data=train_data,
-                val_data=val_data,
-                rng_seed=fallback_seed,
-                require_positive_roi=False,
-                bootstrap_cache=bootstrap_cache if candidate_workers <= 1 else None,
-                mc_cache=mc_cache if candidate_workers <= 1 else None,
+                if fallback is not None:
+                    candidates.append(fallback)
+
+            _log_stress_timing_summary(
+                f"sport={sport_key or 'all'} stage={stage['stage_id']}-{stage['name']}",
+                candidates,
             )
-            if fallback is not None:
-                candidates.append(fallback)
 
-        _log_stress_timing_summary(
-            f"sport={sport_key or 'all'} stage={stage['stage_id']}-{stage['name']}",
-            candidates,
-        )
+            frontier = _pareto_frontier(candidates)
+            if not frontier:
+                frontier = sorted(candidates, key=lambda c: c["fitness"], reverse=True)[:3]
+            crowd = _crowding_distance(frontier)
+            for i, cand in enumerate(frontier):
+                cand["crowding"] = crowd.get(i, 0.0)
+
+            pareto_top = sorted(
+                frontier,
+                key=lambda c: (c.get("crowding", 0.0), c["roi"], c["bet_count"]),
+                reverse=True,
+            )[:3]
+            for i, cand in enumerate(pareto_top, 1):
+                cand["pareto_rank"] = i
+                cand["tradeoff_label"] = _tradeoff_label(cand)
+
+            deployable = [
+                c for c in pareto_top
+                if c["stress"]["passed"] and c["val_metrics"]["total_bets"] >= min_bets
+            ]
+            has_deployable = len(deployable) > 0
+            selected = (
+                max(deployable, key=lambda c: (c["roi"], -c["ruin_prob"]))
+                if has_deployable
+                else max(pareto_top, key=lambda c: (c["roi"], c["bet_count"]))
+            )
 
-        frontier = _pareto_frontier(candidates)
-        if not frontier:
-            frontier = sorted(candidates, key=lambda c: c["fitness"], reverse=True)[:3]
-        crowd = _crowding_distance(frontier)
-        for i, cand in enumerate(frontier):
-            cand["crowding"] = crowd.get(i, 0.0)
-
-        pareto_top = sorted(
-            frontier,
-            key=lambda c: (c.get("crowding", 0.0), c["roi"], c["bet_count"]),
-            reverse=True,
-        )[:3]
-        for i, cand in enumerate(pareto_top, 1):
-            cand["pareto_rank"] = i
-            cand["tradeoff_label"] = _tradeoff_label(cand)
-
-        deployable = [
-            c for c in pareto_top
-            if c["stress"]["passed"] and c["val_metrics"]["total_bets"] >= min_bets
-        ]
-        has_deployable = len(deployable) > 0
-        selected = (
-            max(deployable, key=lambda c: (c["roi"], -c["ruin_prob"]))
-            if has_deployable
-            else max(pareto_top, key=lambda c: (c["roi"], c["bet_count"]))
-        )
+            stage_outputs.append(
+                {
+                    "stage": stage,
+                    "population": pop,
+                    "best_hist": stage_best_hist,
+                    "avg_hist": stage_avg_hist,
+                    "candidates": candidates,
+                    "pareto_top": pareto_top,
+                    "selected": selected,
+                    "has_deployable": has_deployable,
+                    "elapsed": stage_elapsed,
+                }
+            )
+            population_seed = pop
 
-        stage_outputs.append(
-            {
-                "stage": stage,
-                "population": pop,
-                "best_hist": stage_best_hist,
-                "avg_hist": stage_avg_hist,
-                "candidates": candidates,
-                "pareto_top": pareto_top,
-                "selected": selected,
-                "has_deployable": has_deployable,
-                "elapsed": stage_elapsed,
-            }
-        )
-        population_seed = pop
+        log.info("Fitness cache: %d/%d hits", evaluator.cache_hits, evaluator.cache_lookups)
+    finally:
+        evaluator.close()
 
     # Restore SIGINT handler
     _signal.signal(_signal.SIGINT, prev_handler)
@@ -1525,20 +1889,19 @@ async def run_evolution(
     return strategy_doc
 
 
-def _single_bot_pipeline(
-    dna: np.ndarray,
-    data: dict[str, np.ndarray],
-    *,
-    initial_bankroll: float = 1000.0,
+def _bot_signals(
+    dna: np.ndarray, data: dict[str, np.ndarray],
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Canonical confidence/stake/profit pipeline for one bot."""
+    """Filter mask, buffered edge and Kelly denominator for one bot.
+
+    None of these depend on kelly_fraction or max_stake, so a bot's active
+    bets stay fixed while the rescue loop scales its risk genes.
+    """
     min_edge = dna[0]
     min_conf = dna[1]
     sharp_w = dna[2]
     momentum_w = dna[3]
     rest_w = dna[4]
-    kelly_f = dna[5]
-    max_s = dna[6]
     home_bias_v = dna[7] if len(dna) > 7 else 1.0
     away_bias_v = dna[8] if len(dna) > 8 else 1.0
     h2h_w = dna[9] if len(dna) > 9 else 0.0
@@ -1549,7 +1912,6 @@ def _single_bot_pipeline(
     edge = data["edge_pct"]
     conf = data["confidence"]
     imp = data["implied_prob"]
-    correct = data["was_correct"]
     odds = data["odds"]
     pick = data["pick_type"]
     h2h_t = data["h2h_weight"]
@@ -1574,14 +1936,30 @@ def _single_bot_pipeline(
 
     buffered_edge = np.maximum(adj_conf - imp - vol_buffer, 0.0)
     denom = np.maximum(odds - 1.0, 0.01)
+    return mask, buffered_edge, denom
+
+
+def _single_bot_pipeline(
+    dna: np.ndarray,
+    data: dict[str, np.ndarray],
+    *,
+    initial_bankroll: float = 1000.0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Canonical confidence/stake/profit pipeline for one bot."""
+    kelly_f = dna[5]
+    max_s = dna[6]
+    correct = data["was_correct"]
+    odds = data["odds"]
+
+    mask, buffered_edge, denom = _bot_signals(dna, data)
     kelly_frac = np.maximum(kelly_f * buffered_edge / denom, 0.0)
 
     stake = np.zeros_like(odds, dtype=np.float64)
     profit = np.zeros_like(odds, dtype=np.float64)
     bankroll = float(initial_bankroll)
-    for i in range(len(odds)):
-        if not mask[i] or bankroll <= 0.0:
-            continue
+    for i in np.flatnonzero(mask):
+        if bankroll <= 0.0:
+            break
         raw_stake = bankroll * float(kelly_frac[i])
         risk_cap = bankroll * MAX_STAKE_BANKROLL_FRACTION
         final_stake = min(raw_stake, float(max_s), risk_cap, bankroll)
@@ -1601,7 +1979,6 @@ def _compute_detailed_metrics(dna: np.ndarray, data: dict[str, np.ndarray]) -> d
     """Compute detailed metrics for a single bot (mirrors evaluate_population v2)."""
     _, stake, profit = _single_bot_pipeline(dna, data)
     correct = data["was_correct"]
-    iso_weeks = data["iso_week"]
     t_weight = data["time_weight"]
     active = stake > 0
 
@@ -1626,8 +2003,7 @@ def _compute_detailed_metrics(dna: np.ndarray, data: dict[str, np.ndarray]) -> d
     else:
         max_dd_pct = 0.0
 
-    unique_weeks = np.unique(iso_weeks)
-    weekly_pnl = np.array([weighted_profit[(iso_weeks == w) & active].sum() for w in unique_weeks])
+    weekly_pnl = weekly_sums(np.where(active, weighted_profit, 0.0), data)
     if len(weekly_pnl) >= 4:
         w_mean = weekly_pnl.mean()
         w_std = weekly_pnl.std(ddof=1)
@@ -1657,6 +2033,14 @@ def _ensure_utc(dt: datetime) -> datetime:
     return dt
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_us(dt: datetime) -> int:
+    """Exact integer microseconds since epoch (tip cache time axis)."""
+    return (_ensure_utc(dt) - _EPOCH) // timedelta(microseconds=1)
+
+
 # ---------------------------------------------------------------------------
 # Checkpoint persistence (npz + JSON — NOT pickle)
 # ---------------------------------------------------------------------------
@@ -1711,32 +2095,60 @@ def _load_checkpoint(sport_key: str | None) -> dict | None:
 # ---------------------------------------------------------------------------
 
 
+def bet_profile(dna: np.ndarray, tip_data: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Compress a bot to its active bets for the Monte Carlo stress test.
+
+    Holds the filter-passing tips' buffered edge, Kelly denominator, odds and
+    outcome. Only the signal genes shape it, so one profile serves every
+    risk-scaled variant in the rescue loop.
+    """
+    mask, buffered_edge, denom = _bot_signals(dna, tip_data)
+    idx = np.flatnonzero(mask)
+    return {
+        "idx": idx,
+        "buffered_edge": buffered_edge[idx],
+        "denom": denom[idx],
+        "odds": tip_data["odds"][idx],
+        "correct": tip_data["was_correct"][idx],
+    }
+
+
 def bootstrap_fitness(
     bot_dna: np.ndarray,
     tip_data: dict[str, np.ndarray],
     n_samples: int = 10000,
     rng: np.random.Generator | None = None,
 ) -> dict:
-    """Bootstrap confidence interval for a single bot's ROI."""
+    """Bootstrap confidence interval for a single bot's ROI.
+
+    Resampling N tips with replacement is a multinomial count vector over
+    the tips. Tips without a stake add nothing to either sum, so they
+    collapse into one bucket and each sample only costs O(active bets).
+    """
     if rng is None:
         rng = np.random.default_rng()
 
     n_tips = tip_data["odds"].shape[0]
     _, stake, profit = _single_bot_pipeline(bot_dna, tip_data)
-
-    rois = np.empty(n_samples, dtype=np.float64)
-    max_samples_per_batch = max(1, int(BOOTSTRAP_VECTOR_MAX_CELLS // max(n_tips, 1)))
-
-    out = 0
-    while out < n_samples:
-        batch = min(max_samples_per_batch, n_samples - out)
-        idx = rng.integers(0, n_tips, size=(batch, n_tips), dtype=np.int32)
-        batch_profit = profit[idx].sum(axis=1)
-        batch_stake = stake[idx].sum(axis=1)
-        batch_roi = np.full(batch, -1.0, dtype=np.float64)
-        np.divide(batch_profit, batch_stake, out=batch_roi, where=batch_stake > 0)
-        rois[out:out + batch] = batch_roi
-        out += batch
+    active = np.flatnonzero(stake > 0)
+    active_stake = stake[active]
+    active_profit = profit[active]
+    n_active = int(active.size)
+
+    rois = np.full(n_samples, -1.0, dtype=np.float64)
+    if n_active:
+        pvals = np.full(n_active + 1, 1.0 / n_tips, dtype=np.float64)
+        pvals[-1] = max(0.0, 1.0 - n_active / n_tips)
+        max_samples_per_batch = max(1, int(BOOTSTRAP_VECTOR_MAX_CELLS // (n_active + 1)))
+
+        out = 0
+        while out < n_samples:
+            batch = min(max_samples_per_batch, n_samples - out)
+            counts = rng.multinomial(n_tips, pvals, size=batch)[:, :n_active]
+            batch_profit = counts @ active_profit
+            batch_stake = counts @ active_stake
+            np.divide(batch_profit, batch_stake, out=rois[out:out + batch], where=batch_stake > 0)
+            out += batch
 
     ci_low, ci_high = np.percentile(rois, [2.5, 97.5])
     return {
@@ -1754,54 +2166,22 @@ def monte_carlo_bankroll(
     ruin_threshold: float = 0.20,
     fail_fast: bool = False,
     rng: np.random.Generator | None = None,
+    profile: dict[str, np.ndarray] | None = None,
 ) -> dict:
-    """Monte Carlo bankroll simulation with randomized bet ordering."""
+    """Monte Carlo bankroll simulation with randomized bet ordering.
+
+    Paths run in batches of independent permutations over the bot's active
+    bets (*profile*, built from the DNA when not given). Fail-fast checks
+    look at the first paths, which always fall in the first batch.
+    """
     if rng is None:
         rng = np.random.default_rng()
-    min_edge = bot_dna[0]
-    min_conf = bot_dna[1]
-    sharp_w = bot_dna[2]
-    momentum_w = bot_dna[3]
-    rest_w = bot_dna[4]
+    if profile is None:
+        profile = bet_profile(bot_dna, tip_data)
     kelly_f = bot_dna[5]
     max_s = bot_dna[6]
-    home_bias_v = bot_dna[7] if len(bot_dna) > 7 else 1.0
-    away_bias_v = bot_dna[8] if len(bot_dna) > 8 else 1.0
-    h2h_w = bot_dna[9] if len(bot_dna) > 9 else 0.0
-    draw_thresh = bot_dna[10] if len(bot_dna) > 10 else 0.0
-    vol_buffer = bot_dna[11] if len(bot_dna) > 11 else 0.0
-    bayes_trust = bot_dna[12] if len(bot_dna) > 12 else 0.0
-
-    edge = tip_data["edge_pct"]
-    conf = tip_data["confidence"]
-    imp = tip_data["implied_prob"]
-    correct = tip_data["was_correct"]
-    odds = tip_data["odds"]
-    pick = tip_data["pick_type"]
-    h2h_t = tip_data["h2h_weight"]
-    bayes_c = tip_data["bayes_conf"]
-
-    adj_conf = conf + sharp_w * tip_data["sharp_boost"] + momentum_w * tip_data["momentum_boost"] + rest_w * tip_data["rest_boost"]
-    is_home = pick == 0
-    is_draw = pick == 1
-    is_away = pick == 2
-    bias = is_home * home_bias_v + is_draw * 1.0 + is_away * away_bias_v
-    adj_conf = adj_conf * bias
-    adj_conf = adj_conf + h2h_w * h2h_t * 0.10
-    blend_weight = np.clip(bayes_trust * 0.5, 0.0, 0.75)
-    adj_conf = (1.0 - blend_weight) * adj_conf + blend_weight * bayes_c
-    adj_conf = np.clip(adj_conf, 0.0, 0.99)
-
-    mask = (edge >= min_edge) & (conf >= min_conf)
-    draw_gate = is_draw & (adj_conf < draw_thresh)
-    mask = mask & ~draw_gate
-
-    buffered_edge = np.maximum(adj_conf - imp - vol_buffer, 0.0)
-    denom = np.maximum(odds - 1.0, 0.01)
-    kelly_frac = np.maximum(kelly_f * buffered_edge / denom, 0.0)
 
-    active_idx = np.where(mask)[0]
-    n_bets = int(active_idx.size)
+    n_bets = int(profile["idx"].size)
 
     if n_bets < 10:
         return {
@@ -1809,67 +2189,79 @@ def monte_carlo_bankroll(
             "terminal_wealth_median": initial_bank, "n_bets": n_bets,
         }
 
-    # Build shuffled path indices: (n_paths, n_bets)
-    base_order = np.tile(np.arange(n_bets, dtype=np.int32), (n_paths, 1))
-    shuffle_idx = rng.random(base_order.shape).argsort(axis=1)
-    order = np.take_along_axis(base_order, shuffle_idx, axis=1)
-
-    active_frac = kelly_frac[active_idx]
-    active_odds = odds[active_idx]
-    active_correct = correct[active_idx]
-
-    bankroll = np.full(n_paths, float(initial_bank), dtype=np.float64)
-    peak = bankroll.copy()
-    min_bank = bankroll.copy()
-    max_dd = np.zeros(n_paths, dtype=np.float64)
-
-    for j in range(n_bets):
-        col = order[:, j]
-        frac_j = active_frac[col]
-        odds_j = active_odds[col]
-        corr_j = active_correct[col]
-
-        raw_stake = bankroll * frac_j
-        stake_cap = np.minimum(float(max_s), bankroll * MAX_STAKE_BANKROLL_FRACTION)
-        stake = np.minimum(np.maximum(raw_stake, 0.0), stake_cap)
-        stake = np.minimum(stake, bankroll)
-
-        pnl = np.where(corr_j, stake * (odds_j - 1.0), -stake)
-        bankroll = bankroll + pnl
-        bankroll = np.maximum(bankroll, 0.0)
-
-        peak = np.maximum(peak, bankroll)
-        min_bank = np.minimum(min_bank, bankroll)
-        dd_step = (peak - bankroll) / np.maximum(peak, 1.0)
-        max_dd = np.maximum(max_dd, dd_step)
-
-        if fail_fast and (j + 1) % 50 == 0:
-            for check_n, fail_limit in zip(MC_FAIL_FAST_CHECK_PATHS, MC_FAIL_FAST_CHECK_LIMITS):
-                check_n = min(check_n, n_paths)
-                if check_n <= 0:
-                    continue
-                check_ruin = float((min_bank[:check_n] < initial_bank * ruin_threshold).mean())
-                if check_ruin > fail_limit:
-                    return {
-                        "ruin_prob": round(check_ruin, 4),
-                        "max_dd_median": round(float(np.median(max_dd[:check_n])), 4),
-                        "max_dd_95": round(float(np.percentile(max_dd[:check_n], 95)), 4),
-                        "terminal_wealth_median": round(float(np.median(bankroll[:check_n])), 2),
-                        "n_bets": n_bets,
-                        "fail_fast_triggered": True,
-                        "fail_fast_check_n": int(check_n),
-                        "fail_fast_limit": float(fail_limit),
-                    }
+    active_frac = np.maximum(kelly_f * profile["buffered_edge"] / profile["denom"], 0.0)
+    active_odds = profile["odds"]
+    active_correct = profile["correct"]
+
+    bankroll_all = np.empty(n_paths, dtype=np.float64)
+    min_bank_all = np.empty(n_paths, dtype=np.float64)
+    max_dd_all = np.empty(n_paths, dtype=np.float64)
+
+    batch_paths = max(
+        int(BOOTSTRAP_VECTOR_MAX_CELLS // n_bets), max(MC_FAIL_FAST_CHECK_PATHS),
+    )
+    bet_ids = np.arange(n_bets, dtype=np.int32)[:, np.newaxis]
+    for start in range(0, n_paths, batch_paths):
+        size = min(batch_paths, n_paths - start)
+        # (n_bets, size): column p is path p's bet order, rows are contiguous steps
+        order = rng.permuted(np.broadcast_to(bet_ids, (n_bets, size)), axis=0)
+
+        bankroll = np.full(size, float(initial_bank), dtype=np.float64)
+        peak = bankroll.copy()
+        min_bank = bankroll.copy()
+        max_dd = np.zeros(size, dtype=np.float64)
+
+        for j in range(n_bets):
+            col = order[j]
+            frac_j = active_frac[col]
+            odds_j = active_odds[col]
+            corr_j = active_correct[col]
+
+            raw_stake = bankroll * frac_j
+            stake_cap = np.minimum(float(max_s), bankroll * MAX_STAKE_BANKROLL_FRACTION)
+            stake = np.minimum(np.maximum(raw_stake, 0.0), stake_cap)
+            stake = np.minimum(stake, bankroll)
+
+            pnl = np.where(corr_j, stake * (odds_j - 1.0), -stake)
+            bankroll = bankroll + pnl
+            bankroll = np.maximum(bankroll, 0.0)
+
+            peak = np.maximum(peak, bankroll)
+            min_bank = np.minimum(min_bank, bankroll)
+            dd_step = (peak - bankroll) / np.maximum(peak, 1.0)
+            max_dd = np.maximum(max_dd, dd_step)
+
+            if fail_fast and start == 0 and (j + 1) % 50 == 0:
+                for check_n, fail_limit in zip(MC_FAIL_FAST_CHECK_PATHS, MC_FAIL_FAST_CHECK_LIMITS):
+                    check_n = min(check_n, size)
+                    if check_n <= 0:
+                        continue
+                    check_ruin = float((min_bank[:check_n] < initial_bank * ruin_threshold).mean())
+                    if check_ruin > fail_limit:
+                        return {
+                            "ruin_prob": round(check_ruin, 4),
+                            "max_dd_median": round(float(np.median(max_dd[:check_n])), 4),
+                            "max_dd_95": round(float(np.percentile(max_dd[:check_n], 95)), 4),
+                            "terminal_wealth_median": round(float(np.median(bankroll[:check_n])), 2),
+                            "n_bets": n_bets,
+                            "fail_fast_triggered": True,
+                            "fail_fast_check_n": int(check_n),
+                            "fail_fast_limit": float(fail_limit),
+                        }
+
+        bankroll_all[start:start + size] = bankroll
+        min_bank_all[start:start + size] = min_bank
+        max_dd_all[start:start + size] = max_dd
 
     # Ruin
     ruin_level = initial_bank * ruin_threshold
-    ruin_prob = float((min_bank < ruin_level).mean())
+    ruin_prob = float((min_bank_all < ruin_level).mean())
 
     return {
         "ruin_prob": round(ruin_prob, 4),
-        "max_dd_median": round(float(np.median(max_dd)), 4),
-        "max_dd_95": round(float(np.percentile(max_dd, 95)), 4),
-        "terminal_wealth_median": round(float(np.median(bankroll)), 2),
+        "max_dd_median": round(float(np.median(max_dd_all)), 4),
+        "max_dd_95": round(float(np.percentile(max_dd_all, 95)), 4),
+        "terminal_wealth_median": round(float(np.median(bankroll_all)), 2),
         "n_bets": n_bets,
         "fail_fast_triggered": False,
     }
@@ -1983,6 +2375,9 @@ async def run_multi_league(
     search_mode: str = "quick",
     candidate_workers: int = 1,
     lookback_years: int = DEFAULT_LOOKBACK_YEARS,
+    float32: bool = False,
+    eval_workers: int = 1,
+    rebuild_cache: bool = False,
 ) -> dict:
     """Evolve per-league strategies + 'all' fallback."""
     leagues = await discover_leagues()
@@ -2006,6 +2401,9 @@ async def run_multi_league(
         search_mode=search_mode,
         candidate_workers=candidate_workers,
         lookback_years=lookback_years,
+        float32=float32,
+        eval_workers=eval_workers,
+        rebuild_cache=rebuild_cache,
     )
 
     if parallel and len(eligible) > 1:
@@ -2072,11 +2470,13 @@ def _print_cross_league_report(results: dict[str, dict]) -> None:
 # ---------------------------------------------------------------------------
 
 def temporal_expanding_cv(
-    tips: list[dict],
+    tips: Sequence,
     k: int = 5,
-) -> list[tuple[list[dict], list[dict]]]:
+) -> list[tuple[Sequence, Sequence]]:
     """Expanding-window temporal CV. Tips must be sorted chronologically.
 
+    Works on any sliceable sequence; pass ``range(n)`` for index ranges.
+
     For k=5 -> 4 folds. Never trains on future data.
     """
     n = len(tips)
@@ -2101,6 +2501,11 @@ async def run_evolution_deep(
     resume: bool = False,
     candidate_workers: int = 1,
     lookback_years: int = DEFAULT_LOOKBACK_YEARS,
+    float32: bool = False,
+    eval_workers: int = 1,
+    rebuild_cache: bool = False,
+    dataset: dict | None = None,
+    reference_now: datetime | None = None,
 ) -> dict:
     """Deep search: expanding-window CV with pessimistic fitness."""
     import app.database as _db
@@ -2111,28 +2516,35 @@ async def run_evolution_deep(
 
     rng = np.random.default_rng(seed)
 
-    tips = await load_tips(sport_key, lookback_years=lookback_years)
-    if len(tips) < 500:
-        log.error("Deep mode needs >=500 tips (%d found). Use quick mode.", len(tips))
+    if dataset is None:
+        dataset = await load_tips(sport_key, lookback_years=lookback_years, rebuild_cache=rebuild_cache)
+    tips = dataset["columns"]
+    n_tips = dataset["count"]
+    if n_tips < 500:
+        log.error("Deep mode needs >=500 tips (%d found). Use quick mode.", n_tips)
         _signal.signal(_signal.SIGINT, prev_handler)
-        return {"error": "insufficient_data_deep", "tip_count": len(tips)}
+        return {"error": "insufficient_data_deep", "tip_count": n_tips}
 
-    # Expanding-window CV: 4 folds from k=5
-    folds = temporal_expanding_cv(tips, k=5)
-    log.info("Deep mode: %d folds, %d tips total", len(folds), len(tips))
+    # Expanding-window CV: 4 folds from k=5, as index ranges into the columns
+    folds = temporal_expanding_cv(range(n_tips), k=5)
+    log.info("Deep mode: %d folds, %d tips total", len(folds), n_tips)
 
-    # Pre-vectorize ALL folds (stays in memory for entire GA run)
-    fold_data = []
+    # Training folds are nested prefixes of the tip axis: vectorize the
+    # longest once and score every fold at its end in the same pass
+    ref_now = reference_now or _utcnow()
+    fold_ends = [train.stop for train, _ in folds]
+    train_data = vectorize_columns(
+        tips, hi=fold_ends[-1], lookback_years=lookback_years, reference_now=ref_now,
+    )
     for fi, (train, val) in enumerate(folds):
-        ref_now = _utcnow()
-        td = vectorize_tips(train, lookback_years=lookback_years, reference_now=ref_now)
-        vd = vectorize_tips(val, lookback_years=lookback_years, reference_now=ref_now)
-        fold_data.append((td, vd))
         log.info("  Fold %d: %d train / %d val", fi, len(train), len(val))
 
     # Use last fold's val as the held-out validation set for final metrics
-    final_val_data = fold_data[-1][1]
     final_val_tips = folds[-1][1]
+    final_val_data = vectorize_columns(
+        tips, lo=final_val_tips.start, hi=final_val_tips.stop,
+        lookback_years=lookback_years, reference_now=ref_now,
+    )
 
     # Initialize population
     population = random_population(population_size, rng)
@@ -2164,84 +2576,89 @@ async def run_evolution_deep(
     stagnant_gens = 0
     prev_best = -np.inf
 
-    t0 = time.monotonic()
-
+    evaluator = PopulationEvaluator(
+        [train_data], workers=eval_workers, float32=float32,
+        version=f"{dataset['key']}:0:{fold_ends[-1]}:{lookback_years}:{ref_now.isoformat()}",
+    )
     try:
-        from rich.live import Live
-        from rich.table import Table
-        use_rich = True
-    except ImportError:
-        use_rich = False
-
-    for gen in range(generations):
-        if _shutdown_requested:
-            log.info("Graceful shutdown at gen %d", gen)
-            _save_checkpoint(sport_key, gen - 1, population, best_fitness_history, rng)
-            break
+        t0 = time.monotonic()
 
-        # Evaluate on ALL training folds — pessimistic (worst fold)
-        fold_fitnesses = np.stack([
-            evaluate_population(population, td) for td, _ in fold_data
-        ])  # (4, P)
-        # fitness = fold_fitnesses.min(axis=0)  # (P,) — worst fold per bot
+        try:
+            from rich.live import Live
+            from rich.table import Table
+            use_rich = True
+        except ImportError:
+            use_rich = False
 
-        # 1. Wir berechnen den Durchschnitt über alle Folds
-        fitness_mean = fold_fitnesses.mean(axis=0)
+        for gen in range(generations):
+            if _shutdown_requested:
+                log.info("Graceful shutdown at gen %d", gen)
+                _save_checkpoint(sport_key, gen - 1, population, best_fitness_history, rng)
+                break
 
-        # 2. Wir berechnen die Standardabweichung (wie stark schwankt der Bot?)
-        fitness_std = fold_fitnesses.std(axis=0)
+            # Evaluate on ALL training folds — pessimistic (worst fold)
+            fold_fitnesses = evaluator.evaluate_prefixes(population, fold_ends)  # (4, P)
+            # fitness = fold_fitnesses.min(axis=0)  # (P,) — worst fold per bot
 
-        # 3. Wir nehmen den Durchschnitt, ziehen aber die Schwankung ab (Realistischer Ansatz)
-        fitness = fitness_mean - (0.5 * fitness_std)
+            # 1. Wir berechnen den Durchschnitt über alle Folds
+            fitness_mean = fold_fitnesses.mean(axis=0)
 
-        best_fit = float(fitness.max())
-        avg_fit = float(fitness.mean())
-        best_fitness_history.append(best_fit)
+            # 2. Wir berechnen die Standardabweichung (wie stark schwankt der Bot?)
+            fitness_std = fold_fitnesses.std(axis=0)
 
-        if gen % 5 == 0 or gen == generations - 1:
-            fold_bests = [float(fold_fitnesses[f].max()) for f in range(fold_fitnesses.shape[0])]
-            log.info(
-                "Gen %2d/%d | Pessimistic: %.4f | Fold bests: %s | Pop: %d",
-                gen + 1, generations, best_fit,
-                [f"{x:.3f}" for x in fold_bests], population_size,
-            )
+            # 3. Wir nehmen den Durchschnitt, ziehen aber die Schwankung ab (Realistischer Ansatz)
+            fitness = fitness_mean - (0.5 * fitness_std)
 
-        if gen % CHECKPOINT_INTERVAL == 0 and gen > 0:
-            _save_checkpoint(sport_key, gen, population, best_fitness_history, rng)
+            best_fit = float(fitness.max())
+            avg_fit = float(fitness.mean())
+            best_fitness_history.append(best_fit)
 
-        # Radiation event
-        if best_fit <= prev_best + 1e-6:
-            stagnant_gens += 1
-        else:
-            stagnant_gens = 0
-        prev_best = best_fit
+            log.info("Gen %d fitness cache hit rate: %.0f%%", gen + 1, evaluator.last_hit_rate * 100)
+            if gen % 5 == 0 or gen == generations - 1:
+                fold_bests = [float(fold_fitnesses[f].max()) for f in range(fold_fitnesses.shape[0])]
+                log.info(
+                    "Gen %2d/%d | Pessimistic: %.4f | Fold bests: %s | Pop: %d",
+                    gen + 1, generations, best_fit,
+                    [f"{x:.3f}" for x in fold_bests], population_size,
+                )
 
-        elites = select_elites(population, fitness, n_elites)
-        children = crossover(elites, n_children, rng)
+            if gen % CHECKPOINT_INTERVAL == 0 and gen > 0:
+                _save_checkpoint(sport_key, gen, population, best_fitness_history, rng)
 
-        if stagnant_gens >= STAGNATION_THRESHOLD:
-            log.warning("RADIATION EVENT at gen %d", gen)
-            children = mutate(children, rng, mutation_rate=RADIATION_MUTATION_RATE)
-            stagnant_gens = 0
-        else:
-            children = mutate(children, rng)
+            # Radiation event
+            if best_fit <= prev_best + 1e-6:
+                stagnant_gens += 1
+            else:
+                stagnant_gens = 0
+            prev_best = best_fit
 
-        population = np.vstack([elites, children])
+            elites = select_elites(population, fitness, n_elites)
+            children = crossover(elites, n_children, rng)
 
-    _signal.signal(_signal.SIGINT, prev_handler)
+            if stagnant_gens >= STAGNATION_THRESHOLD:
+                log.warning("RADIATION EVENT at gen %d", gen)
+                children = mutate(children, rng, mutation_rate=RADIATION_MUTATION_RATE)
+                stagnant_gens = 0
+            else:
+                children = mutate(children, rng)
+
+            population = np.vstack([elites, children])
+
+        _signal.signal(_signal.SIGINT, prev_handler)
 
-    elapsed = time.monotonic() - t0
-    log.info("Deep evolution complete in %.1fs (%d generations)", elapsed, generations)
+        elapsed = time.monotonic() - t0
+        log.info("Deep evolution complete in %.1fs (%d generations)", elapsed, generations)
 
-    # Best bot (same objective as in training loop)
-    final_fold_fitnesses = np.stack([
-        evaluate_population(population, td) for td, _ in fold_data
-    ])
+        # Best bot (same objective as in training loop)
+        final_fold_fitnesses = evaluator.evaluate_prefixes(population, fold_ends)
+        log.info("Fitness cache: %d/%d hits", evaluator.cache_hits, evaluator.cache_lookups)
+    finally:
+        evaluator.close()
     final_fitness = final_fold_fitnesses.mean(axis=0) - (0.5 * final_fold_fitnesses.std(axis=0))
     alpha_idx = np.argmax(final_fitness)
     alpha_dna = population[alpha_idx]
 
-    train_metrics = _compute_detailed_metrics(alpha_dna, fold_data[-1][0])
+    train_metrics = _compute_detailed_metrics(alpha_dna, train_data)
     val_metrics = _compute_detailed_metrics(alpha_dna, final_val_data)
 
     dna_dict = {gene: round(float(alpha_dna[j]), 4) for j, gene in enumerate(DNA_GENES)}
@@ -2275,7 +2692,7 @@ async def run_evolution_deep(
                     dna=population[pop_idx].copy(),
                     fitness_value=float(final_fitness[pop_idx]),
                     pool_rank=rank_idx,
-                    train_data=fold_data[-1][0],
+                    train_data=train_data,
                     val_data=final_val_data,
                     rng_seed=seed_i,
                     require_positive_roi=True,
@@ -2294,7 +2711,7 @@ async def run_evolution_deep(
                 dna=population[pop_idx].copy(),
                 fitness_value=float(final_fitness[pop_idx]),
                 pool_rank=rank_idx,
-                train_data=fold_data[-1][0],
+                train_data=train_data,
                 val_data=final_val_data,
                 rng_seed=seed_i,
                 require_positive_roi=True,
@@ -2312,7 +2729,7 @@ async def run_evolution_deep(
             dna=fallback_dna.copy(),
             fitness_value=float(final_fitness[int(np.argmax(final_fitness))]),
             pool_rank=1,
-            train_data=fold_data[-1][0],
+            train_data=train_data,
             val_data=final_val_data,
             rng_seed=fallback_seed,
             require_positive_roi=False,
@@ -2392,10 +2809,10 @@ async def run_evolution_deep(
             "validation_window": {
                 "source": "arena_deep_last_fold",
                 "n_folds": len(folds),
-                "tips_total": len(tips),
+                "tips_total": n_tips,
                 "validation_tips": len(final_val_tips),
-                "start_date": _ensure_utc(final_val_tips[0]["match_date"]).isoformat() if final_val_tips else None,
-                "end_date": _ensure_utc(final_val_tips[-1]["match_date"]).isoformat() if final_val_tips else None,
+                "start_date": column_date(tips, final_val_tips[0]).isoformat() if final_val_tips else None,
+                "end_date": column_date(tips, final_val_tips[-1]).isoformat() if final_val_tips else None,
             },
         },
     }
@@ -2443,6 +2860,7 @@ async def run_watch_mode(
         log.info("=" * 40)
         log.info("Watch cycle %d — loading latest tips...", cycle)
         result = await run_evolution(sport_key=sport_key, resume=True, **kwargs)
+        kwargs["rebuild_cache"] = False  # later cycles only pick up the delta
         val_roi = result.get("validation_fitness", {}).get("roi", 0.0)
         log.info("Watch cycle %d complete. Val ROI: %.2f%%. Sleeping %ds...",
                  cycle, val_roi * 100, interval)
@@ -2488,6 +2906,12 @@ def main():
                         help="Parallel workers for per-league candidate stress tests")
     parser.add_argument("--lookback-years", type=int, default=DEFAULT_LOOKBACK_YEARS,
                         help="Load only tips from the last N years (default: 8)")
+    parser.add_argument("--float32", action="store_true",
+                        help="Evaluate populations in float32 (half the memory, ~1e-6 fitness noise)")
+    parser.add_argument("--eval-workers", type=int, default=1,
+                        help="Processes for population fitness (shared-memory tip arrays, default: 1)")
+    parser.add_argument("--rebuild-tip-cache", action="store_true",
+                        help=f"Rebuild the on-disk tip cache ({TIP_CACHE_DIR}/) instead of updating it")
     args = parser.parse_args()
 
     # Apply mode defaults
@@ -2511,6 +2935,9 @@ def main():
                     search_mode=args.mode,
                     candidate_workers=max(1, args.candidate_workers),
                     lookback_years=max(1, int(args.lookback_years)),
+                    float32=args.float32,
+                    eval_workers=max(1, args.eval_workers),
+                    rebuild_cache=args.rebuild_tip_cache,
                 )
             elif args.multi:
                 result = await run_multi_league(
@@ -2523,6 +2950,9 @@ def main():
                     search_mode=args.mode,
                     candidate_workers=max(1, args.candidate_workers),
                     lookback_years=max(1, int(args.lookback_years)),
+                    float32=args.float32,
+                    eval_workers=max(1, args.eval_workers),
+                    rebuild_cache=args.rebuild_tip_cache,
                 )
             elif args.mode == "deep":
                 result = await run_evolution_deep(
@@ -2534,6 +2964,9 @@ def main():
                     resume=args.resume,
                     candidate_workers=max(1, args.candidate_workers),
                     lookback_years=max(1, int(args.lookback_years)),
+                    float32=args.float32,
+                    eval_workers=max(1, args.eval_workers),
+                    rebuild_cache=args.rebuild_tip_cache,
                 )
             else:
                 result = await run_evolution(
@@ -2546,6 +2979,9 @@ def main():
                     search_mode=args.mode,
                     candidate_workers=max(1, args.candidate_workers),
                     lookback_years=max(1, int(args.lookback_years)),
+                    float32=args.float32,
+                    eval_workers=max(1, args.eval_workers),
+                    rebuild_cache=args.rebuild_tip_cache,
                 )
                 if "error" in result:
                     log.error("Evolution failed: %s", result["error"])
@@ -7,7 +7,16 @@ Pipeline:
 3. Backfill Tips (generate predictions using calibrated params)
 
 Uses ``before_date`` filtering so each tip only sees data that existed
-before the match was played — no temporal leakage.
+before the match was played — no temporal leakage. The backfill replays history:
+all finals of the target leagues are loaded into one TipFeatureStore and the
+matches are swept forward in date order, each tip reading only the slice
+before its kickoff; tips are written with one insert_many per batch.
+
+With ``--workers N`` the eligible matches are split into league-season shards
+that replay in separate processes (like engine_time_machine's per-league
+runs). Each shard upserts its tips with an unordered bulk_write and records a
+checkpoint in ``qtip_backfill_checkpoints`` after every batch; an interrupted
+run picks up where each shard stopped, and --rerun clears the checkpoints.
 
 Usage:
     # Full pipeline (recommended):
@@ -18,18 +27,25 @@ Usage:
 
     # Standard backfill (uses existing config):
     python -m tools.qtip_backfill --batch-size 500
+
+    # Reference run with per-match Mongo queries (identical tips, much slower):
+    python -m tools.qtip_backfill --per-match
+
+    # Sharded across 8 processes (one league-season per shard, resumable):
+    python -m tools.qtip_backfill --workers 8
 """
 
 import argparse
 import asyncio
+import concurrent.futures
 import logging
 import os
 import sys
 import time
 from bisect import bisect_right
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from pymongo import UpdateOne
+from pymongo import ReplaceOne, UpdateOne
 
 # Add backend to Python path so we can import app modules
 sys.path.insert(0, "backend")
@@ -265,6 +281,295 @@ def _normalize_odds(match: dict) -> dict:
     return match
 
 
+def _apply_engine_params(
+    match: dict,
+    history_snapshots: dict[str, list[tuple[datetime, dict]]],
+    warned_no_history: set[str],
+) -> None:
+    """Inject the engine params that were live on the match date."""
+    from app.utils import ensure_utc
+
+    match_sport = match.get("sport_key", "")
+    sport_snaps = history_snapshots.get(match_sport)
+    if sport_snaps:
+        snap_entry = find_snapshot_for_date(sport_snaps, match["match_date"])
+        if snap_entry:
+            inject_engine_params(match_sport, snap_entry)
+        elif match_sport not in warned_no_history:
+            log.warning("No snapshot covers %s before %s — using live/default params",
+                        match_sport, ensure_utc(match["match_date"]).strftime("%Y-%m-%d"))
+            warned_no_history.add(match_sport)
+    elif match_sport not in warned_no_history:
+        log.warning("No engine history for %s — using live/default params", match_sport)
+        warned_no_history.add(match_sport)
+
+
+async def backfill_tip(
+    match: dict,
+    history_snapshots: dict[str, list[tuple[datetime, dict]]],
+    warned_no_history: set[str],
+    features=None,
+) -> dict:
+    """Generate and resolve the tip for one historical match (point-in-time)."""
+    from app.services.quotico_tip_service import generate_quotico_tip, resolve_tip
+
+    # Ensure in-memory dict has h2h (even if normalize_match_odds ran, fetch might act on old state or racing)
+    match = _normalize_odds(match)
+    _apply_engine_params(match, history_snapshots, warned_no_history)
+    tip = await generate_quotico_tip(match, before_date=match["match_date"], features=features)
+    return resolve_tip(tip, match)
+
+
+def _new_stats() -> dict[str, int]:
+    """Zeroed backfill counters."""
+    return {"generated": 0, "correct": 0, "no_signal": 0, "skipped": 0, "errors": 0}
+
+
+def _tally(stats: dict[str, int], tip: dict) -> None:
+    """Count a tip as generated (resolved with a verdict) or no-signal."""
+    if tip["status"] == "resolved" and tip.get("was_correct") is not None:
+        stats["generated"] += 1
+        if tip["was_correct"]:
+            stats["correct"] += 1
+    else:
+        stats["no_signal"] += 1
+
+
+def _win_rate(stats: dict[str, int]) -> str:
+    """Log suffix with the win rate, empty when nothing was generated."""
+    if not stats["generated"]:
+        return ""
+    return " — win rate %d/%d = %.1f%%" % (
+        stats["correct"], stats["generated"], stats["correct"] / stats["generated"] * 100,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Sharded backfill (--workers N) — one process per league-season shard
+# ---------------------------------------------------------------------------
+
+async def plan_shards(query: dict) -> list[dict]:
+    """Split the eligible matches into league-season shards, largest first."""
+    import app.database as _db
+
+    rows = await _db.db.matches.aggregate([
+        {"$match": query},
+        {"$group": {
+            "_id": {"sport_key": "$sport_key", "season_label": "$season_label"},
+            "matches": {"$sum": 1},
+        }},
+    ]).to_list(length=None)
+    shards = []
+    for row in rows:
+        sport = row["_id"]["sport_key"]
+        season = row["_id"].get("season_label")
+        shards.append({
+            "id": f"{sport}:{season or '-'}",
+            "sport_key": sport,
+            "season_label": season,
+            "matches": row["matches"],
+        })
+    shards.sort(key=lambda s: (-s["matches"], s["id"]))
+    return shards
+
+
+async def _season_closed(shard: dict) -> bool:
+    """True once no match of the shard's season can still become eligible."""
+    import app.database as _db
+
+    open_match = await _db.db.matches.find_one(
+        {
+            "sport_key": shard["sport_key"],
+            "season_label": shard["season_label"],
+            "$or": [
+                {"status": {"$in": ["scheduled", "live"]}},
+                {"status": "final", "result.outcome": None},
+            ],
+        },
+        {"_id": 1},
+    )
+    return open_match is None
+
+
+async def _backfill_shard_inner(
+    shard: dict, query: dict, batch_size: int, dry_run: bool,
+) -> dict:
+    """Replay one league-season shard, checkpointing after every batch.
+
+    The checkpoint (``qtip_backfill_checkpoints``, ``_id`` = shard id) holds
+    the last processed (match_date, _id) and the cumulative stats. A closed
+    season resumes after that high-water mark and is marked ``done`` once
+    complete. A season still in progress is rescanned on every run, so
+    matches that finished since the last run (including ones kicked off
+    before the mark) are picked up; matches with a tip are skipped.
+    """
+    import app.database as _db
+    import app.services.quotico_tip_service as _qts
+    from app.services.tip_feature_store import TipFeatureStore
+    from app.utils import utcnow
+
+    t0 = time.monotonic()
+    checkpoint = await _db.db.qtip_backfill_checkpoints.find_one({"_id": shard["id"]}) or {}
+    closed = await _season_closed(shard)
+    if checkpoint.get("done") and closed:
+        stats = {**_new_stats(), **checkpoint.get("stats", {})}
+        return {"id": shard["id"], "status": "checkpointed", "stats": stats, "elapsed": 0.0}
+
+    shard_query = {
+        **query, "sport_key": shard["sport_key"], "season_label": shard["season_label"],
+    }
+    stats = _new_stats()
+    # Only a mark written while the season was already closed covers every
+    # eligible match before it
+    if closed and checkpoint.get("closed") and checkpoint.get("last_match_date") is not None:
+        stats.update(checkpoint.get("stats", {}))
+        last_date = checkpoint["last_match_date"]
+        shard_query["$or"] = [
+            {"match_date": {"$gt": last_date}},
+            {"match_date": last_date, "_id": {"$gt": checkpoint["last_match_id"]}},
+        ]
+    matches = await _db.db.matches.find(shard_query).sort(
+        [("match_date", 1), ("_id", 1)],
+    ).to_list(length=None)
+
+    match_ids = [str(m["_id"]) for m in matches]
+    existing = await _db.db.quotico_tips.find(
+        {"match_id": {"$in": match_ids}}, {"_id": 0, "match_id": 1},
+    ).to_list(length=None) if match_ids else []
+    existing_ids = {e["match_id"] for e in existing}
+
+    history_snapshots = await load_history_snapshots(shard["sport_key"])
+    if history_snapshots:
+        _qts._engine_config_expires = time.time() + 999_999
+
+    features = None
+    pending = [m for m in matches if str(m["_id"]) not in existing_ids]
+    if pending:
+        # Nothing after the shard's last kickoff can be read by its tips; the
+        # store's history starts a fixed look-back before its first one
+        cutoff = max(m["match_date"] for m in pending) + timedelta(microseconds=1)
+        features = await TipFeatureStore.load(pending, before_date=cutoff, replay=True)
+
+    warned_no_history: set[str] = set()
+    for offset in range(0, len(matches), batch_size):
+        batch = matches[offset:offset + batch_size]
+        ops = []
+        for match in batch:
+            mid = str(match["_id"])
+            if mid in existing_ids:
+                stats["skipped"] += 1
+                continue
+            try:
+                tip = await backfill_tip(match, history_snapshots, warned_no_history, features)
+            except Exception as e:
+                stats["errors"] += 1
+                if stats["errors"] <= 5:
+                    log.error("Error for %s: %s", mid, e)
+                continue
+            _tally(stats, tip)
+            ops.append(ReplaceOne({"match_id": mid}, tip, upsert=True))
+
+        if dry_run:
+            continue
+        if ops:
+            await _db.db.quotico_tips.bulk_write(ops, ordered=False)
+        await _db.db.qtip_backfill_checkpoints.update_one(
+            {"_id": shard["id"]},
+            {"$set": {
+                "sport_key": shard["sport_key"],
+                "last_match_date": batch[-1]["match_date"],
+                "last_match_id": batch[-1]["_id"],
+                "closed": closed,
+                "stats": stats,
+                "updated_at": utcnow(),
+            }},
+            upsert=True,
+        )
+
+    if not dry_run:
+        await _db.db.qtip_backfill_checkpoints.update_one(
+            {"_id": shard["id"]},
+            {"$set": {"sport_key": shard["sport_key"], "done": closed,
+                      "stats": stats, "updated_at": utcnow()}},
+            upsert=True,
+        )
+    return {
+        "id": shard["id"], "status": "completed", "stats": stats,
+        "elapsed": round(time.monotonic() - t0, 1),
+    }
+
+
+def _backfill_shard_sync(shard: dict, query: dict, batch_size: int, dry_run: bool) -> dict:
+    """Sync wrapper for one shard in a dedicated process."""
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        import app.database as _db
+        loop.run_until_complete(_db.connect_db())
+        try:
+            return loop.run_until_complete(
+                _backfill_shard_inner(shard, query, batch_size, dry_run),
+            )
+        finally:
+            loop.run_until_complete(_db.close_db())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def run_sharded_backfill(
+    query: dict, workers: int, batch_size: int, dry_run: bool,
+) -> tuple[dict[str, int], int]:
+    """Fan league-season shards out over *workers* processes and merge stats.
+
+    Tips are upserted per match_id and stats are plain sums, so the merged
+    result does not depend on which shard finishes first. Returns the merged
+    stats and the number of failed shards.
+    """
+    shards = await plan_shards(query)
+    log.info("Sharded backfill: %d league-season shards on %d workers",
+             len(shards), min(workers, len(shards)))
+
+    totals = _new_stats()
+    results: dict[str, dict] = {}
+    if shards:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            futures = {
+                pool.submit(_backfill_shard_sync, shard, query, batch_size, dry_run): shard
+                for shard in shards
+            }
+            for future in concurrent.futures.as_completed(futures):
+                shard = futures[future]
+                try:
+                    results[shard["id"]] = future.result()
+                except Exception as e:
+                    log.error("Shard %s failed: %s", shard["id"], e)
+                    results[shard["id"]] = {"error": str(e)}
+                    continue
+                for key, value in results[shard["id"]]["stats"].items():
+                    totals[key] += value
+                log.info(
+                    "  [%d/%d] %-40s %s (%.1fs) — running gen=%d no_sig=%d err=%d%s",
+                    len(results), len(shards), shard["id"],
+                    results[shard["id"]]["status"], results[shard["id"]]["elapsed"],
+                    totals["generated"], totals["no_signal"], totals["errors"],
+                    _win_rate(totals),
+                )
+
+    failed = 0
+    for shard in shards:
+        result = results.get(shard["id"]) or {}
+        if "error" in result:
+            failed += 1
+            log.error("  %-40s  EXCEPTION: %s", shard["id"], result["error"])
+            continue
+        st = result["stats"]
+        log.info("  %-40s  gen=%d correct=%d no_sig=%d skip=%d err=%d%s",
+                 shard["id"], st["generated"], st["correct"], st["no_signal"],
+                 st["skipped"], st["errors"], _win_rate(st))
+    return totals, failed
+
+
 async def run_backfill(
     sport_key: str | None,
     batch_size: int,
@@ -274,16 +579,17 @@ async def run_backfill(
     rerun: bool = False,
     calibrate: bool = False,
     calibrate_only: bool = False,
+    per_match: bool = False,
+    workers: int = 1,
 ) -> None:
     import app.database as _db
-    from app.services.quotico_tip_service import generate_quotico_tip, resolve_tip
+    from app.services.tip_feature_store import TipFeatureStore
 
     await _db.connect_db()
     log.info("Connected to MongoDB: %s", _db.db.name)
 
     # --- Load historical engine params for temporal correctness ---
     import app.services.quotico_tip_service as _qts
-    from app.utils import ensure_utc
 
     history_snapshots = await load_history_snapshots(sport_key)
     if history_snapshots:
@@ -331,6 +637,9 @@ async def run_backfill(
             del_query["sport_key"] = sport_key
         result = await _db.db.quotico_tips.delete_many(del_query)
         log.info("RERUN: deleted %d existing tips (resolved + no_signal)", result.deleted_count)
+        await _db.db.qtip_backfill_checkpoints.delete_many(
+            {"sport_key": sport_key} if sport_key else {},
+        )
     elif rerun and dry_run:
         log.info("RERUN: would delete existing tips (dry-run, skipping delete)")
 
@@ -342,78 +651,66 @@ async def run_backfill(
     if sport_key:
         query["sport_key"] = sport_key
 
-    total_available = await _db.db.matches.count_documents(query)
+    if workers > 1:
+        if skip or max_batches != 9999:
+            log.warning("--skip/--max-batches are ignored with --workers > 1")
+        t0 = time.monotonic()
+        grand, failed = await run_sharded_backfill(query, workers, batch_size, dry_run)
+        await clear_engine_config_cache()
+        _log_summary(grand, dry_run, elapsed=time.monotonic() - t0, failed_shards=failed)
+        return
+
+    # One sorted pass over every eligible final — (match_date, _id) keeps the
+    # same-day order stable, so --skip/--max-batches select the same matches
+    # on every run without cursor .skip() paging.
+    t_load = time.monotonic()
+    all_matches = await _db.db.matches.find(query).sort(
+        [("match_date", 1), ("_id", 1)],
+    ).to_list(length=None)
+    total_available = len(all_matches)
     log.info("Total eligible matches: %d (skip=%d)", total_available, skip)
-
-    grand_generated = 0
-    grand_correct = 0
-    grand_no_signal = 0
-    grand_skipped = 0
-    grand_errors = 0
+    matches = all_matches[skip:skip + max_batches * batch_size]
+    del all_matches
+
+    match_ids = [str(m["_id"]) for m in matches]
+    existing = await _db.db.quotico_tips.find(
+        {"match_id": {"$in": match_ids}}, {"_id": 0, "match_id": 1},
+    ).to_list(length=None) if match_ids else []
+    existing_ids = {e["match_id"] for e in existing}
+
+    # Replay: every final of the related leagues in memory once; each tip
+    # reads the slice strictly before its own kickoff (point-in-time).
+    features = None
+    if not per_match and len(existing_ids) < len(matches):
+        pending = [m for m in matches if str(m["_id"]) not in existing_ids]
+        features = await TipFeatureStore.load(pending, replay=True)
+    log.info(
+        "Loaded %d matches (%d already tipped) in %.1fs — %s",
+        len(matches), len(existing_ids), time.monotonic() - t_load,
+        "per-match queries" if per_match else "replay",
+    )
+
+    grand = _new_stats()
     batch_num = 0
 
-    while batch_num < max_batches:
-        offset = skip + batch_num * batch_size
-        if offset >= total_available:
-            break
-
-        matches = await _db.db.matches.find(query).sort("match_date", 1).skip(offset).to_list(length=batch_size)
-        if not matches:
-            break
-
-        match_ids = [str(m["_id"]) for m in matches]
-        existing = await _db.db.quotico_tips.find(
-            {"match_id": {"$in": match_ids}}, {"match_id": 1},
-        ).to_list(length=len(match_ids))
-        existing_ids = {e["match_id"] for e in existing}
-
-        generated = 0
-        correct = 0
-        no_signal = 0
-        skipped_count = 0
-        errors = 0
+    for offset in range(0, len(matches), batch_size):
+        batch = matches[offset:offset + batch_size]
+        tips: list[dict] = []
+        stats = _new_stats()
         t0 = time.monotonic()
 
-        for i, match in enumerate(matches):
+        for i, match in enumerate(batch):
             mid = str(match["_id"])
             if mid in existing_ids:
-                skipped_count += 1
+                stats["skipped"] += 1
                 continue
             try:
-                # Ensure in-memory dict has h2h (even if normalize_match_odds ran, fetch might act on old state or racing)
-                match = _normalize_odds(match)
-
-                # Inject temporally-correct engine params for this match date
-                match_sport = match.get("sport_key", "")
-                sport_snaps = history_snapshots.get(match_sport)
-                if sport_snaps:
-                    snap_entry = find_snapshot_for_date(sport_snaps, match["match_date"])
-                    if snap_entry:
-                        inject_engine_params(match_sport, snap_entry)
-                    elif match_sport not in warned_no_history:
-                        log.warning("No snapshot covers %s before %s — using live/default params",
-                                    match_sport, ensure_utc(match["match_date"]).strftime("%Y-%m-%d"))
-                        warned_no_history.add(match_sport)
-                elif match_sport not in warned_no_history:
-                    log.warning("No engine history for %s — using live/default params", match_sport)
-                    warned_no_history.add(match_sport)
-
-                # Generate tip
-                tip = await generate_quotico_tip(match, before_date=match["match_date"])
-                tip = resolve_tip(tip, match)
-                
-                if not dry_run:
-                    await _db.db.quotico_tips.insert_one(tip)
-                
-                if tip["status"] == "resolved" and tip.get("was_correct") is not None:
-                    generated += 1
-                    if tip["was_correct"]:
-                        correct += 1
-                else:
-                    no_signal += 1
+                tip = await backfill_tip(match, history_snapshots, warned_no_history, features)
+                tips.append(tip)
+                _tally(stats, tip)
             except Exception as e:
-                errors += 1
-                if errors <= 5:
+                stats["errors"] += 1
+                if stats["errors"] <= 5:
                     log.error("Error for %s: %s", mid, e)
 
             if (i + 1) % 50 == 0:
@@ -421,49 +718,66 @@ async def run_backfill(
                 rate = (i + 1) / elapsed if elapsed > 0 else 0
                 log.info(
                     "  Batch %d progress: %d/%d (%.1f/s) — gen=%d correct=%d no_sig=%d skip=%d err=%d",
-                    batch_num + 1, i + 1, len(matches), rate,
-                    generated, correct, no_signal, skipped_count, errors,
+                    batch_num + 1, i + 1, len(batch), rate,
+                    stats["generated"], stats["correct"], stats["no_signal"],
+                    stats["skipped"], stats["errors"],
                 )
 
+        if tips and not dry_run:
+            await _db.db.quotico_tips.insert_many(tips, ordered=False)
+
         elapsed = time.monotonic() - t0
-        grand_generated += generated
-        grand_correct += correct
-        grand_no_signal += no_signal
-        grand_skipped += skipped_count
-        grand_errors += errors
+        for key, value in stats.items():
+            grand[key] += value
         batch_num += 1
 
-        batch_wr = f" — win rate {correct}/{generated} = {correct/generated*100:.1f}%" if generated else ""
         log.info(
             "Batch %d done in %.1fs: %d matches — gen=%d correct=%d no_sig=%d skip=%d err=%d%s %s",
-            batch_num, elapsed, len(matches),
-            generated, correct, no_signal, skipped_count, errors,
-            batch_wr,
+            batch_num, elapsed, len(batch),
+            stats["generated"], stats["correct"], stats["no_signal"],
+            stats["skipped"], stats["errors"],
+            _win_rate(stats),
             "[DRY RUN]" if dry_run else "",
         )
 
     # Reset cache to normal state after backfill
     await clear_engine_config_cache()
 
-    # Summary
-    total_processed = grand_generated + grand_no_signal + grand_skipped + grand_errors
+    _log_summary(grand, dry_run, batches=batch_num)
+
+
+def _log_summary(
+    grand: dict[str, int],
+    dry_run: bool,
+    *,
+    batches: int | None = None,
+    elapsed: float | None = None,
+    failed_shards: int = 0,
+) -> None:
+    """Log the end-of-run summary for single-process or sharded runs."""
+    total_processed = grand["generated"] + grand["no_signal"] + grand["skipped"] + grand["errors"]
     log.info("=" * 60)
     log.info("BACKFILL COMPLETE%s", " [DRY RUN]" if dry_run else "")
-    log.info("  Batches:   %d", batch_num)
+    if batches is not None:
+        log.info("  Batches:   %d", batches)
+    if elapsed is not None:
+        log.info("  Elapsed:   %.1fs", elapsed)
+    if failed_shards:
+        log.info("  Failed shards: %d (rerun to resume from their checkpoints)", failed_shards)
     log.info("  Processed: %d", total_processed)
-    log.info("  Generated: %d (resolved tips)", grand_generated)
-    log.info("  Correct:   %d", grand_correct)
-    log.info("  No signal: %d", grand_no_signal)
-    log.info("  Skipped:   %d", grand_skipped)
-    log.info("  Errors:    %d", grand_errors)
-    if grand_generated > 0:
+    log.info("  Generated: %d (resolved tips)", grand["generated"])
+    log.info("  Correct:   %d", grand["correct"])
+    log.info("  No signal: %d", grand["no_signal"])
+    log.info("  Skipped:   %d", grand["skipped"])
+    log.info("  Errors:    %d", grand["errors"])
+    if grand["generated"] > 0:
         log.info("  ─── Closing Line ───")
         log.info("  Win rate:    %.1f%% (%d/%d correct)",
-                 grand_correct / grand_generated * 100, grand_correct, grand_generated)
-    if grand_generated + grand_no_signal > 0:
+                 grand["correct"] / grand["generated"] * 100, grand["correct"], grand["generated"])
+    if grand["generated"] + grand["no_signal"] > 0:
         log.info("  Signal rate: %.1f%% (%d/%d had actionable signal)",
-                 grand_generated / (grand_generated + grand_no_signal) * 100,
-                 grand_generated, grand_generated + grand_no_signal)
+                 grand["generated"] / (grand["generated"] + grand["no_signal"]) * 100,
+                 grand["generated"], grand["generated"] + grand["no_signal"])
     log.info("=" * 60)
 
 
@@ -475,6 +789,14 @@ def main():
     parser.add_argument("--max-batches", type=int, default=9999, help="Max batches to run")
     parser.add_argument("--dry-run", action="store_true", help="Don't write to DB")
     parser.add_argument("--rerun", action="store_true", help="Delete existing tips and regenerate")
+    parser.add_argument(
+        "--per-match", action="store_true",
+        help="Query Mongo per match instead of the in-memory replay (slow reference path)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Processes for a sharded run, one league-season shard each (default: 1)",
+    )
     
     # New flags
     parser.add_argument("--calibrate", action="store_true", help="Run odds norm + calibration before backfill")
@@ -491,6 +813,8 @@ def main():
         rerun=args.rerun,
         calibrate=args.calibrate,
         calibrate_only=args.calibrate_only,
+        per_match=args.per_match,
+        workers=args.workers,
     ))
 
 
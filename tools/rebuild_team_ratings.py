@@ -0,0 +1,53 @@
+"""
+Team ratings rebuild — materialize ``team_ratings`` from all final matches.
+
+The match resolver keeps the table current as matches go final; run this once
+to seed it (the tip engine only reads the table after a full rebuild) and again
+after bulk historical imports or xG enrichment runs.
+
+Usage:
+    python -m tools.rebuild_team_ratings
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add backend to Python path so we can import app modules
+sys.path.insert(0, "backend")
+
+# Default to local MongoDB when not set
+if "MONGO_URI" not in os.environ:
+    os.environ["MONGO_URI"] = "mongodb://localhost:27017/quotico"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  %(levelname)-7s  %(message)s",
+    datefmt="%H:%M:%S",
+)
+log = logging.getLogger("rebuild_team_ratings")
+
+
+async def run_rebuild() -> None:
+    import app.database as _db
+    from app.services.team_rating_service import rebuild_team_ratings
+
+    await _db.connect_db()
+    log.info("Connected to MongoDB: %s", _db.db.name)
+
+    t0 = time.monotonic()
+    result = await rebuild_team_ratings()
+    log.info(
+        "Rebuilt ratings for %d teams from %d final matches (%.1fs)",
+        result["teams"], result["matches"], time.monotonic() - t0,
+    )
+
+
+def main():
+    asyncio.run(run_rebuild())
+
+
+if __name__ == "__main__":
+    main()